@@ -1,209 +1,338 @@
-"""
-Beholder enemy AI module.
-"""
-
-import random
-from collections import deque
-
-# ANSI color codes
-BLUE = "\033[94m"
-RESET = "\033[0m"
-
-
-class Beholder:
-    """
-    Represents the Beholder monster.
-    """
-    # pylint: disable=too-many-instance-attributes
-
-    def __init__(self, x: int, y: int, level: int = 1):
-        """
-        Initializes the Beholder enemy.
-        """
-        self.x = x
-        self.y = y
-        self.level = level
-
-        # --- HP Scaling ---
-        base_hp = 100
-        hp_per_level = 50
-        self.max_hp = base_hp + ((level - 1) * hp_per_level)
-        self.hp = self.max_hp
-
-        # Attack power scaling
-        self.attack_power = 10 + (level * 5)
-
-        self.name = "Beholder"
-        self.symbol = f"{BLUE}B{RESET}"
-
-    def spawn_at_safe_location(self, floor_tiles: list[tuple[int, int]],
-                               player_x: int, player_y: int):
-        """
-        Teleports the Beholder to a random floor tile at least 5 steps
-        away from the player.
-        """
-        possible_targets = []
-
-        # Find tiles far away
-        for (tx, ty) in floor_tiles:
-            dist_x = abs(tx - player_x)
-            dist_y = abs(ty - player_y)
-
-            # Check distance
-            if dist_x >= 5 or dist_y >= 5:
-                possible_targets.append((tx, ty))
-
-        # Pick a spot
-        if possible_targets:
-            self.x, self.y = random.choice(possible_targets)
-        elif floor_tiles:
-            self.x, self.y = random.choice(floor_tiles)
-        else:
-            # Fallback (should rarely happen)
-            self.x, self.y = player_x, player_y
-
-    def take_damage(self, damage: int, hero_weapon=None, hero_shield=None) -> int:
-        """
-        Processes damage taken from the Hero with Level 3 immunity check.
-        """
-        actual_damage = damage
-
-        # --- Level 3 Mechanic: Weapon/Shield Immunity ---
-        if self.level >= 3:
-            if hero_weapon is None and hero_shield is None:
-                # Attack bounces off
-                return 0
-
-        self.hp -= actual_damage
-        self.hp = max(self.hp, 0)
-        return actual_damage
-
-    def is_alive(self) -> bool:
-        """Checks if the Beholder is still alive."""
-        return self.hp > 0
-
-    def manhattan_distance(self, tx: int, ty: int) -> int:
-        """Calculates distance between self and target (tx, ty)."""
-        return abs(self.x - tx) + abs(self.y - ty)
-
-    @staticmethod
-    def is_walkable(x: int, y: int, dungeon_map: list[list[str]]) -> bool:
-        """Checks if a tile is within bounds and not a wall."""
-        if 0 <= y < len(dungeon_map) and 0 <= x < len(dungeon_map[0]):
-            return dungeon_map[y][x] != "▓"
-        return False
-
-    def has_line_of_sight(self, hero_x: int, hero_y: int,
-                          dungeon_map: list[list[str]]) -> bool:
-        """Check if there is a clear straight line to the hero."""
-        if self.x == hero_x:  # Vertical
-            step = 1 if hero_y > self.y else -1
-            for y in range(self.y + step, hero_y, step):
-                if dungeon_map[y][self.x] == "▓":
-                    return False
-            return True
-
-        if self.y == hero_y:  # Horizontal
-            step = 1 if hero_x > self.x else -1
-            for x in range(self.x + step, hero_x, step):
-                if dungeon_map[self.y][x] == "▓":
-                    return False
-            return True
-
-        return False
-
-    def try_firebolt(self, hero) -> bool:
-        """Check conditions for Firebolt attack."""
-        return self.manhattan_distance(hero.x, hero.y) <= 5
-
-    def _reconstruct_path(self, parent: dict, target_pos: tuple[int, int]):
-        """Backtracks from target to find the next step."""
-        curr = target_pos
-        max_steps = 100
-        steps = 0
-
-        while parent.get(curr) != (self.x, self.y):
-            curr = parent.get(curr)
-            steps += 1
-            if curr is None or steps > max_steps:
-                return None
-        return curr
-
-    def bfs_next_step(self, hero_x: int, hero_y: int, dungeon_map: list[list[str]]):
-        """Find the next step towards the hero using BFS."""
-        queue = deque([(self.x, self.y)])
-        visited = {(self.x, self.y)}
-        parent = {}
-
-        target_found = False
-
-        while queue:
-            cx, cy = queue.popleft()
-            if (cx, cy) == (hero_x, hero_y):
-                target_found = True
-                break
-
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nx, ny = cx + dx, cy + dy
-                if (nx, ny) not in visited and self.is_walkable(nx, ny, dungeon_map):
-                    visited.add((nx, ny))
-                    parent[(nx, ny)] = (cx, cy)
-                    queue.append((nx, ny))
-
-        if not target_found:
-            return None
-
-        return self._reconstruct_path(parent, (hero_x, hero_y))
-
-    def move_towards(self, hero_x: int, hero_y: int, dungeon_map: list[list[str]]):
-        """Executes one step towards the hero."""
-        step = self.bfs_next_step(hero_x, hero_y, dungeon_map)
-        if step and step != (hero_x, hero_y):
-            self.x, self.y = step
-
-    def move_random(self, dungeon_map: list[list[str]], hero_x: int, hero_y: int):
-        """Executes one random valid step."""
-        moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        random.shuffle(moves)
-        for dx, dy in moves:
-            nx, ny = self.x + dx, self.y + dy
-            if self.is_walkable(nx, ny, dungeon_map) and (nx, ny) != (hero_x, hero_y):
-                self.x, self.y = nx, ny
-                return
-
-    def update(self, hero, dungeon_map: list[list[str]]):
-        """
-        Main AI Loop.
-        """
-        if not self.is_alive():
-            return
-
-        dist = self.manhattan_distance(hero.x, hero.y)
-
-        # 1. Melee Attack
-        if dist == 1:
-            dmg = max(0, self.attack_power - getattr(hero, 'defense', 0))
-            hero.hp -= dmg
-            print(f"{BLUE}Beholder bites you for {dmg} damage!{RESET}")
-            return
-
-        # 2. Ranged Attack
-        if self.try_firebolt(hero) and \
-                self.has_line_of_sight(hero.x, hero.y, dungeon_map):
-            dmg = random.randint(1, 6) + (self.level * 2)
-            hero.hp -= dmg
-            print(f"{BLUE}Beholder casts Firebolt! You take {dmg} damage.{RESET}")
-            if dist > 2:
-                self.move_towards(hero.x, hero.y, dungeon_map)
-            return
-
-        # 3. Movement
-        steps = 2
-        for _ in range(steps):
-            dist = self.manhattan_distance(hero.x, hero.y)
-            if dist < 10:
-                step = self.bfs_next_step(hero.x, hero.y, dungeon_map)
-                if step and step != (hero.x, hero.y):
-                    self.x, self.y = step
-            else:
-                self.move_random(dungeon_map, hero.x, hero.y)
+"""
+Beholder enemy AI module.
+"""
+
+import random
+from collections import deque
+
+from kostelnk_dungeon_game.dungeon_core.events import DamageEvent, emit
+from kostelnk_dungeon_game.dungeon_core.metrics import REGISTRY
+from kostelnk_dungeon_game.dungeon_core.pathcache import MISS
+
+BFS_SEARCHES = REGISTRY.counter("dungeon_bfs_searches_total", "Beholder path searches run.")
+BFS_NODES = REGISTRY.counter("dungeon_bfs_nodes_expanded_total",
+                             "Tiles reached by Beholder path searches.")
+
+# ANSI color codes
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+# Energy costs of actions (a hero turn gives an actor `speed` energy).
+# An attack needs this much energy left in the turn, so a Beholder with
+# speed 200 takes two steps or attacks once, never a step and an attack.
+MOVE_COST = 100
+ATTACK_COST = 200
+
+# Longer paths are not followed (the Beholder loses track of the hero)
+MAX_PATH_STEPS = 100
+
+
+class Beholder:
+    """
+    Represents the Beholder monster.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, x: int, y: int, level: int = 1):
+        """
+        Initializes the Beholder enemy.
+        """
+        self.x = x
+        self.y = y
+        self.level = level
+
+        # --- HP Scaling ---
+        base_hp = 100
+        hp_per_level = 50
+        self.max_hp = base_hp + ((level - 1) * hp_per_level)
+        self.hp = self.max_hp
+
+        # Attack power scaling
+        self.attack_power = 10 + (level * 5)
+
+        self.name = "Beholder"
+        self.symbol = f"{BLUE}B{RESET}"
+
+        # Scheduling: 200 energy per hero turn = two steps or one attack
+        self.speed = 200
+        self.asleep = False
+
+        # Event bus of the session (None = events are not recorded)
+        self.events = None
+
+        # Path cache and the floor it is keyed by (None = no caching)
+        self.path_cache = None
+        self.floor = None
+
+        # Lookahead planner (dungeon_core/planner.py); None = fixed priorities
+        self.planner = None
+
+    def spawn_at_safe_location(self, floor_tiles: list[tuple[int, int]],
+                               player_x: int, player_y: int, dungeon=None):
+        """
+        Teleports the Beholder to a random floor tile at least 5 steps
+        away from the player.
+        If the dungeon has a distance field for the player's tile, the
+        distance is measured by path and the tile is sampled in O(1).
+        """
+        analysis = getattr(dungeon, "analysis", None)
+        if analysis is not None and analysis.origin == (player_x, player_y):
+            tile = dungeon.sample_tile_at_distance(5)
+            if tile is not None:
+                self.x, self.y = tile
+                return
+
+        possible_targets = []
+
+        # Find tiles far away
+        for (tx, ty) in floor_tiles:
+            dist_x = abs(tx - player_x)
+            dist_y = abs(ty - player_y)
+
+            # Check distance
+            if dist_x >= 5 or dist_y >= 5:
+                possible_targets.append((tx, ty))
+
+        # Pick a spot
+        if possible_targets:
+            self.x, self.y = random.choice(possible_targets)
+        elif floor_tiles:
+            self.x, self.y = random.choice(floor_tiles)
+        else:
+            # Fallback (should rarely happen)
+            self.x, self.y = player_x, player_y
+
+    def hit_damage(self, damage: int, armed: bool) -> int:
+        """
+        Damage a hero's melee hit deals. The one rule used by the game, the
+        planner and the combat model.
+        """
+        # --- Level 3 Mechanic: Weapon/Shield Immunity ---
+        if self.level >= 3 and not armed:
+            # Attack bounces off
+            return 0
+        return damage
+
+    def take_damage(self, damage: int, hero_weapon=None, hero_shield=None) -> int:
+        """
+        Processes damage taken from the Hero with Level 3 immunity check.
+        """
+        actual_damage = self.hit_damage(
+            damage, hero_weapon is not None or hero_shield is not None)
+        if actual_damage == 0:
+            return 0
+
+        self.hp -= actual_damage
+        self.hp = max(self.hp, 0)
+        return actual_damage
+
+    def is_alive(self) -> bool:
+        """Checks if the Beholder is still alive."""
+        return self.hp > 0
+
+    def manhattan_distance(self, tx: int, ty: int) -> int:
+        """Calculates distance between self and target (tx, ty)."""
+        return abs(self.x - tx) + abs(self.y - ty)
+
+    @staticmethod
+    def is_walkable(x: int, y: int, dungeon_map: list[list[str]]) -> bool:
+        """Checks if a tile is within bounds and not a wall."""
+        if 0 <= y < len(dungeon_map) and 0 <= x < len(dungeon_map[0]):
+            return dungeon_map[y][x] != "▓"
+        return False
+
+    def has_line_of_sight(self, hero_x: int, hero_y: int,
+                          dungeon_map: list[list[str]]) -> bool:
+        """Check if there is a clear straight line to the hero."""
+        if self.x == hero_x:  # Vertical
+            step = 1 if hero_y > self.y else -1
+            for y in range(self.y + step, hero_y, step):
+                if dungeon_map[y][self.x] == "▓":
+                    return False
+            return True
+
+        if self.y == hero_y:  # Horizontal
+            step = 1 if hero_x > self.x else -1
+            for x in range(self.x + step, hero_x, step):
+                if dungeon_map[self.y][x] == "▓":
+                    return False
+            return True
+
+        return False
+
+    def try_firebolt(self, hero) -> bool:
+        """Check conditions for Firebolt attack."""
+        return self.manhattan_distance(hero.x, hero.y) <= 5
+
+    @staticmethod
+    def _reconstruct_path(parent: dict, start: tuple[int, int], target_pos: tuple[int, int]):
+        """
+        Backtracks from target to the start tile.
+        Returns the path (start first, target last) or None.
+        """
+        path = [target_pos]
+        curr = target_pos
+        while curr != start:
+            curr = parent.get(curr)
+            if curr is None or len(path) > MAX_PATH_STEPS + 1:
+                return None
+            path.append(curr)
+        path.reverse()
+        return path if len(path) > 1 else None
+
+    def floor_key(self, dungeon_map):
+        """Path cache key prefix for the current map, or None without a cache."""
+        floor = self.floor
+        if self.path_cache is None or floor is None or floor.dungeon_map is not dungeon_map:
+            return None
+        return (floor.floor_id, floor.map_version)
+
+    def find_path(self, target: tuple[int, int], dungeon_map: list[list[str]], start=None,
+                  cancel=None):
+        """
+        BFS path from `start` (default: the Beholder's tile) to the target,
+        both included, or None. Reads nothing but the map, so it can also run
+        on a background thread (game/speculate.py); it then stops early,
+        returning None, once the threading.Event `cancel` is set.
+        The search stops MAX_PATH_STEPS steps out, which also keeps it finite
+        on unbounded chunked floors.
+        """
+        start = start or (self.x, self.y)
+        queue = deque([(start, 0)])
+        visited = {start}
+        parent = {}
+
+        target_found = False
+
+        while queue:
+            (cx, cy), steps = queue.popleft()
+            if (cx, cy) == target:
+                target_found = True
+                break
+            if cancel is not None and cancel.is_set():
+                break
+            if steps == MAX_PATH_STEPS:
+                continue
+
+            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                nx, ny = cx + dx, cy + dy
+                if (nx, ny) not in visited and self.is_walkable(nx, ny, dungeon_map):
+                    visited.add((nx, ny))
+                    parent[(nx, ny)] = (cx, cy)
+                    queue.append(((nx, ny), steps + 1))
+
+        BFS_SEARCHES.inc()
+        BFS_NODES.inc(len(visited))
+        return self._reconstruct_path(parent, start, target) if target_found else None
+
+    def remember_path(self, floor_key, target: tuple[int, int], path):
+        """Stores a find_path result from the Beholder's tile in the path cache."""
+        if path:
+            self.path_cache.store_path(floor_key, path, target)
+        else:
+            self.path_cache.put(floor_key + ((self.x, self.y), target), None)
+
+    def bfs_next_step(self, hero_x: int, hero_y: int, dungeon_map: list[list[str]]):
+        """
+        Find the next step towards the hero using BFS.
+        With a path cache, every tile of a found path is cached, so following
+        the path (or waiting on it) does not search again until the map changes.
+        """
+        floor_key = self.floor_key(dungeon_map)
+        if floor_key is not None:
+            step = self.path_cache.get(floor_key + ((self.x, self.y), (hero_x, hero_y)))
+            if step is not MISS:
+                return step
+
+        path = self.find_path((hero_x, hero_y), dungeon_map)
+        if floor_key is not None:
+            self.remember_path(floor_key, (hero_x, hero_y), path)
+        return path[1] if path else None
+
+    def move_towards(self, hero_x: int, hero_y: int, dungeon_map: list[list[str]]):
+        """Executes one step towards the hero."""
+        step = self.bfs_next_step(hero_x, hero_y, dungeon_map)
+        if step and step != (hero_x, hero_y):
+            self.x, self.y = step
+
+    def move_random(self, dungeon_map: list[list[str]], hero_x: int, hero_y: int):
+        """Executes one random valid step."""
+        moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        random.shuffle(moves)
+        for dx, dy in moves:
+            nx, ny = self.x + dx, self.y + dy
+            if self.is_walkable(nx, ny, dungeon_map) and (nx, ny) != (hero_x, hero_y):
+                self.x, self.y = nx, ny
+                return
+
+    def bite(self, hero) -> int:
+        """Melee attack on an adjacent hero. Returns the energy cost."""
+        dmg = max(0, self.attack_power - getattr(hero, 'defense', 0))
+        hero.hp -= dmg
+        emit(self.events, DamageEvent(self.name, "Hero", dmg, "bite"))
+        return ATTACK_COST
+
+    def firebolt(self, hero) -> int:
+        """Ranged attack. Returns the energy cost."""
+        dmg = random.randint(1, 6) + (self.level * 2)
+        hero.hp -= dmg
+        emit(self.events, DamageEvent(self.name, "Hero", dmg, "firebolt"))
+        return ATTACK_COST
+
+    def perform(self, action: tuple, hero, dungeon_map: list[list[str]],
+                energy: int = ATTACK_COST) -> int:
+        """Carries out a planner action. Returns the energy cost."""
+        can_attack = energy >= ATTACK_COST
+        if action[0] == "bite" and can_attack and self.manhattan_distance(hero.x, hero.y) == 1:
+            return self.bite(hero)
+        if action[0] == "firebolt" and can_attack and self.try_firebolt(hero) and \
+                self.has_line_of_sight(hero.x, hero.y, dungeon_map):
+            return self.firebolt(hero)
+        if action[0] == "move":
+            nx, ny = self.x + action[1], self.y + action[2]
+            if self.is_walkable(nx, ny, dungeon_map) and (nx, ny) != (hero.x, hero.y):
+                self.x, self.y = nx, ny
+        return MOVE_COST
+
+    def act(self, hero, dungeon_map: list[list[str]], energy: int = ATTACK_COST) -> int:
+        """
+        Performs one action and returns its energy cost.
+        `energy` is what is left of the current hero turn; with less than
+        ATTACK_COST the Beholder can only move.
+        """
+        if self.planner is not None:
+            action = self.planner.choose(self, hero, dungeon_map, energy)
+            if action is not None:
+                return self.perform(action, hero, dungeon_map, energy)
+
+        dist = self.manhattan_distance(hero.x, hero.y)
+
+        if energy >= ATTACK_COST:
+            # 1. Melee Attack
+            if dist == 1:
+                return self.bite(hero)
+
+            # 2. Ranged Attack
+            if self.try_firebolt(hero) and \
+                    self.has_line_of_sight(hero.x, hero.y, dungeon_map):
+                cost = self.firebolt(hero)
+                if dist > 2:
+                    self.move_towards(hero.x, hero.y, dungeon_map)
+                return cost
+
+        # 3. Movement
+        if dist < 10:
+            step = self.bfs_next_step(hero.x, hero.y, dungeon_map)
+            if step and step != (hero.x, hero.y):
+                self.x, self.y = step
+        else:
+            self.move_random(dungeon_map, hero.x, hero.y)
+        return MOVE_COST
+
+    def update(self, hero, dungeon_map: list[list[str]]):
+        """
+        Main AI Loop: spends one hero turn worth of energy on actions.
+        """
+        energy = self.speed
+        while energy > 0 and self.is_alive() and hero.hp > 0:
+            energy -= self.act(hero, dungeon_map, energy)
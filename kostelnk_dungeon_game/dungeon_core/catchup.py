@@ -0,0 +1,69 @@
+"""
+Catch-up model for floors the hero has left.
+Nothing runs on an inactive floor, so it costs nothing per turn. When the
+hero comes back, the elapsed turns are applied at once with a coarse model
+instead of turn by turn: monsters heal at a fixed rate and wander like a
+random walk, which after n steps is typically about sqrt(n) steps away.
+The work is bounded by MAX_WANDER, however long the hero was away.
+"""
+import math
+import random
+from collections import deque
+
+# A monster heals 1 HP per HEAL_TURNS turns away (up to max HP)
+HEAL_TURNS = 4
+# Wandering Beholders take two steps per hero turn
+WANDER_STEPS_PER_TURN = 2
+# Farthest walk (in steps) the model moves a monster
+MAX_WANDER = 12
+# Monsters do not end closer than this (Manhattan) to the hero's entry tile
+KEEP_AWAY = 5
+
+
+def heal(monster, turns: int):
+    """Heals a living monster for the elapsed turns."""
+    if monster.is_alive():
+        monster.hp = min(monster.max_hp, monster.hp + turns // HEAL_TURNS)
+
+
+def wander(monster, dungeon, turns: int, entry: tuple[int, int], rng=random):
+    """
+    Moves a living monster to where a random walk of the elapsed turns
+    would typically end: a random tile between radius/2 and radius steps
+    away, radius = sqrt(steps) (capped at MAX_WANDER).
+    """
+    radius = min(MAX_WANDER, math.isqrt(turns * WANDER_STEPS_PER_TURN))
+    if radius == 0 or not monster.is_alive():
+        return
+
+    start = (monster.x, monster.y)
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if distance[(x, y)] == radius:
+            continue
+        for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            nxt = (x + dx, y + dy)
+            if nxt not in distance and dungeon.is_walkable(*nxt):
+                distance[nxt] = distance[(x, y)] + 1
+                queue.append(nxt)
+
+    def safe(tile):
+        return abs(tile[0] - entry[0]) + abs(tile[1] - entry[1]) >= KEEP_AWAY
+
+    candidates = [tile for tile, dist in distance.items()
+                  if dist >= radius // 2 and safe(tile)]
+    if not candidates:
+        candidates = [tile for tile in distance if safe(tile)]
+    if candidates:
+        monster.x, monster.y = rng.choice(candidates)
+
+
+def catch_up(dungeon, monsters, turns: int, entry: tuple[int, int], rng=random):
+    """Applies `turns` turns of absence to the monsters of a floor."""
+    if turns <= 0:
+        return
+    for monster in monsters:
+        heal(monster, turns)
+        wander(monster, dungeon, turns, entry, rng)
@@ -0,0 +1,63 @@
+"""
+Change tracking for dungeon floors.
+Every mutation bumps a version and records the changed cell, so renderers,
+caches and save logic can ask "what changed since version N" instead of
+assuming that everything did.
+"""
+from collections import deque
+
+
+class ChangeLog:
+    """
+    Version counter plus a bounded log of (version, x, y) changes.
+
+    `since(v)` returns the changed cells, or None when the caller has to
+    rebuild everything (the floor was replaced after v, or the log no
+    longer reaches back to v).
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.version = 0
+        self.cells = deque(maxlen=capacity)
+        # Callers holding a version older than this must rebuild
+        self.full_version = 0
+
+    def touch(self, x: int, y: int) -> int:
+        """Records a change of one cell and returns the new version."""
+        if len(self.cells) == self.cells.maxlen:
+            self.full_version = self.cells[0][0]
+        self.version += 1
+        self.cells.append((self.version, x, y))
+        return self.version
+
+    def reset(self) -> int:
+        """Records that the whole floor was replaced."""
+        self.version += 1
+        self.full_version = self.version
+        self.cells.clear()
+        return self.version
+
+    def since(self, version: int):
+        """Set of (x, y) changed after `version`, or None (rebuild all)."""
+        if version < self.full_version:
+            return None
+        changed = set()
+        for cell_version, x, y in reversed(self.cells):
+            if cell_version <= version:
+                break
+            changed.add((x, y))
+        return changed
+
+    def rect_since(self, version: int):
+        """
+        Bounding rectangle (x0, y0, x1, y1) of the cells changed after
+        `version`. Returns () if nothing changed and None to rebuild all.
+        """
+        changed = self.since(version)
+        if changed is None:
+            return None
+        if not changed:
+            return ()
+        xs = [x for x, _ in changed]
+        ys = [y for _, y in changed]
+        return min(xs), min(ys), max(xs), max(ys)
@@ -0,0 +1,435 @@
+"""
+Chunked dungeon module.
+Generates an effectively unbounded floor lazily, one fixed-size chunk at a time.
+
+Every chunk is generated deterministically from (seed, level, chunk x, chunk y),
+so it can be dropped from memory and rebuilt later. Each edge between two chunks
+has one shared "door" tile position; every chunk connects its doors to its own
+center and fills unreachable pockets, which keeps the whole floor connected.
+"""
+import random
+from collections import deque
+from collections.abc import MutableMapping
+
+from kostelnk_dungeon_game.dungeon_core.finds import Weapon, Shield, Potion, Gold
+from kostelnk_dungeon_game.dungeon_core.changelog import ChangeLog
+from kostelnk_dungeon_game.dungeon_core.pathcache import new_floor_id
+
+WALL = "▓"
+FLOOR = "."
+STAIRS = ">"
+
+# Effective size of the world in tiles (per axis)
+WORLD_LIMIT = 2 ** 31
+
+
+def _chunk_rng(seed: int, level: int, *key) -> random.Random:
+    """Deterministic RNG for one chunk or edge (independent of PYTHONHASHSEED)."""
+    value = f"{seed}:{level}:" + ":".join(str(k) for k in key)
+    return random.Random(value)
+
+
+class Chunk:
+    """
+    One generated block of the map.
+    """
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("cx", "cy", "tiles", "items", "modified")
+
+    def __init__(self, cx: int, cy: int, tiles: list[list[str]], items: dict):
+        self.cx = cx
+        self.cy = cy
+        self.tiles = tiles
+        self.items = items
+        self.modified = False
+
+
+class _ChunkedRow:
+    """Row proxy so `dungeon_map[y][x]` works on a chunked floor."""
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("dungeon", "y")
+
+    def __init__(self, dungeon, y):
+        self.dungeon = dungeon
+        self.y = y
+
+    def __getitem__(self, x):
+        return self.dungeon.get_tile(x, self.y)
+
+    def __setitem__(self, x, value):
+        self.dungeon.set_tile(x, self.y, value)
+
+    def __len__(self):
+        return WORLD_LIMIT
+
+
+class ChunkedMap:
+    """
+    Read/write view of a ChunkedDungeon that behaves like `list[list[str]]`
+    for indexing, so Beholder AI and the game loop work unchanged.
+    """
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("dungeon",)
+
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+
+    def __getitem__(self, y):
+        return _ChunkedRow(self.dungeon, y)
+
+    def __len__(self):
+        return WORLD_LIMIT
+
+
+class ChunkedItems(MutableMapping):
+    """
+    Dict-like view of the items on a chunked floor, keyed by (x, y).
+    Iteration covers loaded chunks only.
+    """
+
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+
+    def _chunk(self, pos):
+        x, y = pos
+        size = self.dungeon.chunk_size
+        return self.dungeon.get_chunk(x // size, y // size)
+
+    def __getitem__(self, pos):
+        return self._chunk(pos).items[pos]
+
+    def __setitem__(self, pos, item):
+        chunk = self._chunk(pos)
+        chunk.items[pos] = item
+        chunk.modified = True
+        self.dungeon.changes.touch(*pos)
+
+    def __delitem__(self, pos):
+        chunk = self._chunk(pos)
+        del chunk.items[pos]
+        chunk.modified = True
+        self.dungeon.changes.touch(*pos)
+
+    def __contains__(self, pos):
+        return pos[0] >= 0 and pos[1] >= 0 and pos in self._chunk(pos).items
+
+    def __iter__(self):
+        for chunk in list(self.dungeon.chunks.values()):
+            yield from list(chunk.items)
+
+    def __len__(self):
+        return sum(len(c.items) for c in self.dungeon.chunks.values())
+
+
+class ChunkedDungeon:
+    """
+    Unbounded dungeon floor made of lazily generated chunks.
+    Coordinates are non-negative; row 0 and column 0 are the outer wall.
+    """
+    # pylint: disable=too-many-instance-attributes
+    chunked = True
+
+    def __init__(self, size: tuple[int, int], level: int = 1, seed: int = None,
+                 chunk_size: int = 16, keep_radius: int = 2, max_chunks: int = 64):
+        """
+        Initialize the chunked dungeon.
+        Args:
+            size (tuple[int, int]): Size of the rendered viewport (width, height).
+            level (int): Current difficulty level.
+            seed (int): World seed (random if None).
+            chunk_size (int): Width and height of one chunk in tiles.
+            keep_radius (int): Chunks farther than this from the hero are evicted.
+            max_chunks (int): Upper bound of chunks held in memory at once.
+        """
+        # pylint: disable=too-many-arguments
+        self.size = size
+        self.level = level
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.chunk_size = max(8, chunk_size)
+        self.keep_radius = keep_radius
+        self.max_chunks = max(9, max_chunks)
+        self.chunks: dict[tuple[int, int], Chunk] = {}
+        self.focus = (1, 1)
+        self.dungeon_map = ChunkedMap(self)
+        self.items = ChunkedItems(self)
+        self.stairs_pos = None
+        self.floor_tiles = []
+        self.chunks_generated = 0
+        self._created = False
+        # Evicted chunks regenerate identically, so only edits bump the version
+        self.floor_id = new_floor_id()
+        self.map_version = 0
+        self.changes = ChangeLog()
+        self.save_cache = None
+
+    # --- Generation ---
+
+    def _door(self, kind: str, cx: int, cy: int) -> int:
+        """
+        Local offset of the door on a chunk edge.
+        kind 'v': edge between (cx - 1, cy) and (cx, cy), offset along y.
+        kind 'h': edge between (cx, cy - 1) and (cx, cy), offset along x.
+        """
+        rng = _chunk_rng(self.seed, self.level, kind, cx, cy)
+        return rng.randint(1, self.chunk_size - 2)
+
+    def _carve_to_center(self, tiles, lx, ly):
+        """Carves an L-shaped corridor from (lx, ly) to the chunk center."""
+        center = self.chunk_size // 2
+        step = 1 if center > lx else -1
+        for x in range(lx, center + step, step):
+            tiles[ly][x] = FLOOR
+        step = 1 if center > ly else -1
+        for y in range(ly, center + step, step):
+            tiles[y][center] = FLOOR
+
+    def _generate_chunk(self, cx: int, cy: int) -> Chunk:
+        """Builds one chunk from (seed, level, cx, cy) only."""
+        # pylint: disable=too-many-locals,too-many-branches
+        size = self.chunk_size
+        rng = _chunk_rng(self.seed, self.level, "chunk", cx, cy)
+
+        # 1. Noise (20% walls, like the classic generator)
+        tiles = [[WALL if rng.random() < 0.2 else FLOOR for _ in range(size)]
+                 for _ in range(size)]
+
+        # 2. Doors towards neighbours, each connected to the center
+        doors = []
+        if cx > 0:
+            doors.append((0, self._door("v", cx, cy)))
+        doors.append((size - 1, self._door("v", cx + 1, cy)))
+        if cy > 0:
+            doors.append((self._door("h", cx, cy), 0))
+        doors.append((self._door("h", cx, cy + 1), size - 1))
+        if cx == 0 and cy == 0:
+            doors.append((1, 1))  # hero start
+            tiles[1][2] = FLOOR
+            tiles[2][1] = FLOOR
+        for lx, ly in doors:
+            self._carve_to_center(tiles, lx, ly)
+
+        # 3. Outer world wall
+        if cx == 0:
+            for row in tiles:
+                row[0] = WALL
+        if cy == 0:
+            tiles[0] = [WALL] * size
+
+        # 4. Local flood fill from the center; pockets become walls
+        center = size // 2
+        reachable = {(center, center)}
+        queue = deque([(center, center)])
+        while queue:
+            x, y = queue.popleft()
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if (0 <= nx < size and 0 <= ny < size and (nx, ny) not in reachable
+                        and tiles[ny][nx] != WALL):
+                    reachable.add((nx, ny))
+                    queue.append((nx, ny))
+        for y in range(size):
+            for x in range(size):
+                if tiles[y][x] != WALL and (x, y) not in reachable:
+                    tiles[y][x] = WALL
+
+        # 5. Stairs in roughly one of six chunks (never in the start chunk)
+        if (cx, cy) != (0, 0) and rng.random() < 1 / 6:
+            tiles[center][center] = STAIRS
+
+        # 6. Items and gold
+        items = {}
+        free = [(x, y) for (x, y) in reachable if tiles[y][x] == FLOOR]
+        free.sort()
+        free_count = min(len(free), self.level + rng.randint(0, 2))
+        for lx, ly in rng.sample(free, free_count):
+            items[(cx * size + lx, cy * size + ly)] = self._random_item(rng)
+        items.pop((1, 1), None)
+
+        self.chunks_generated += 1
+        return Chunk(cx, cy, tiles, items)
+
+    @staticmethod
+    def _random_item(rng: random.Random):
+        """Picks one item using the chunk RNG."""
+        roll = rng.random()
+        if roll < 0.5:
+            return Gold(rng.randint(10, 50))
+        if roll < 0.6:
+            return Weapon("Iron Sword", attack_bonus=3, weight=4)
+        if roll < 0.7:
+            return Shield("Wooden Shield", defense_bonus=2, weight=3)
+        if roll < 0.85:
+            return Potion("Health Potion", effect_type="hp")
+        return Potion("Stamina Potion", effect_type="stamina")
+
+    def create_dungeon(self):
+        """
+        Starts the floor: only the chunks around the start are generated.
+        Calling it again (map regeneration) re-rolls the world seed.
+        """
+        if self._created:
+            self.seed = random.randrange(2 ** 32)
+        self._created = True
+        self.chunks = {}
+        self.map_version += 1
+        self.changes.reset()
+        self.focus = self.get_valid_start_position()
+
+        self.floor_tiles = []
+        for cy in range(2):
+            for cx in range(2):
+                chunk = self.get_chunk(cx, cy)
+                base_x, base_y = cx * self.chunk_size, cy * self.chunk_size
+                for ly, row in enumerate(chunk.tiles):
+                    for lx, tile in enumerate(row):
+                        pos = (base_x + lx, base_y + ly)
+                        if tile == FLOOR and pos not in chunk.items and pos != (1, 1):
+                            self.floor_tiles.append(pos)
+
+    # --- Chunk management ---
+
+    def get_chunk(self, cx: int, cy: int) -> Chunk:
+        """Returns a chunk, generating it on first use."""
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None:
+            if len(self.chunks) >= self.max_chunks:
+                self._evict(limit=self.max_chunks - 1)
+            chunk = self._generate_chunk(cx, cy)
+            self.chunks[(cx, cy)] = chunk
+        return chunk
+
+    def _chunk_distance(self, key) -> int:
+        fx, fy = self.focus[0] // self.chunk_size, self.focus[1] // self.chunk_size
+        return max(abs(key[0] - fx), abs(key[1] - fy))
+
+    def _evict(self, limit: int = None):
+        """
+        Drops unmodified chunks outside keep_radius of the focus.
+        With a limit, also drops the farthest unmodified chunks until at most
+        `limit` remain. Modified chunks are kept, they cannot be regenerated.
+        """
+        for key in [k for k, c in self.chunks.items()
+                    if not c.modified and self._chunk_distance(k) > self.keep_radius]:
+            del self.chunks[key]
+
+        if limit is not None and len(self.chunks) > limit:
+            candidates = sorted((k for k, c in self.chunks.items() if not c.modified),
+                                key=self._chunk_distance, reverse=True)
+            for key in candidates[:len(self.chunks) - limit]:
+                del self.chunks[key]
+
+    def set_focus(self, x: int, y: int):
+        """Moves the area of interest (the hero) and evicts distant chunks."""
+        old = (self.focus[0] // self.chunk_size, self.focus[1] // self.chunk_size)
+        self.focus = (x, y)
+        if (x // self.chunk_size, y // self.chunk_size) != old:
+            self._evict()
+
+    # --- Tiles and items ---
+
+    def get_tile(self, x: int, y: int) -> str:
+        """Returns the tile at world coordinates (walls outside the world)."""
+        if x < 0 or y < 0:
+            return WALL
+        size = self.chunk_size
+        return self.get_chunk(x // size, y // size).tiles[y % size][x % size]
+
+    def set_tile(self, x: int, y: int, value: str):
+        """Changes a tile; the chunk is then kept in memory."""
+        size = self.chunk_size
+        chunk = self.get_chunk(x // size, y // size)
+        chunk.tiles[y % size][x % size] = value
+        chunk.modified = True
+        self.map_version += 1
+        self.changes.touch(x, y)
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """
+        Checks if a tile is walkable.
+        """
+        return self.get_tile(x, y) != WALL
+
+    def get_item_at(self, x: int, y: int):
+        """
+        Retrieves and removes an item at the given coordinates.
+        Returns None if no item is present.
+        """
+        return self.take_item(x, y)
+
+    @property
+    def version(self) -> int:
+        """Version of the floor state (tiles and items)."""
+        return self.changes.version
+
+    def changes_since(self, version: int):
+        """Cells changed after `version`, or None if everything must be rebuilt."""
+        return self.changes.since(version)
+
+    def place_item(self, x: int, y: int, item):
+        """Puts an item on the floor (replacing any item already there)."""
+        self.items[(x, y)] = item
+
+    def take_item(self, x: int, y: int):
+        """Removes and returns the item at (x, y), or None."""
+        if (x, y) in self.items:
+            return self.items.pop((x, y))
+        return None
+
+    def viewport(self, center_x: int, center_y: int):
+        """
+        Returns (origin_x, origin_y, rows, items) of the `size` window around
+        a point, generating chunks inside it as needed. Used by the Renderer.
+        """
+        self.set_focus(center_x, center_y)
+        width, height = self.size
+        x0 = max(0, center_x - width // 2)
+        y0 = max(0, center_y - height // 2)
+        rows = [[self.get_tile(x, y) for x in range(x0, x0 + width)]
+                for y in range(y0, y0 + height)]
+
+        items = {}
+        size = self.chunk_size
+        for cy in range(y0 // size, (y0 + height - 1) // size + 1):
+            for cx in range(x0 // size, (x0 + width - 1) // size + 1):
+                items.update(self.get_chunk(cx, cy).items)
+        return x0, y0, rows, items
+
+    @staticmethod
+    def get_valid_start_position():
+        """
+        Returns (1, 1) as requested for all levels.
+        """
+        return 1, 1
+
+    # --- Persistence ---
+
+    def to_save_data(self, item_saver) -> dict:
+        """Seed plus the modified chunks; everything else is regenerated."""
+        return {
+            "chunked": True,
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+            "modified": [
+                {"cx": c.cx, "cy": c.cy, "tiles": ["".join(r) for r in c.tiles],
+                 "items": [(x, y, item_saver(item)) for (x, y), item in c.items.items()]}
+                for c in self.chunks.values() if c.modified
+            ],
+        }
+
+    def load_save_data(self, data: dict, item_loader):
+        """Restores the world from `to_save_data` output."""
+        self.seed = data["seed"]
+        self.chunk_size = data["chunk_size"]
+        self._created = True
+        self.chunks = {}
+        self.map_version += 1
+        self.changes.reset()
+        for entry in data["modified"]:
+            items = {}
+            for x, y, item_data in entry["items"]:
+                item = item_loader(item_data)
+                if item:
+                    items[(x, y)] = item
+            chunk = Chunk(entry["cx"], entry["cy"],
+                          [list(row) for row in entry["tiles"]], items)
+            chunk.modified = True
+            self.chunks[(chunk.cx, chunk.cy)] = chunk
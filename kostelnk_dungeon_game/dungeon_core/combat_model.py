@@ -0,0 +1,183 @@
+"""
+Analytic combat model: win probability and expected HP loss of a hero
+loadout against a Beholder of a given level, without playing the fight.
+
+The fight is an absorbing Markov chain over the hero's HP. The hero walks up
+to the Beholder along a straight corridor and attacks, resting whenever the
+next action would leave less stamina than the equipment weighs (the game
+drops equipped items then). The Beholder uses its default priorities: a
+bite when adjacent, otherwise a firebolt in range (1d6 + level * 2) with a
+step closer, otherwise two steps. Hero actions depend on stamina and
+distance, not on HP, so the order of attacks, rests, bites and firebolts is
+fixed; only the firebolt dice are random. The chain's absorption
+probabilities are therefore read off the distribution of the firebolt sum.
+
+    estimate(level, attack=8, armed=True, load=4)   # Iron Sword
+    estimate_for(hero, level)                       # a Hero's current loadout
+
+Results are cached, so balance tables cost microseconds per entry:
+    python -m kostelnk_dungeon_game.dungeon_core.combat_model
+"""
+import copy
+from functools import lru_cache
+from typing import NamedTuple
+
+from kostelnk_dungeon_game.dungeon_core.beholder import Beholder, ATTACK_COST, MOVE_COST
+from kostelnk_dungeon_game.dungeon_core.finds import Shield, Weapon
+from kostelnk_dungeon_game.dungeon_core.hero import Hero
+
+FIREBOLT_RANGE = 5
+ATTACK_STAMINA = 2
+REST_STAMINA = 15
+# Fights longer than this are treated as a stalemate
+MAX_TURNS = 10000
+
+# Equipment generated on the floors (see Dungeon._generate_items)
+LOADOUTS = {
+    "bare hands": (),
+    "Iron Sword": (Weapon("Iron Sword", attack_bonus=3, weight=4),),
+    "Wooden Shield": (Shield("Wooden Shield", defense_bonus=2, weight=3),),
+    "Sword + Shield": (Weapon("Iron Sword", attack_bonus=3, weight=4),
+                       Shield("Wooden Shield", defense_bonus=2, weight=3)),
+}
+
+
+class CombatEstimate(NamedTuple):
+    """Outcome of a fight as predicted by the model."""
+    win_probability: float
+    expected_hp_loss: float  # HP lost, counting a defeat as all of it
+    turns: int               # hero turns until the Beholder dies (0 = never)
+    firebolts: int           # firebolts taken before the kill
+    bites: int               # bites taken before the kill
+    sure_win_hp: int         # HP that wins whatever the dice (0 = cannot win)
+
+
+@lru_cache(maxsize=None)
+def _dice_sum_counts(dice: int) -> tuple:
+    """counts[s] = ways `dice` six-sided dice sum to s."""
+    counts = [1]
+    for _ in range(dice):
+        rolled = [0] * (len(counts) + 6)
+        for total, ways in enumerate(counts):
+            if ways:
+                for face in range(1, 7):
+                    rolled[total + face] += ways
+        counts = rolled
+    return tuple(counts)
+
+
+@lru_cache(maxsize=4096)
+def _fight_script(level, hero_damage, load, stamina, max_stamina, distance):
+    """
+    Plays the fixed order of actions. Returns (turns, firebolts, bites) up to
+    the killing blow, or None if the hero never hurts the Beholder.
+    """
+    # pylint: disable=too-many-arguments
+    if not hero_damage or max_stamina - ATTACK_STAMINA < load:
+        return None
+    beholder = Beholder(0, 0, level=level)
+    beholder_hp = beholder.max_hp
+    move_cost = 1 + load
+    firebolts = bites = 0
+    for turn in range(1, MAX_TURNS + 1):
+        # Hero
+        if distance == 1 and hero_damage and stamina - ATTACK_STAMINA >= load:
+            stamina -= ATTACK_STAMINA
+            beholder_hp -= hero_damage
+            if beholder_hp <= 0:
+                return turn, firebolts, bites
+        elif distance > 1 and stamina - move_cost >= load:
+            stamina -= move_cost
+            distance -= 1
+        else:
+            # Rest (or wait, if nothing else can be done)
+            stamina = min(max_stamina, stamina + REST_STAMINA)
+
+        # Beholder (one hero turn worth of energy; attacks need ATTACK_COST left)
+        energy = beholder.speed
+        while energy > 0:
+            if energy >= ATTACK_COST and distance == 1:
+                bites += 1
+                energy -= ATTACK_COST
+            elif energy >= ATTACK_COST and distance <= FIREBOLT_RANGE:
+                firebolts += 1
+                if distance > 2:
+                    distance -= 1
+                energy -= ATTACK_COST
+            else:
+                distance = max(1, distance - 1)
+                energy -= MOVE_COST
+    return None
+
+
+@lru_cache(maxsize=65536)
+def estimate(level: int, attack: int = 5, defense: int = 0, armed: bool = False,
+             load: int = 0, hp: int = 100, stamina: int = 50, max_stamina: int = 50,
+             distance: int = FIREBOLT_RANGE) -> CombatEstimate:
+    """
+    Predicts a fight against a Beholder of `level` (stats from its constructor).
+    attack/defense/load are the hero's totals with the equipment worn; armed
+    says whether a weapon or shield is worn (from level 3 the Beholder is
+    immune to bare hands); distance is where the Beholder is first seen.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    beholder = Beholder(0, 0, level=level)
+    bite = max(0, beholder.attack_power - defense)
+    hero_damage = beholder.hit_damage(attack, armed)
+
+    script = _fight_script(level, hero_damage, load, stamina, max_stamina, max(1, distance))
+    if script is None:
+        return CombatEstimate(0.0, float(hp), 0, 0, 0, 0)
+    turns, firebolts, bites = script
+
+    # Damage before the kill = fixed part + sum of `firebolts` d6
+    fixed = bites * bite + firebolts * level * 2
+    counts = _dice_sum_counts(firebolts)
+    outcomes = 6 ** firebolts
+    wins = 0
+    lost = 0.0
+    for rolled, ways in enumerate(counts):
+        if ways:
+            damage = fixed + rolled
+            if damage < hp:
+                wins += ways
+                lost += ways * damage
+            else:
+                lost += ways * hp
+    return CombatEstimate(wins / outcomes, lost / outcomes, turns, firebolts, bites,
+                          fixed + 6 * firebolts + 1)
+
+
+def estimate_for(hero, level: int, distance: int = FIREBOLT_RANGE) -> CombatEstimate:
+    """Predicts a fight for a Hero's current HP, stamina and equipped items."""
+    return estimate(level, hero.attack, hero.defense, hero.armed, hero.current_load,
+                    hero.hp, hero.stamina, hero.max_stamina, distance)
+
+
+def loadout_hero(items) -> Hero:
+    """A fresh hero wearing copies of the given items (the originals are not changed)."""
+    hero = Hero(0, 0)
+    for item in items:
+        worn = copy.copy(item)
+        worn.equipped = True
+        hero.add_item(worn)
+    return hero
+
+
+def balance_table(levels=range(1, 8)):
+    """Rows of (loadout name, level, CombatEstimate) for every loadout and level."""
+    heroes = {name: loadout_hero(items) for name, items in LOADOUTS.items()}
+    return [(name, level, estimate_for(hero, level))
+            for name, hero in heroes.items() for level in levels]
+
+
+def main():
+    """Prints the balance table."""
+    print(f"{'loadout':<16}{'level':>6}{'win':>8}{'HP loss':>9}{'turns':>7}{'HP to win':>11}")
+    for name, level, result in balance_table():
+        print(f"{name:<16}{level:>6}{result.win_probability:>8.1%}"
+              f"{result.expected_hp_loss:>9.1f}{result.turns:>7}{result.sure_win_hp or '-':>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Connectivity index for dungeon floors.
+A disjoint-set (union-find) forest over walkable tiles that answers
+"is A reachable from B" in near-O(1) and follows map edits incrementally.
+"""
+from collections import deque
+
+WALL = "▓"
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+
+class ConnectivityIndex:
+    """
+    Union-find over walkable tiles.
+
+    - Opening a tile (digging) unions it with its walkable neighbours.
+    - Closing a tile (building a wall) can split a region; only the tiles of
+      that one region are re-partitioned, the rest of the map is untouched.
+    """
+
+    def __init__(self):
+        self.parent: dict[tuple[int, int], tuple[int, int]] = {}
+        # Root -> list of tiles in its set (merged small-into-large)
+        self.members: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        self.local_rebuilds = 0
+
+    @classmethod
+    def from_region(cls, tiles, root: tuple[int, int]):
+        """Index for tiles already known to form one connected region."""
+        index = cls()
+        tiles = list(tiles)
+        index.parent = dict.fromkeys(tiles, root)
+        index.parent[root] = root
+        index.members[root] = tiles if root in tiles else tiles + [root]
+        return index
+
+    @classmethod
+    def from_map(cls, dungeon_map: list[list[str]]):
+        """Builds the index for an arbitrary map in one pass."""
+        index = cls()
+        for y, row in enumerate(dungeon_map):
+            for x, tile in enumerate(row):
+                if tile == WALL:
+                    continue
+                index.add((x, y))
+                if x > 0 and row[x - 1] != WALL:
+                    index.union((x, y), (x - 1, y))
+                if y > 0 and dungeon_map[y - 1][x] != WALL:
+                    index.union((x, y), (x, y - 1))
+        return index
+
+    def __contains__(self, pos) -> bool:
+        return pos in self.parent
+
+    def add(self, pos: tuple[int, int]):
+        """Adds a tile as its own region."""
+        if pos not in self.parent:
+            self.parent[pos] = pos
+            self.members[pos] = [pos]
+
+    def find(self, pos: tuple[int, int]) -> tuple[int, int]:
+        """Returns the region root of a tile (with path halving)."""
+        parent = self.parent
+        while parent[pos] != pos:
+            parent[pos] = parent[parent[pos]]
+            pos = parent[pos]
+        return pos
+
+    def union(self, a: tuple[int, int], b: tuple[int, int]):
+        """Merges the regions of two tiles."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if len(self.members[root_a]) < len(self.members[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.members[root_a].extend(self.members.pop(root_b))
+
+    def connected(self, a: tuple[int, int], b: tuple[int, int]) -> bool:
+        """True if both tiles are walkable and in the same region."""
+        if a not in self.parent or b not in self.parent:
+            return False
+        return self.find(a) == self.find(b)
+
+    def region_size(self, pos: tuple[int, int]) -> int:
+        """Number of tiles reachable from pos (0 for walls)."""
+        if pos not in self.parent:
+            return 0
+        return len(self.members[self.find(pos)])
+
+    def open_tile(self, pos: tuple[int, int]):
+        """Call after a wall at pos was removed."""
+        self.add(pos)
+        x, y = pos
+        for dx, dy in DIRECTIONS:
+            if (x + dx, y + dy) in self.parent:
+                self.union(pos, (x + dx, y + dy))
+
+    def close_tile(self, pos: tuple[int, int]):
+        """
+        Call after a wall was placed at pos.
+        Re-partitions only the region that contained pos.
+        """
+        if pos not in self.parent:
+            return
+        region = self.members.pop(self.find(pos))
+        for tile in region:
+            del self.parent[tile]
+        self.local_rebuilds += 1
+
+        remaining = set(region)
+        remaining.discard(pos)
+        while remaining:
+            start = remaining.pop()
+            self.parent[start] = start
+            component = [start]
+            queue = deque([start])
+            while queue:
+                cx, cy = queue.popleft()
+                for dx, dy in DIRECTIONS:
+                    nxt = (cx + dx, cy + dy)
+                    if nxt in remaining:
+                        remaining.discard(nxt)
+                        self.parent[nxt] = start
+                        component.append(nxt)
+                        queue.append(nxt)
+            self.members[start] = component
@@ -1,201 +1,462 @@
-"""
-Dungeon generation module using Random Noise.
-"""
-import random
-from collections import deque
-from kostelnk_dungeon_game.dungeon_core.finds import Weapon, Shield, Potion, Gold
-
-
-class Dungeon:
-    """
-    Represents the dungeon map, handling generation, layout, and item placement.
-    """
-    def __init__(self, size: tuple[int, int], level: int = 1):
-        """
-        Initialize the Dungeon.
-        Args:
-            size (tuple[int, int]): Dimensions of the dungeon (width, height).
-            level (int): Current difficulty level (affects item spawning).
-        """
-        self.size = size
-        self.level = level
-        self.dungeon_map = []
-        self.items = {}
-        self.stairs_pos = None
-        self.floor_tiles = []  # List of valid, REACHABLE floor coordinates
-
-    def _generate_noise_map(self, width, height):
-        """Generates the initial map using random noise."""
-        self.dungeon_map = []
-        for y in range(height):
-            row = []
-            for x in range(width):
-                # Borders are always walls
-                if x == 0 or y == 0 or x == width - 1 or y == height - 1:
-                    row.append("▓")
-                else:
-                    # 20% chance of a wall
-                    if random.random() < 0.2:
-                        row.append("▓")
-                    else:
-                        row.append(".")
-            self.dungeon_map.append(row)
-
-    def _clear_start_area(self, width, height):
-        """Ensures the starting area (1,1) and neighbors are clear."""
-        if width > 1 and height > 1:
-            self.dungeon_map[1][1] = "."
-            # Clear neighbors to ensure immediate movement
-            if width > 2:
-                self.dungeon_map[1][2] = "."
-            if height > 2:
-                self.dungeon_map[2][1] = "."
-
-    def _get_reachable_tiles(self, width, height):
-        """Performs BFS to find all reachable tiles from (1,1)."""
-        reachable = set()
-        queue = deque([(1, 1)])
-        visited = {(1, 1)}
-
-        while queue:
-            cx, cy = queue.popleft()
-            reachable.add((cx, cy))
-
-            # Check 4 directions
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nx, ny = cx + dx, cy + dy
-                # Check bounds
-                if 0 <= ny < height and 0 <= nx < width:
-                    # If it's a floor and not visited
-                    if self.dungeon_map[ny][nx] == "." and (nx, ny) not in visited:
-                        visited.add((nx, ny))
-                        queue.append((nx, ny))
-        return reachable
-
-    def _place_stairs(self):
-        """Places stairs at the furthest reachable point."""
-        best_stairs_cand = None
-        max_dist = -1
-
-        for (tx, ty) in self.floor_tiles:
-            dist = tx + ty  # Simple distance metric from (1,1)
-            if dist > max_dist:
-                max_dist = dist
-                best_stairs_cand = (tx, ty)
-
-        if best_stairs_cand:
-            sx, sy = best_stairs_cand
-            self.dungeon_map[sy][sx] = ">"
-            self.stairs_pos = (sx, sy)
-            self.floor_tiles.remove((sx, sy))
-
-    def create_dungeon(self):
-        """
-        Generates a map using random noise and ensures connectivity using Flood Fill.
-        """
-        width, height = self.size
-        self.items = {}
-        self.floor_tiles = []
-
-        # 1. Map Generation
-        self._generate_noise_map(width, height)
-
-        # 2. Enforce Start Position
-        self._clear_start_area(width, height)
-
-        # 3. Ensure Connectivity (Flood Fill)
-        reachable = self._get_reachable_tiles(width, height)
-
-        # If the map is too small (bad generation), regenerate!
-        if len(reachable) < 10:
-            return self.create_dungeon()
-
-        # 4. Clean up unreachable areas
-        for y in range(height):
-            for x in range(width):
-                if self.dungeon_map[y][x] == "." and (x, y) not in reachable:
-                    self.dungeon_map[y][x] = "▓"
-
-        # 5. Populate valid floor tiles list
-        self.floor_tiles = list(reachable)
-
-        # Remove (1, 1) from potential item spawn locations (player starts here)
-        if (1, 1) in self.floor_tiles:
-            self.floor_tiles.remove((1, 1))
-
-        # 6. Place Stairs
-        self._place_stairs()
-
-        # 7. Generate Items and Gold
-        self._generate_items()
-        return None
-
-    def _generate_items(self):
-        """
-        Spawns weapons, shields, potions, and gold on valid floor tiles.
-        """
-        if self.level == 1:
-            item_count = 1
-        elif self.level == 2:
-            item_count = 2
-        else:
-            item_count = 3
-
-        possible_items = [
-            Weapon("Iron Sword", attack_bonus=3, weight=4),
-            Shield("Wooden Shield", defense_bonus=2, weight=3),
-            Potion("Health Potion", effect_type="hp"),
-            Potion("Stamina Potion", effect_type="stamina")
-        ]
-
-        # Spawn Equipment/Potions
-        for _ in range(item_count):
-            if not self.floor_tiles:
-                break
-            ix, iy = random.choice(self.floor_tiles)
-
-            if (ix, iy) not in self.items:
-                tmpl = random.choice(possible_items)
-                if isinstance(tmpl, Weapon):
-                    item = Weapon(tmpl.name, tmpl.attack_bonus, tmpl.weight)
-                elif isinstance(tmpl, Shield):
-                    item = Shield(tmpl.name, tmpl.defense_bonus, tmpl.weight)
-                else:
-                    item = Potion(tmpl.name, tmpl.effect_type)
-
-                self.items[(ix, iy)] = item
-                self.floor_tiles.remove((ix, iy))
-
-        # Spawn Gold
-        for _ in range(random.randint(1, 3)):
-            if not self.floor_tiles:
-                break
-            ix, iy = random.choice(self.floor_tiles)
-
-            if (ix, iy) not in self.items:
-                self.items[(ix, iy)] = Gold(random.randint(10, 50))
-                self.floor_tiles.remove((ix, iy))
-
-    def is_walkable(self, x: int, y: int) -> bool:
-        """
-        Checks if a tile is walkable.
-        """
-        if not (0 <= y < len(self.dungeon_map) and 0 <= x < len(self.dungeon_map[0])):
-            return False
-        return self.dungeon_map[y][x] != "▓"
-
-    def get_item_at(self, x: int, y: int):
-        """
-        Retrieves and removes an item from the map at the given coordinates.
-        Returns None if no item is present.
-        """
-        if (x, y) in self.items:
-            return self.items.pop((x, y))
-        return None
-
-    @staticmethod
-    def get_valid_start_position():
-        """
-        Returns (1, 1) as requested for all levels.
-        """
-        return 1, 1
+"""
+Dungeon generation module. The walls come from a layout generator
+(layouts.py); connectivity, stairs and items are added here.
+"""
+import random
+import time
+from collections import deque
+from kostelnk_dungeon_game.dungeon_core.finds import Weapon, Shield, Potion, Gold
+from kostelnk_dungeon_game.dungeon_core.changelog import ChangeLog
+from kostelnk_dungeon_game.dungeon_core.connectivity import ConnectivityIndex
+from kostelnk_dungeon_game.dungeon_core.layouts import (
+    FALLBACKS, LAYOUTS, BudgetExceeded, GenerationReport, layout_for_level, run_layout
+)
+from kostelnk_dungeon_game.dungeon_core.metrics import REGISTRY
+from kostelnk_dungeon_game.dungeon_core.pathcache import new_floor_id
+
+GENERATION_SECONDS = REGISTRY.histogram(
+    "dungeon_floor_generation_seconds", "Time to generate one floor (create_dungeon).")
+
+# Minimum walking distance between the hero start and the Beholder spawn
+SAFE_SPAWN_DISTANCE = 5
+# Stairs back up, put on the start tile of every floor below the first
+UP_STAIRS = "<"
+
+
+class FloorAnalysis:
+    """
+    Results of the generation flood fill, measured by walking distance from
+    the start tile. Tiles are stored in BFS order, which is sorted by distance.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, origin: tuple[int, int]):
+        self.origin = origin
+        self.distance: dict[tuple[int, int], int] = {}
+        self.order: list[tuple[int, int]] = []
+        # first_index[d] = position in `order` of the first tile at distance d
+        self.first_index: list[int] = []
+        self.dead_ends: list[tuple[int, int]] = []   # one walkable neighbour
+        self.chokepoints: list[tuple[int, int]] = []  # straight 1-wide corridor
+
+    @property
+    def farthest(self) -> tuple[int, int]:
+        """Tile with the longest walking distance from the origin."""
+        return self.order[-1]
+
+    @property
+    def max_distance(self) -> int:
+        """Walking distance of the farthest tile."""
+        return len(self.first_index) - 1
+
+    def index_at_distance(self, min_distance: int) -> int:
+        """Position in `order` from which all tiles are at least min_distance away."""
+        if min_distance >= len(self.first_index):
+            return len(self.order)
+        return self.first_index[max(0, min_distance)]
+
+
+class Dungeon:
+    """
+    Represents the dungeon map, handling generation, layout, and item placement.
+    Changes after generation go through set_tile / place_item / take_item /
+    load_state, which record them in `changes`.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, size: tuple[int, int], level: int = 1, seed: int = None,
+                 layout: str = None):
+        """
+        Initialize the Dungeon.
+        Args:
+            size (tuple[int, int]): Dimensions of the dungeon (width, height).
+            level (int): Current difficulty level (affects item spawning).
+            seed (int): Seed of the floor generator (random if None).
+            layout (str): Layout generator to use without a time budget
+                (None = the level's layout, see layouts.py).
+        """
+        self.size = size
+        self.level = level
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.dungeon_map = []
+        self.items = {}
+        self.stairs_pos = None
+        self.floor_tiles = []  # List of valid, REACHABLE floor coordinates
+        self.connectivity = ConnectivityIndex()
+        self.analysis = None  # FloorAnalysis of the generated floor
+        # Identify the floor layout for caches; map_version changes with tiles
+        self.floor_id = new_floor_id()
+        self.map_version = 0
+        self.changes = ChangeLog()
+        # Version right after generation from `seed` (None = not reproducible)
+        self.base_version = None
+        self.save_cache = None  # (version, serialized floor) kept by save_load
+        # Rows written since the last snapshot (None = no snapshot shares rows)
+        self.owned_rows = None
+        self.layout = layout
+        self.generation = None  # GenerationReport of the last create_dungeon
+
+    def _generate_layout(self, width, height):
+        """
+        Draws the walls with the level's layout generator. If it runs out of
+        its time budget, the floor is drawn with its fallback from a fresh
+        generator seeded the same way, so Dungeon(seed=..., layout=report.layout)
+        generates the same floor again.
+        """
+        requested = self.layout or layout_for_level(self.level)
+        budget = None if self.layout else LAYOUTS[requested].budget
+        start = time.perf_counter()
+        try:
+            self.dungeon_map, elapsed = run_layout(requested, width, height, self.rng, budget)
+            self.generation = GenerationReport(requested, requested, elapsed, False)
+            return
+        except BudgetExceeded:
+            FALLBACKS.inc()
+        fallback = LAYOUTS[requested].fallback
+        self.rng = random.Random(self.seed)
+        # Retries of this floor stay on the fallback
+        self.layout = fallback
+        self.dungeon_map, _ = run_layout(fallback, width, height, self.rng)
+        self.generation = GenerationReport(requested, fallback,
+                                           time.perf_counter() - start, True)
+
+    def _clear_start_area(self, width, height):
+        """Ensures the starting area (1,1) and neighbors are clear."""
+        if width > 1 and height > 1:
+            self.dungeon_map[1][1] = "."
+            # Clear neighbors to ensure immediate movement
+            if width > 2:
+                self.dungeon_map[1][2] = "."
+            if height > 2:
+                self.dungeon_map[2][1] = "."
+
+    def _analyze_floor(self, width, height):
+        """
+        Performs BFS from (1,1) to find all reachable tiles.
+        The same pass records walking distances, dead ends and chokepoints.
+        """
+        analysis = FloorAnalysis((1, 1))
+        distance = analysis.distance
+        distance[(1, 1)] = 0
+        queue = deque([(1, 1)])
+
+        while queue:
+            cx, cy = queue.popleft()
+            dist = distance[(cx, cy)]
+            if dist == len(analysis.first_index):
+                analysis.first_index.append(len(analysis.order))
+            analysis.order.append((cx, cy))
+
+            # Check 4 directions
+            open_sides = []
+            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                nx, ny = cx + dx, cy + dy
+                # Check bounds
+                if 0 <= ny < height and 0 <= nx < width:
+                    # If it's a floor (or the stairs) and not visited
+                    if self.dungeon_map[ny][nx] != "▓":
+                        open_sides.append((dx, dy))
+                        if (nx, ny) not in distance:
+                            distance[(nx, ny)] = dist + 1
+                            queue.append((nx, ny))
+
+            if len(open_sides) == 1:
+                analysis.dead_ends.append((cx, cy))
+            elif len(open_sides) == 2 and open_sides[0][0] == -open_sides[1][0] \
+                    and open_sides[0][1] == -open_sides[1][1]:
+                analysis.chokepoints.append((cx, cy))
+        return analysis
+
+    def _place_stairs(self):
+        """Places stairs at the furthest reachable point (by walking distance)."""
+        if self.analysis is None or len(self.analysis.order) < 2:
+            return
+        sx, sy = self.analysis.farthest
+        self.dungeon_map[sy][sx] = ">"
+        self.stairs_pos = (sx, sy)
+
+    def create_dungeon(self):
+        """
+        Generates a map using random noise and ensures connectivity using Flood Fill.
+        The same seed and layout always give the same floor.
+        """
+        start = time.perf_counter()
+        self.rng = random.Random(self.seed)
+        layout = self.layout
+        self._build_floor()
+        self.layout = layout
+        GENERATION_SECONDS.observe(time.perf_counter() - start)
+
+    def _build_floor(self):
+        """Draws the walls, stairs and items of a new floor from self.rng."""
+        width, height = self.size
+        self.items = {}
+        self.floor_tiles = []
+        self.map_version += 1
+        self.owned_rows = None
+
+        # 1. Map Generation
+        self._generate_layout(width, height)
+
+        # 2. Enforce Start Position
+        self._clear_start_area(width, height)
+
+        # 3. Ensure Connectivity (Flood Fill + distance field)
+        analysis = self._analyze_floor(width, height)
+        reachable = analysis.distance
+
+        # If the map is too small (bad generation), regenerate!
+        if len(reachable) < 10:
+            return self._build_floor()
+        self.analysis = analysis
+
+        # 4. Clean up unreachable areas
+        for y in range(height):
+            for x in range(width):
+                if self.dungeon_map[y][x] == "." and (x, y) not in reachable:
+                    self.dungeon_map[y][x] = "▓"
+
+        # Everything left is one region, so the index needs no extra pass
+        self.connectivity = ConnectivityIndex.from_region(reachable, (1, 1))
+
+        # 5. Place Stairs
+        self._place_stairs()
+
+        # 6. Populate valid floor tiles list
+        # BFS order starts at (1, 1) (player starts here) and ends at the stairs
+        self.floor_tiles = analysis.order[1:-1]
+
+        # 7. Generate Items and Gold
+        self._generate_items()
+        self.base_version = self.changes.reset()
+        return None
+
+    def load_from_bank(self, bank, index: int = None):
+        """
+        Takes a pre-generated floor of this size and level from a FloorBank
+        (game_io/floorbank.py) instead of generating one. The tiles are read
+        from the bank's shared memory map until they are changed.
+        """
+        entry = bank.pick(self.size, self.level, index, self.rng)
+        self.seed = entry.seed
+        self.dungeon_map = bank.tiles(entry)
+        self.items = bank.items(entry)
+        self.stairs_pos = None if entry.stairs_x < 0 else (entry.stairs_x, entry.stairs_y)
+        self.map_version += 1
+        self.save_cache = None
+        self.owned_rows = None
+
+        analysis = bank.analysis(entry)
+        self.analysis = analysis
+        self.connectivity = ConnectivityIndex.from_region(analysis.distance, (1, 1))
+        self.floor_tiles = [tile for tile in analysis.order[1:]
+                            if tile != self.stairs_pos and tile not in self.items]
+        self.base_version = self.changes.reset()
+
+    def _generate_items(self):
+        """
+        Spawns weapons, shields, potions, and gold on valid floor tiles.
+        """
+        if self.level == 1:
+            item_count = 1
+        elif self.level == 2:
+            item_count = 2
+        else:
+            item_count = 3
+
+        possible_items = [
+            Weapon("Iron Sword", attack_bonus=3, weight=4),
+            Shield("Wooden Shield", defense_bonus=2, weight=3),
+            Potion("Health Potion", effect_type="hp"),
+            Potion("Stamina Potion", effect_type="stamina")
+        ]
+
+        # Spawn Equipment/Potions
+        for _ in range(item_count):
+            if not self.floor_tiles:
+                break
+            ix, iy = self.rng.choice(self.floor_tiles)
+
+            if (ix, iy) not in self.items:
+                tmpl = self.rng.choice(possible_items)
+                if isinstance(tmpl, Weapon):
+                    item = Weapon(tmpl.name, tmpl.attack_bonus, tmpl.weight)
+                elif isinstance(tmpl, Shield):
+                    item = Shield(tmpl.name, tmpl.defense_bonus, tmpl.weight)
+                else:
+                    item = Potion(tmpl.name, tmpl.effect_type)
+
+                self.items[(ix, iy)] = item
+                self.floor_tiles.remove((ix, iy))
+
+        # Spawn Gold
+        for _ in range(self.rng.randint(1, 3)):
+            if not self.floor_tiles:
+                break
+            ix, iy = self.rng.choice(self.floor_tiles)
+
+            if (ix, iy) not in self.items:
+                self.items[(ix, iy)] = Gold(self.rng.randint(10, 50))
+                self.floor_tiles.remove((ix, iy))
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """
+        Checks if a tile is walkable.
+        """
+        if not (0 <= y < len(self.dungeon_map) and 0 <= x < len(self.dungeon_map[0])):
+            return False
+        return self.dungeon_map[y][x] != "▓"
+
+    def sample_tile_at_distance(self, min_distance: int):
+        """
+        Picks a random free tile at least `min_distance` steps (by path) from
+        the start, without scanning the floor. Returns None if unavailable.
+        """
+        if self.analysis is None:
+            return None
+        order = self.analysis.order
+        start = self.analysis.index_at_distance(min_distance)
+        if start >= len(order):
+            return None
+        for _ in range(16):
+            tile = order[self.rng.randrange(start, len(order))]
+            if tile != self.stairs_pos and tile not in self.items \
+                    and self.dungeon_map[tile[1]][tile[0]] == ".":
+                return tile
+        return None
+
+    def is_reachable(self, a: tuple[int, int], b: tuple[int, int]) -> bool:
+        """
+        Checks if tile b can be reached from tile a (near O(1)).
+        """
+        return self.connectivity.connected(a, b)
+
+    def remove_wall(self, x: int, y: int) -> bool:
+        """
+        Digs out a wall (the outer border cannot be removed).
+        Returns True if the map changed.
+        """
+        width, height = len(self.dungeon_map[0]), len(self.dungeon_map)
+        if not (0 < x < width - 1 and 0 < y < height - 1):
+            return False
+        if self.dungeon_map[y][x] != "▓":
+            return False
+        self.set_tile(x, y, ".")
+        self.connectivity.open_tile((x, y))
+        self.analysis = None  # distances are no longer exact
+        return True
+
+    def add_wall(self, x: int, y: int) -> bool:
+        """
+        Turns an empty floor tile into a wall.
+        Returns True if the map changed.
+        """
+        if not self.is_walkable(x, y) or self.dungeon_map[y][x] != "." \
+                or (x, y) in self.items:
+            return False
+        self.set_tile(x, y, "▓")
+        self.connectivity.close_tile((x, y))
+        self.analysis = None  # distances are no longer exact
+        return True
+
+    def rebuild_connectivity(self):
+        """Rebuilds the connectivity index from the map (e.g. after loading)."""
+        self.map_version += 1
+        self.connectivity = ConnectivityIndex.from_map(self.dungeon_map)
+
+    def get_item_at(self, x: int, y: int):
+        """
+        Retrieves and removes an item from the map at the given coordinates.
+        Returns None if no item is present.
+        """
+        return self.take_item(x, y)
+
+    # --- Tracked mutations ---
+
+    @property
+    def version(self) -> int:
+        """Version of the floor state (tiles and items)."""
+        return self.changes.version
+
+    def changes_since(self, version: int):
+        """Cells changed after `version`, or None if everything must be rebuilt."""
+        return self.changes.since(version)
+
+    def set_tile(self, x: int, y: int, tile: str):
+        """Changes one tile of the map."""
+        row = self.dungeon_map[y]
+        if row[x] == tile:
+            return
+        if self.owned_rows is not None and y not in self.owned_rows:
+            # The row is shared with a snapshot: copy it before writing
+            row = list(row)
+            self.dungeon_map[y] = row
+            self.owned_rows.add(y)
+        row[x] = tile
+        self.map_version += 1
+        self.changes.touch(x, y)
+
+    def place_item(self, x: int, y: int, item):
+        """Puts an item on the floor (replacing any item already there)."""
+        self.items[(x, y)] = item
+        self.changes.touch(x, y)
+
+    def take_item(self, x: int, y: int):
+        """Removes and returns the item at (x, y), or None."""
+        item = self.items.pop((x, y), None)
+        if item is not None:
+            self.changes.touch(x, y)
+        return item
+
+    def load_state(self, dungeon_map: list[list[str]], items: dict, stairs_pos):
+        """Replaces the whole floor, e.g. with the contents of a save file."""
+        self.dungeon_map = dungeon_map
+        self.owned_rows = None
+        self.items = dict(items)
+        self.stairs_pos = stairs_pos
+        self.analysis = None
+        self.rebuild_connectivity()
+        self.changes.reset()
+        self.base_version = None
+
+    # --- Snapshots (game/snapshot.py) ---
+
+    def share_state(self):
+        """
+        Captures tiles and items in O(rows + items): the rows themselves are
+        shared with the snapshot, and set_tile copies a row before changing it.
+        """
+        self.owned_rows = set()
+        return (tuple(self.dungeon_map), dict(self.items), self.changes.version,
+                self.analysis)
+
+    def restore_state(self, state):
+        """Puts back tiles and items captured by share_state()."""
+        rows, items, version, analysis = state
+        changed = self.changes.since(version)
+        tiles_changed = False
+        for y, row in enumerate(rows):
+            if self.dungeon_map[y] is not row:
+                self.dungeon_map[y] = row
+                tiles_changed = True
+        self.owned_rows = set()
+        self.items.clear()
+        self.items.update(items)
+
+        if tiles_changed:
+            self.analysis = analysis
+            self.rebuild_connectivity()
+        # Restored cells count as changes, so renderers and caches follow
+        if changed is None:
+            self.changes.reset()
+        else:
+            for x, y in changed:
+                self.changes.touch(x, y)
+
+    @staticmethod
+    def get_valid_start_position():
+        """
+        Returns (1, 1) as requested for all levels.
+        """
+        return 1, 1
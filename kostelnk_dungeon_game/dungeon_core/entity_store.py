@@ -0,0 +1,439 @@
+"""
+Struct-of-arrays storage for the monsters of one floor.
+Position, HP, level and attack of every monster live in parallel typed
+arrays (numpy can wrap them without copying: np.frombuffer(store.hp,
+dtype=np.int32)). Batch operations work on all monsters at once; the monster
+AI for a whole hero turn shares one BFS distance field from the hero instead
+of one path search per monster.
+
+Code that wants a single monster gets a MonsterHandle: a Beholder whose
+state is read from and written to the arrays, so the existing Beholder API
+(act, bite, take_damage, ...) keeps working.
+
+Benchmark against one Beholder object per monster, or check that the batch
+AI plays like Beholder.update:
+    python -m kostelnk_dungeon_game.dungeon_core.entity_store --monsters 2000
+    python -m kostelnk_dungeon_game.dungeon_core.entity_store --check
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from array import array
+from collections import deque
+from functools import lru_cache
+
+from kostelnk_dungeon_game.dungeon_core.beholder import (
+    ATTACK_COST, MAX_PATH_STEPS, MOVE_COST, Beholder
+)
+from kostelnk_dungeon_game.dungeon_core.events import DamageEvent, emit
+
+WALL = "▓"
+FIREBOLT_RANGE = 5
+# Closer than this (Manhattan) a monster chases the hero, farther it wanders
+CHASE_DISTANCE = 10
+STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+UNREACHED = -1
+
+# Shared, per-kind values of the Beholder
+_TEMPLATE = Beholder(0, 0)
+
+
+@lru_cache(maxsize=None)
+def level_stats(level: int) -> tuple[int, int]:
+    """(max HP, attack power) of a Beholder of this level, from its constructor."""
+    beholder = Beholder(0, 0, level=level)
+    return beholder.max_hp, beholder.attack_power
+
+
+def _line_of_sight(x, y, hx, hy, dungeon_map) -> bool:
+    """Straight-line sight, as in Beholder.has_line_of_sight."""
+    if x == hx:
+        step = 1 if hy > y else -1
+        return all(dungeon_map[ty][x] != WALL for ty in range(y + step, hy, step))
+    if y == hy:
+        step = 1 if hx > x else -1
+        return all(dungeon_map[y][tx] != WALL for tx in range(x + step, hx, step))
+    return False
+
+
+class DistanceField:
+    """
+    Walking distances from one tile (the hero), from one BFS. With `targets`
+    the search stops a step past the farthest target, which covers every
+    tile a target can step to; tiles beyond are UNREACHED.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, dungeon_map, origin: tuple[int, int], targets=None,
+                 limit: int = MAX_PATH_STEPS):
+        height, width = len(dungeon_map), len(dungeon_map[0])
+        remaining = set(targets) if targets is not None else None
+        self.width = width
+        self.origin = origin
+        self.distance = array("i", [UNREACHED]) * (width * height)
+        ox, oy = origin
+        self.distance[oy * width + ox] = 0
+        queue = deque([(ox, oy)])
+        while queue:
+            x, y = queue.popleft()
+            dist = self.distance[y * width + x] + 1
+            if dist > limit:
+                continue
+            for dx, dy in STEPS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height and dungeon_map[ny][nx] != WALL \
+                        and self.distance[ny * width + nx] == UNREACHED:
+                    self.distance[ny * width + nx] = dist
+                    queue.append((nx, ny))
+                    if remaining and (nx, ny) in remaining:
+                        remaining.discard((nx, ny))
+                        if not remaining:
+                            limit = min(limit, dist + 1)
+
+    def at(self, x: int, y: int) -> int:
+        """Walking distance of a tile (UNREACHED if too far or cut off)."""
+        return self.distance[y * self.width + x]
+
+
+class MonsterStore:
+    """
+    Parallel arrays of monster state, indexed by monster number.
+    events/path_cache/floor/planner are shared by all monsters of the floor.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, rng: random.Random = None):
+        self.xs = array("h")
+        self.ys = array("h")
+        self.hp = array("i")
+        self.max_hp = array("i")
+        self.level = array("h")
+        self.attack = array("i")
+        self.asleep = bytearray()
+        self.rng = rng or random.Random()
+        self.events = None
+        self.path_cache = None
+        self.floor = None
+        self.planner = None
+
+    def __len__(self):
+        return len(self.hp)
+
+    def add(self, x: int, y: int, level: int = 1) -> "MonsterHandle":
+        """Adds a monster with the stats of a Beholder of this level."""
+        max_hp, attack = level_stats(level)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.hp.append(max_hp)
+        self.max_hp.append(max_hp)
+        self.level.append(level)
+        self.attack.append(attack)
+        self.asleep.append(0)
+        return MonsterHandle(self, len(self.hp) - 1)
+
+    def handle(self, index: int) -> "MonsterHandle":
+        """Beholder API view of one monster."""
+        return MonsterHandle(self, index)
+
+    def handles(self):
+        """Handles of the living monsters (for code that wants objects)."""
+        return [MonsterHandle(self, i) for i in self.alive()]
+
+    # --- Batch queries and updates ---
+
+    def alive(self) -> list[int]:
+        """Indices of the living monsters."""
+        return [i for i, hp in enumerate(self.hp) if hp > 0]
+
+    def distances(self, x: int, y: int) -> array:
+        """Manhattan distance of every monster to (x, y)."""
+        return array("i", [abs(mx - x) + abs(my - y) for mx, my in zip(self.xs, self.ys)])
+
+    def within(self, x: int, y: int, radius: int) -> list[int]:
+        """Indices of the living monsters at most `radius` steps (Manhattan) from (x, y)."""
+        return [i for i, (mx, my, hp) in enumerate(zip(self.xs, self.ys, self.hp))
+                if hp > 0 and abs(mx - x) + abs(my - y) <= radius]
+
+    def damage(self, indices, amount: int, armed: bool = True) -> list[int]:
+        """
+        Applies the same damage to several monsters (level 3+ ignore unarmed
+        hits, as in Beholder.take_damage). Returns the indices of the killed.
+        """
+        killed = []
+        hp, level = self.hp, self.level
+        for i in indices:
+            if hp[i] <= 0 or (level[i] >= 3 and not armed):
+                continue
+            hp[i] = max(0, hp[i] - amount)
+            if hp[i] == 0:
+                killed.append(i)
+        return killed
+
+    def step_towards(self, indices, field: DistanceField, blocked: set) -> int:
+        """
+        Moves each monster one step down the distance field, never onto a
+        tile in `blocked` (updated as monsters move). Returns how many moved.
+        """
+        xs, ys, width, distance = self.xs, self.ys, field.width, field.distance
+        moved = 0
+        for i in indices:
+            x, y = xs[i], ys[i]
+            best = distance[y * width + x]
+            target = None
+            for dx, dy in STEPS:
+                nx, ny = x + dx, y + dy
+                dist = distance[ny * width + nx]
+                if dist != UNREACHED and (best == UNREACHED or dist < best) \
+                        and (nx, ny) not in blocked:
+                    best, target = dist, (nx, ny)
+            if target is not None:
+                blocked.discard((x, y))
+                blocked.add(target)
+                xs[i], ys[i] = target
+                moved += 1
+        return moved
+
+    def step_randomly(self, indices, dungeon_map, blocked: set):
+        """Moves each monster one random step, as Beholder.move_random."""
+        xs, ys, rand = self.xs, self.ys, self.rng.random
+        for i in indices:
+            x, y = xs[i], ys[i]
+            first = int(rand() * 4)
+            for k in range(4):
+                dx, dy = STEPS[(first + k) % 4]
+                nx, ny = x + dx, y + dy
+                if dungeon_map[ny][nx] != WALL and (nx, ny) not in blocked:
+                    blocked.discard((x, y))
+                    blocked.add((nx, ny))
+                    xs[i], ys[i] = nx, ny
+                    break
+
+    def update(self, hero, dungeon_map) -> DistanceField:
+        """
+        One hero turn of monster AI for every monster, with the Beholder's
+        priorities and energy costs: bite when adjacent, firebolt in sight
+        (stepping closer unless already at distance 2), chase when near,
+        wander otherwise. All chasers walk down one shared distance field.
+        Returns the field (None if no monster was close enough to need it).
+        """
+        # pylint: disable=too-many-locals,too-many-branches
+        xs, ys, hp, level, attack = self.xs, self.ys, self.hp, self.level, self.attack
+        hx, hy = hero.x, hero.y
+        defense = getattr(hero, "defense", 0)
+        speed = MonsterHandle.speed
+        active = [i for i in self.alive() if not self.asleep[i]]
+        blocked = {(xs[i], ys[i]) for i in active}
+        blocked.add((hx, hy))
+        distance = self.distances(hx, hy)
+        # A step changes the distance by one, so a monster farther than this
+        # cannot come within chase distance during the turn: it only wanders
+        reach = CHASE_DISTANCE + speed // MOVE_COST
+        near = [i for i in active if distance[i] <= reach]
+        far = [i for i in active if distance[i] > reach]
+        for _ in range(speed // MOVE_COST):
+            self.step_randomly(far, dungeon_map, blocked)
+
+        field = None
+        if near:
+            field = DistanceField(dungeon_map, (hx, hy), [(xs[i], ys[i]) for i in near])
+        for i in near:
+            energy = speed
+            while energy > 0 and hero.hp > 0:
+                dist = abs(xs[i] - hx) + abs(ys[i] - hy)
+                can_attack = energy >= ATTACK_COST
+                if dist == 1 and can_attack:
+                    dmg = max(0, attack[i] - defense)
+                    hero.hp -= dmg
+                    emit(self.events, DamageEvent(MonsterHandle.name, "Hero", dmg, "bite"))
+                    energy -= ATTACK_COST
+                    continue
+                if dist >= CHASE_DISTANCE:
+                    self.step_randomly((i,), dungeon_map, blocked)
+                    energy -= MOVE_COST
+                    continue
+                if can_attack and dist <= FIREBOLT_RANGE \
+                        and _line_of_sight(xs[i], ys[i], hx, hy, dungeon_map):
+                    dmg = self.rng.randint(1, 6) + level[i] * 2
+                    hero.hp -= dmg
+                    emit(self.events, DamageEvent(MonsterHandle.name, "Hero", dmg, "firebolt"))
+                    if dist > 2:
+                        self.step_towards((i,), field, blocked)
+                    energy -= ATTACK_COST
+                else:
+                    self.step_towards((i,), field, blocked)
+                    energy -= MOVE_COST
+        return field
+
+
+def _field(name: str, doc: str) -> property:
+    """Handle attribute stored in the store array `name` at the handle's index."""
+    def get(handle):
+        return getattr(handle.store, name)[handle.index]
+
+    def put(handle, value):
+        getattr(handle.store, name)[handle.index] = value
+    return property(get, put, doc=doc)
+
+
+def _shared(name: str, doc: str) -> property:
+    """Handle attribute shared by all monsters of the store."""
+    def get(handle):
+        return getattr(handle.store, name)
+
+    def put(handle, value):
+        setattr(handle.store, name, value)
+    return property(get, put, doc=doc)
+
+
+class MonsterHandle(Beholder):
+    """
+    One monster of a MonsterStore behind the Beholder API.
+    Holds only the store and the index; all state lives in the arrays.
+    """
+    name = _TEMPLATE.name
+    symbol = _TEMPLATE.symbol
+    speed = _TEMPLATE.speed
+
+    def __init__(self, store: MonsterStore, index: int):
+        # Beholder.__init__ is not called: the state is in the store
+        # pylint: disable=super-init-not-called
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, MonsterHandle) and other.store is self.store \
+            and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    x = _field("xs", "Column.")
+    y = _field("ys", "Row.")
+    hp = _field("hp", "Hit points.")
+    max_hp = _field("max_hp", "Hit points at full health.")
+    level = _field("level", "Level the stats were scaled for.")
+    attack_power = _field("attack", "Bite damage before the hero's defense.")
+    events = _shared("events", "Event bus (shared by the floor's monsters).")
+    path_cache = _shared("path_cache", "Path cache (shared by the floor's monsters).")
+    floor = _shared("floor", "Floor the path cache is keyed by (shared).")
+    planner = _shared("planner", "Lookahead planner (shared).")
+
+    @property
+    def asleep(self) -> bool:
+        """Sleeping monsters are skipped by the scheduler and the batch AI."""
+        return bool(self.store.asleep[self.index])
+
+    @asleep.setter
+    def asleep(self, value: bool):
+        self.store.asleep[self.index] = bool(value)
+
+
+def benchmark(monsters: int = 2000, size=(200, 60), turns: int = 20, seed: int = 1):
+    """
+    Runs the same monster AI with one Beholder object per monster and with a
+    MonsterStore. Returns {"objects"/"store": (ms per turn, bytes of monster state)}.
+    """
+    # Imported here: dungeon.py pulls in the layout generators
+    from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon  # pylint: disable=import-outside-toplevel
+    from kostelnk_dungeon_game.dungeon_core.hero import Hero  # pylint: disable=import-outside-toplevel
+    dungeon = Dungeon(size, level=1, seed=seed, layout="noise")
+    dungeon.create_dungeon()
+    rng = random.Random(seed)
+    tiles = dungeon.analysis.order
+    spots = [tiles[rng.randrange(len(tiles))] for _ in range(monsters)]
+    start = tiles[len(tiles) // 2]
+
+    def run(update):
+        hero = Hero(*start)
+        hero.hp = 10 ** 9
+        begin = time.perf_counter()
+        for _ in range(turns):
+            update(hero)
+        return (time.perf_counter() - begin) / turns * 1000
+
+    random.seed(seed)
+    tracemalloc.start()
+    objects = [Beholder(x, y) for x, y in spots]
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    object_ms = run(lambda hero: [beholder.update(hero, dungeon.dungeon_map)
+                                  for beholder in objects])
+
+    tracemalloc.start()
+    store = MonsterStore(random.Random(seed))
+    for x, y in spots:
+        store.add(x, y)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    store_ms = run(lambda hero: store.update(hero, dungeon.dungeon_map))
+    return {"objects": (object_ms, object_bytes), "store": (store_ms, store_bytes)}
+
+
+def zigzag_map(length: int = 2 * CHASE_DISTANCE) -> tuple[list[list[str]], list]:
+    """
+    A one tile wide corridor from (1, 1), alternating FIREBOLT_RANGE steps
+    right and down. Walking and Manhattan distance agree and every path is
+    unique, so the chase is deterministic. Returns the map and the corridor
+    tiles from (1, 1) on.
+    """
+    tiles = [(1, 1)]
+    for k in range(length - 1):
+        x, y = tiles[-1]
+        tiles.append((x + 1, y) if (k // FIREBOLT_RANGE) % 2 == 0 else (x, y + 1))
+    size = max(tiles[-1]) + 2
+    dungeon_map = [[WALL] * size for _ in range(size)]
+    for x, y in tiles:
+        dungeon_map[y][x] = "."
+    return dungeon_map, tiles
+
+
+def check_against_beholder(turns: int = 3, seed: int = 1) -> list[str]:
+    """
+    Plays single monsters with MonsterStore.update and Beholder.update from
+    every chasing distance on a zigzag_map corridor (bites, firebolts with and
+    without sight, steps) and returns the differences (empty = they match).
+    Wandering is not compared: the two draw their random steps differently.
+    """
+    from kostelnk_dungeon_game.dungeon_core.hero import Hero  # pylint: disable=import-outside-toplevel
+    dungeon_map, tiles = zigzag_map()
+    mismatches = []
+    for level in (1, 3):
+        for start in tiles[1:CHASE_DISTANCE]:
+            results = []
+            for batch in (False, True):
+                hero = Hero(*tiles[0])
+                random.seed(seed)
+                store = MonsterStore(random.Random(seed))
+                monster = store.add(*start, level=level) if batch else Beholder(*start, level)
+                for _ in range(turns):
+                    if batch:
+                        store.update(hero, dungeon_map)
+                    else:
+                        monster.update(hero, dungeon_map)
+                results.append((monster.x, monster.y, hero.hp))
+            if results[0] != results[1]:
+                mismatches.append(f"level {level} from {start}: Beholder {results[0]}, "
+                                  f"store {results[1]}")
+    return mismatches
+
+
+def main():
+    """Prints per-turn AI time and memory of both monster representations."""
+    parser = argparse.ArgumentParser(description="Monster store benchmark")
+    parser.add_argument("--monsters", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--check", action="store_true",
+                        help="compare the batch AI with Beholder.update instead")
+    args = parser.parse_args()
+    if args.check:
+        mismatches = check_against_beholder()
+        print("\n".join(mismatches) or "MonsterStore.update matches Beholder.update")
+        return
+    results = benchmark(args.monsters, turns=args.turns)
+    for name, (ms, size) in results.items():
+        print(f"{name:<8} {ms:8.2f} ms/turn {size / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Game event stream.
+Game logic emits small typed events instead of printing; renderers and
+tools subscribe or read them in batches from a bounded ring buffer.
+"""
+from collections import deque
+from typing import NamedTuple
+
+
+class DamageEvent(NamedTuple):
+    """Someone was hit. amount == 0 means the attack had no effect."""
+    source: str
+    target: str
+    amount: int
+    kind: str  # "melee", "bite", "firebolt"
+
+
+class RestoreEvent(NamedTuple):
+    """HP or stamina was restored."""
+    target: str
+    stat: str  # "hp" or "stamina"
+    amount: int
+    cause: str  # "potion", "rest"
+
+
+class PickupEvent(NamedTuple):
+    """The hero picked something up."""
+    item_name: str
+    item_type: str
+    amount: int  # gold amount, 0 for items
+
+
+class DropEvent(NamedTuple):
+    """The hero dropped items."""
+    item_names: tuple
+    cause: str  # "command", "exhaustion"
+
+
+class DeathEvent(NamedTuple):
+    """An actor died."""
+    name: str
+
+
+class LevelChangeEvent(NamedTuple):
+    """The hero moved to another floor."""
+    old_level: int
+    new_level: int
+    revisited: bool
+
+
+class EventBus:
+    """
+    Publishes events to subscribers and keeps the latest ones in a ring buffer.
+    Emitting does no formatting or I/O unless a subscriber does.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.buffer = deque(maxlen=capacity)
+        self.subscribers = []
+        self.total = 0  # sequence number of the next event
+
+    def subscribe(self, callback):
+        """Calls callback(event) for every emitted event."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stops calling a subscriber."""
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def emit(self, event):
+        """Records an event and forwards it to subscribers."""
+        self.buffer.append(event)
+        self.total += 1
+        for callback in self.subscribers:
+            callback(event)
+
+    def since(self, cursor: int):
+        """
+        Batch read for tools: returns (events newer than cursor, new cursor).
+        Events that already fell out of the ring buffer are skipped.
+        """
+        missing = self.total - cursor
+        if missing <= 0:
+            return [], self.total
+        missing = min(missing, len(self.buffer))
+        return list(self.buffer)[-missing:], self.total
+
+
+def emit(bus, event):
+    """Emits on a bus that may not be attached (None)."""
+    if bus is not None:
+        bus.emit(event)
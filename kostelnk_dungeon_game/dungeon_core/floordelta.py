@@ -0,0 +1,75 @@
+"""
+Compact storage for floors the hero has left.
+A generated floor is fully determined by its size, level and seed, so an
+inactive floor only needs to keep the cells that changed since generation
+(tile and item now there) plus the state of its monster. The full floor is
+generated again from the seed when the hero comes back (by either stairs,
+see GameSession.handle_stairs).
+"""
+from kostelnk_dungeon_game.dungeon_core.beholder import Beholder
+from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
+from kostelnk_dungeon_game.dungeon_core.layouts import layout_for_level
+
+
+class FloorDelta:
+    """A floor reduced to its generation seed plus what changed since."""
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("size", "level", "seed", "layout", "cells", "monster")
+
+    def __init__(self, size, level, seed, layout, cells, monster):
+        # pylint: disable=too-many-arguments
+        self.size = size
+        self.level = level
+        self.seed = seed
+        self.layout = layout    # layout generator that drew the floor
+        self.cells = cells      # {(x, y): (tile, item or None)}
+        self.monster = monster  # (x, y, hp) of the Beholder
+
+    def restore(self):
+        """Generates the floor again and reapplies the changes. Returns (dungeon, beholder)."""
+        dungeon = Dungeon(self.size, level=self.level, seed=self.seed, layout=self.layout)
+        dungeon.create_dungeon()
+
+        walls_changed = False
+        for (x, y), (tile, item) in self.cells.items():
+            old = dungeon.dungeon_map[y][x]
+            if old != tile:
+                dungeon.set_tile(x, y, tile)
+                # Stairs up replace floor: only walls change the distances
+                walls_changed = walls_changed or (old == "▓") != (tile == "▓")
+            if item is None:
+                dungeon.take_item(x, y)
+            elif dungeon.items.get((x, y)) is not item:
+                dungeon.place_item(x, y, item)
+        if walls_changed:
+            # Generation distances no longer hold; connectivity follows the map
+            dungeon.analysis = None
+            dungeon.rebuild_connectivity()
+        dungeon.floor_tiles = [tile for tile in dungeon.floor_tiles
+                               if tile not in dungeon.items]
+
+        x, y, hp = self.monster
+        beholder = Beholder(x, y, level=self.level)
+        beholder.hp = hp
+        return dungeon, beholder
+
+
+def collapse_floor(dungeon, beholder):
+    """
+    Returns a FloorDelta for the floor, or None if it cannot be rebuilt from
+    its seed (chunked floors, floors loaded from a save, or more changes
+    than the change log holds).
+    """
+    base = getattr(dungeon, "base_version", None)
+    if base is None or type(dungeon) is not Dungeon:
+        return None
+    changed = dungeon.changes_since(base)
+    if changed is None:
+        return None
+    cells = {(x, y): (dungeon.dungeon_map[y][x], dungeon.items.get((x, y)))
+             for x, y in changed}
+    # Bank floors are built with the level's layout and no time budget
+    layout = (dungeon.generation.layout if dungeon.generation is not None
+              else layout_for_level(dungeon.level))
+    return FloorDelta(dungeon.size, dungeon.level, dungeon.seed, layout, cells,
+                      (beholder.x, beholder.y, beholder.hp))
@@ -0,0 +1,102 @@
+"""
+Best-of-N floor generation.
+Builds several candidate floors in worker processes, each from its own seed,
+scores them with the results of the generation flood fill and keeps the best.
+Since the candidates are built at the same time, generating N floors takes
+about as long as one on a host with N free cores.
+"""
+import atexit
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
+from kostelnk_dungeon_game.dungeon_core.pathcache import new_floor_id
+
+# Worker pools by size, started on first use and reused for every floor
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+
+
+def score_floor(dungeon) -> float:
+    """
+    Higher is better: a large reachable area, a long walk from (1, 1) to the
+    stairs and few dead ends. Each part is normalised to roughly 0..1.
+    """
+    analysis = dungeon.analysis
+    if analysis is None or not analysis.order:
+        return 0.0
+    width, height = dungeon.size
+    area = len(analysis.order) / max(1, (width - 2) * (height - 2))
+    path = analysis.max_distance / max(1, width + height - 4)
+    dead_ends = len(analysis.dead_ends) / len(analysis.order)
+    return area + path - dead_ends
+
+
+def build_candidate(size: tuple[int, int], level: int, seed: int, layout: str = None):
+    """Generates one floor and returns (score, dungeon). Runs in a worker."""
+    dungeon = Dungeon(size, level=level, seed=seed, layout=layout)
+    dungeon.create_dungeon()
+    return score_floor(dungeon), dungeon
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    pool = _POOLS.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        _POOLS[workers] = pool
+        atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+    return pool
+
+
+def generate_best_floor(size: tuple[int, int], level: int = 1, candidates: int = 4,
+                        executor=None, layout: str = None) -> Dungeon:
+    """
+    Generates `candidates` floors in parallel and returns the best scoring one.
+    Uses at most one worker per core; on a single core, or if no worker
+    processes can be started, the candidates are generated one by one here.
+    `layout` forces a layout generator (see Dungeon).
+    """
+    seeds = [random.randrange(2 ** 32) for _ in range(max(1, candidates))]
+    workers = min(len(seeds), os.cpu_count() or 1)
+    results = None
+    if executor is not None or workers > 1:
+        try:
+            pool = executor if executor is not None else _pool(workers)
+            results = list(pool.map(build_candidate, [size] * len(seeds),
+                                    [level] * len(seeds), seeds, [layout] * len(seeds)))
+        except (OSError, BrokenProcessPool, NotImplementedError):
+            _POOLS.pop(workers, None)
+            results = None
+    if results is None:
+        results = [build_candidate(size, level, seed, layout) for seed in seeds]
+
+    _, best = max(results, key=lambda result: result[0])
+    # Floor ids are only unique within one process
+    best.floor_id = new_floor_id()
+    return best
+
+
+class FloorSource:
+    """
+    Decides how sessions get new floors: from a floor bank when it has one of
+    the right size and level, otherwise by best-of-N or single generation.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, best_of: int = 1, bank=None):
+        self.best_of = best_of
+        self.bank = bank
+
+    def create(self, dungeon_cls, size: tuple[int, int], level: int):
+        """Returns a ready floor of the given kind (classic or chunked)."""
+        if dungeon_cls is Dungeon:
+            if self.bank is not None and self.bank.has_floor(size, level):
+                dungeon = Dungeon(size, level=level)
+                dungeon.load_from_bank(self.bank)
+                return dungeon
+            if self.best_of > 1:
+                return generate_best_floor(size, level, self.best_of)
+        dungeon = dungeon_cls(size=size, level=level)
+        dungeon.create_dungeon()
+        return dungeon
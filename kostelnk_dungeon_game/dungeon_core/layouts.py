@@ -0,0 +1,253 @@
+"""
+Floor layout generators.
+Dungeon.create_dungeon picks a layout strategy per level and lets it draw
+the walls; connectivity, stairs and items are handled by the dungeon for
+every layout the same way.
+
+    noise  - 20% random walls (the original generator), cheapest
+    rooms  - BSP rooms joined by corridors
+    caves  - cellular automaton caves
+
+Expensive layouts run under a time budget. When a layout runs out of it,
+the floor is generated with the layout's cheaper fallback instead, and the
+GenerationReport on the dungeon says so.
+
+Benchmark the layouts at several map sizes:
+    python -m kostelnk_dungeon_game.dungeon_core.layouts
+"""
+import argparse
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from kostelnk_dungeon_game.dungeon_core.metrics import REGISTRY
+
+WALL = "▓"
+FLOOR = "."
+
+# Layout by level (levels past the end use the last entry). From level 3
+# this replaces the original noise floors in normal play; all "noise" gives
+# back the old floors.
+LEVEL_LAYOUTS = ("noise", "noise", "rooms", "caves", "rooms", "caves", "rooms")
+
+FALLBACKS = REGISTRY.counter("dungeon_layout_fallbacks_total",
+                             "Floors generated with a fallback layout after a budget overrun.")
+
+
+class GenerationReport(NamedTuple):
+    """How a floor layout was generated."""
+    requested: str   # layout chosen for the level
+    layout: str      # layout that produced the floor
+    elapsed: float   # seconds, including any attempt that ran out of budget
+    fell_back: bool
+
+
+class BudgetExceeded(Exception):
+    """Raised inside a layout generator when its time budget is used up."""
+
+
+class Deadline:
+    """Time limit checked by generators between units of work."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, budget: float = None):
+        self.end = None if budget is None else time.perf_counter() + budget
+
+    def check(self):
+        """Raises BudgetExceeded once the time is up."""
+        if self.end is not None and time.perf_counter() > self.end:
+            raise BudgetExceeded
+
+
+def _walls(width, height):
+    return [[WALL] * width for _ in range(height)]
+
+
+def _carve_line(grid, x0, y0, x1, y1):
+    """Carves an L-shaped corridor: horizontal first, then vertical."""
+    for x in range(min(x0, x1), max(x0, x1) + 1):
+        grid[y0][x] = FLOOR
+    for y in range(min(y0, y1), max(y0, y1) + 1):
+        grid[y][x1] = FLOOR
+
+
+class LayoutGenerator(ABC):
+    """
+    Base class of the layout strategies. generate() returns the map rows with
+    walls on the border; it calls deadline.check() regularly.
+    """
+    name = ""
+    # Seconds per floor before falling back (None = unlimited)
+    budget = None
+    # Name of the cheaper layout used when the budget runs out
+    fallback = None
+
+    def __init__(self):
+        self.seconds = REGISTRY.histogram(f"dungeon_layout_{self.name}_seconds",
+                                          f"Time to draw one {self.name} layout.")
+
+    @abstractmethod
+    def generate(self, width: int, height: int, rng: random.Random,
+                 deadline: Deadline) -> list[list[str]]:
+        """Draws the walls of a floor."""
+
+
+class NoiseLayout(LayoutGenerator):
+    """Random walls; the flood fill afterwards keeps the part reachable from the start."""
+    name = "noise"
+    wall_chance = 0.2
+
+    def generate(self, width, height, rng, deadline):
+        grid = []
+        for y in range(height):
+            row = []
+            for x in range(width):
+                # Borders are always walls
+                if x == 0 or y == 0 or x == width - 1 or y == height - 1:
+                    row.append(WALL)
+                elif rng.random() < self.wall_chance:
+                    row.append(WALL)
+                else:
+                    row.append(FLOOR)
+            grid.append(row)
+        return grid
+
+
+class BSPLayout(LayoutGenerator):
+    """
+    Binary space partitioning: the floor is split into leaves, each leaf gets
+    a room, and the rooms are joined in tree order by L-shaped corridors.
+    """
+    name = "rooms"
+    budget = 0.05
+    fallback = "noise"
+    min_leaf = 6
+
+    def generate(self, width, height, rng, deadline):
+        grid = _walls(width, height)
+        leaves = []
+        stack = [(1, 1, width - 2, height - 2)]
+        while stack:
+            deadline.check()
+            x, y, w, h = stack.pop()
+            can_split_x = w >= 2 * self.min_leaf
+            can_split_y = h >= 2 * self.min_leaf
+            if can_split_x and (not can_split_y or w >= h):
+                cut = rng.randint(self.min_leaf, w - self.min_leaf)
+                stack += [(x + cut, y, w - cut, h), (x, y, cut, h)]
+            elif can_split_y:
+                cut = rng.randint(self.min_leaf, h - self.min_leaf)
+                stack += [(x, y + cut, w, h - cut), (x, y, w, cut)]
+            else:
+                leaves.append((x, y, w, h))
+
+        centres = [(1, 1)]
+        for x, y, w, h in leaves:
+            deadline.check()
+            # Room inside the leaf, keeping a wall towards the neighbour leaves
+            room_w = rng.randint(max(1, (w - 1) // 2), max(1, w - 1))
+            room_h = rng.randint(max(1, (h - 1) // 2), max(1, h - 1))
+            rx = x + rng.randint(0, w - room_w - 1) if w > room_w else x
+            ry = y + rng.randint(0, h - room_h - 1) if h > room_h else y
+            for row in grid[ry:ry + room_h]:
+                row[rx:rx + room_w] = [FLOOR] * room_w
+            centres.append((rx + room_w // 2, ry + room_h // 2))
+
+        # Leaves come out in tree order, so neighbours in the list are close
+        for (x0, y0), (x1, y1) in zip(centres, centres[1:]):
+            _carve_line(grid, x0, y0, x1, y1)
+        return grid
+
+
+class CellularLayout(LayoutGenerator):
+    """
+    Cave generator: random fill, then a few smoothing steps in which a cell
+    becomes a wall when most of its 3x3 neighbourhood is wall.
+    """
+    name = "caves"
+    budget = 0.05
+    fallback = "noise"
+    fill = 0.45
+    steps = 4
+
+    def generate(self, width, height, rng, deadline):
+        grid = _walls(width, height)
+        for y in range(1, height - 1):
+            row = grid[y]
+            for x in range(1, width - 1):
+                if rng.random() >= self.fill:
+                    row[x] = FLOOR
+
+        for _ in range(self.steps):
+            walls = [[cell == WALL for cell in row] for row in grid]
+            for y in range(1, height - 1):
+                deadline.check()
+                above, here, below = walls[y - 1], walls[y], walls[y + 1]
+                row = grid[y]
+                for x in range(1, width - 1):
+                    count = (above[x - 1] + above[x] + above[x + 1] + here[x - 1]
+                             + here[x] + here[x + 1] + below[x - 1] + below[x] + below[x + 1])
+                    row[x] = WALL if count >= 5 else FLOOR
+
+        # Caves can be closed off; tunnel from the start to the middle of the map
+        _carve_line(grid, 1, 1, width // 2, height // 2)
+        return grid
+
+
+LAYOUTS = {generator.name: generator
+           for generator in (NoiseLayout(), BSPLayout(), CellularLayout())}
+
+
+def layout_for_level(level: int) -> str:
+    """Name of the layout used on a level."""
+    return LEVEL_LAYOUTS[min(max(level, 1), len(LEVEL_LAYOUTS)) - 1]
+
+
+def run_layout(name: str, width: int, height: int, rng: random.Random, budget=None):
+    """Runs one layout generator. Returns (map rows, seconds); raises BudgetExceeded."""
+    generator = LAYOUTS[name]
+    start = time.perf_counter()
+    grid = generator.generate(width, height, rng, Deadline(budget))
+    elapsed = time.perf_counter() - start
+    generator.seconds.observe(elapsed)
+    return grid, elapsed
+
+
+def benchmark(sizes=((40, 15), (80, 30), (200, 60)), runs: int = 20, seed: int = 1):
+    """
+    Generates full floors with every layout (no budget) at each size.
+    Returns rows of (layout, size, median ms, max ms, reachable share of the floor).
+    """
+    # Imported here: dungeon.py imports this module
+    from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon  # pylint: disable=import-outside-toplevel
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        width, height = size
+        for name in LAYOUTS:
+            times, area = [], 0.0
+            for _ in range(runs):
+                dungeon = Dungeon(size, seed=rng.randrange(2 ** 32), layout=name)
+                start = time.perf_counter()
+                dungeon.create_dungeon()
+                times.append(time.perf_counter() - start)
+                area += len(dungeon.analysis.order) / ((width - 2) * (height - 2))
+            times.sort()
+            results.append((name, size, times[len(times) // 2] * 1000, times[-1] * 1000,
+                            area / runs))
+    return results
+
+
+def main():
+    """Prints the cost of each layout at several map sizes."""
+    parser = argparse.ArgumentParser(description="Floor layout benchmark")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    print(f"{'layout':<8}{'size':>10}{'median ms':>12}{'max ms':>10}{'reachable':>11}")
+    for name, (width, height), median, worst, area in benchmark(runs=args.runs):
+        print(f"{name:<8}{f'{width}x{height}':>10}{median:>12.2f}{worst:>10.2f}{area:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
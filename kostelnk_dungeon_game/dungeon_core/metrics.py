@@ -0,0 +1,121 @@
+"""
+In-process metrics: counters, gauges and histograms in one registry.
+Recording is a few attribute updates (histograms add one bisect), cheap
+enough to stay on in production. Values are read by the exporters in
+game_io/metrics_export.py (Prometheus text format over HTTP or to a file).
+Each metric updates under its own lock, so worker threads (speculative path
+searches, background save writes) can record without losing counts.
+"""
+import threading
+from bisect import bisect_left
+
+# Default histogram buckets: durations in seconds (100 us .. 10 s)
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+# Sizes in bytes (1 kB .. 10 MB)
+BYTE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+
+class Counter:
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Adds to the counter."""
+        with self.lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down."""
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def set(self, value):
+        """Sets the current value."""
+        self.value = value
+
+    def inc(self, amount=1):
+        """Adds to (or, with a negative amount, subtracts from) the value."""
+        with self.lock:
+            self.value += amount
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets=TIME_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: above all buckets
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        """Records one value."""
+        bucket = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[bucket] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, ending with +Inf."""
+        total = 0
+        result = []
+        with self.lock:
+            counts = list(self.counts)
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Registry:
+    """Named metrics. Asking twice for the same name returns the same metric."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _get(self, cls, name, description, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = cls(name, description, *args)
+            self.metrics[name] = metric
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}.")
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Returns the counter with this name, creating it if needed."""
+        return self._get(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Returns the gauge with this name, creating it if needed."""
+        return self._get(Gauge, name, description)
+
+    def histogram(self, name: str, description: str, buckets=TIME_BUCKETS) -> Histogram:
+        """Returns the histogram with this name, creating it if needed."""
+        return self._get(Histogram, name, description, buckets)
+
+    def collect(self):
+        """All metrics, sorted by name."""
+        return [self.metrics[name] for name in sorted(self.metrics)]
+
+
+# Process-wide registry used by the game
+REGISTRY = Registry()
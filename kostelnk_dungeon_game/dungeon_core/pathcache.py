@@ -0,0 +1,75 @@
+"""
+Path cache for monster navigation.
+Bounded LRU of BFS results keyed by (floor, map version, source, target).
+Regenerating a floor or changing a tile bumps the map version, so stale
+entries can never match again and simply age out.
+"""
+import itertools
+from collections import OrderedDict
+
+_FLOOR_IDS = itertools.count(1)
+
+# Marker for "not in cache" (None is a valid cached result: no path)
+MISS = object()
+
+
+def new_floor_id() -> int:
+    """Unique id for a floor object within this process."""
+    return next(_FLOOR_IDS)
+
+
+class PathCache:
+    """
+    Least-recently-used cache of next steps along BFS paths.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached next step (may be None) or MISS."""
+        value = self.entries.get(key, MISS)
+        if value is MISS:
+            self.misses += 1
+            return MISS
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        """True if the key is cached (not counted as a lookup)."""
+        return key in self.entries
+
+    def put(self, key, value):
+        """Stores a result, evicting the least recently used entry if full."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def store_path(self, floor_key, path, target):
+        """
+        Stores every step of a path at once: each tile on the path gets the
+        following tile as its next step towards `target`.
+        """
+        for here, step in zip(path, path[1:]):
+            self.put(floor_key + (here, target), step)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
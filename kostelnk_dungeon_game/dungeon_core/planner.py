@@ -0,0 +1,223 @@
+"""
+Lookahead planner for the Beholder.
+Searches a few plies ahead with expectimax: the Beholder picks the best of
+its turns, the hero answers with a likely response (a chance node). A turn
+spends the Beholder's energy for one hero turn as the game does: one
+attack (bite, firebolt) or up to two steps. Iterative deepening runs under
+a hard time budget per decision and returns the first action of the best
+turn of the deepest completed search; if not even one ply completes, the
+Beholder falls back to its fixed priorities. Nodes searched per decision
+are kept in a bounded log.
+"""
+import time
+from collections import deque
+from typing import NamedTuple
+
+from kostelnk_dungeon_game.dungeon_core.beholder import ATTACK_COST, MOVE_COST
+
+# Hard time budget per decision (seconds)
+BUDGET = 0.002
+# Deepest search (plies = Beholder action + hero response)
+MAX_DEPTH = 6
+# A search one ply deeper takes about this many times longer; a depth that
+# cannot finish in the remaining budget is not started
+DEPTH_GROWTH = 10
+# Expected firebolt damage is 1d6 + level * 2
+FIREBOLT_AVERAGE = 3.5
+FIREBOLT_RANGE = 5
+# Chance that an adjacent hero attacks instead of moving
+HERO_ATTACK_CHANCE = 0.5
+# Score weights: damage dealt to the hero counts fully, damage taken less
+TAKEN_WEIGHT = 0.5
+DISTANCE_WEIGHT = 0.1
+
+STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+BITE = ("bite",)
+FIREBOLT = ("firebolt",)
+WAIT = ("wait",)
+
+
+class PlanStats(NamedTuple):
+    """One planner decision."""
+    nodes: int
+    depth: int       # deepest completed search
+    elapsed: float   # seconds
+    action: tuple    # None = no search completed in time
+
+
+class _OutOfTime(Exception):
+    """Raised inside the search when the budget is used up."""
+
+
+def _walkable(x, y, dungeon_map) -> bool:
+    if 0 <= y < len(dungeon_map) and 0 <= x < len(dungeon_map[0]):
+        return dungeon_map[y][x] != "▓"
+    return False
+
+
+def _line_of_sight(bx, by, hx, hy, dungeon_map) -> bool:
+    """Straight-line sight, as in Beholder.has_line_of_sight."""
+    if bx == hx:
+        step = 1 if hy > by else -1
+        return all(dungeon_map[y][bx] != "▓" for y in range(by + step, hy, step))
+    if by == hy:
+        step = 1 if hx > bx else -1
+        return all(dungeon_map[by][x] != "▓" for x in range(bx + step, hx, step))
+    return False
+
+
+class BeholderPlanner:
+    """
+    Expectimax planner with a per-decision time budget.
+    The depth limit grows with the Beholder's level (deeper floors plan
+    further ahead); the budget caps the latency whatever the depth.
+    """
+
+    def __init__(self, budget: float = BUDGET, max_depth: int = MAX_DEPTH,
+                 log_size: int = 256):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.log = deque(maxlen=log_size)
+        self.decisions = 0
+        self.total_nodes = 0
+        self.max_elapsed = 0.0
+        # Per-decision search context
+        self._nodes = 0
+        self._deadline = 0.0
+        self._map = None
+        self._speed = 0
+        self._bite = 0
+        self._firebolt = 0.0
+        self._hero_hit = 0
+
+    def depth_for(self, level: int) -> int:
+        """Search depth for a Beholder of the given level."""
+        return max(1, min(self.max_depth, 1 + level))
+
+    def choose(self, beholder, hero, dungeon_map, energy: int = None):
+        """
+        Returns the best action found within the budget:
+        ("bite",), ("firebolt",), ("move", dx, dy) or ("wait",), or None if
+        the budget ran out before one ply was searched. `energy` is what is
+        left of the current hero turn (default: a whole turn).
+        """
+        start = time.perf_counter()
+        self._deadline = start + self.budget
+        self._nodes = 0
+        self._map = dungeon_map
+        self._speed = beholder.speed
+        energy = self._speed if energy is None else energy
+        self._bite = max(0, beholder.attack_power - getattr(hero, "defense", 0))
+        self._firebolt = FIREBOLT_AVERAGE + beholder.level * 2
+        # Same rule as the hero's melee in the game loop
+        self._hero_hit = beholder.hit_damage(getattr(hero, "attack", 5),
+                                             getattr(hero, "armed", False))
+
+        state = (beholder.x, beholder.y, hero.x, hero.y)
+        best, completed = None, 0
+        try:
+            for depth in range(1, self.depth_for(beholder.level) + 1):
+                depth_start = time.perf_counter()
+                best = self._best_action(state, depth, energy)
+                completed = depth
+                now = time.perf_counter()
+                if (now - depth_start) * DEPTH_GROWTH > self._deadline - now:
+                    break
+        except _OutOfTime:
+            pass
+
+        elapsed = time.perf_counter() - start
+        self.decisions += 1
+        self.total_nodes += self._nodes
+        self.max_elapsed = max(self.max_elapsed, elapsed)
+        self.log.append(PlanStats(self._nodes, completed, elapsed, best))
+        self._map = None
+        return best
+
+    def stats(self) -> dict:
+        """Totals of the decisions so far, for tuning difficulty and budget."""
+        return {
+            "decisions": self.decisions,
+            "avg_nodes": self.total_nodes / self.decisions if self.decisions else 0.0,
+            "max_nodes": max((entry.nodes for entry in self.log), default=0),
+            "max_ms": self.max_elapsed * 1000,
+        }
+
+    # --- Search ---
+
+    def _turns(self, state, energy):
+        """
+        Beholder turns possible with `energy` left: (first action, state
+        after the turn, damage dealt to the hero). An attack needs
+        ATTACK_COST; otherwise the Beholder takes up to energy // MOVE_COST
+        steps. Steps deal no damage, so step sequences are merged by the
+        tile they end on.
+        """
+        bx, by, hx, hy = state
+        turns = []
+        if energy >= ATTACK_COST:
+            dist = abs(bx - hx) + abs(by - hy)
+            if dist == 1:
+                turns.append((BITE, state, self._bite))
+            elif dist <= FIREBOLT_RANGE and _line_of_sight(bx, by, hx, hy, self._map):
+                turns.append((FIREBOLT, state, self._firebolt))
+
+        first_step = {(bx, by): WAIT}
+        frontier = [(bx, by)]
+        for _ in range(energy // MOVE_COST):
+            reached = []
+            for x, y in frontier:
+                for dx, dy in STEPS:
+                    tile = (x + dx, y + dy)
+                    if tile not in first_step and tile != (hx, hy) \
+                            and _walkable(tile[0], tile[1], self._map):
+                        first_step[tile] = ("move", dx, dy) if (x, y) == (bx, by) \
+                            else first_step[(x, y)]
+                        reached.append(tile)
+            frontier = reached
+        del first_step[(bx, by)]
+        turns.extend((action, (x, y, hx, hy), 0) for (x, y), action in first_step.items())
+        turns.append((WAIT, state, 0))
+        return turns
+
+    def _responses(self, state):
+        """Likely hero responses: (probability, new state, damage to the Beholder)."""
+        bx, by, hx, hy = state
+        moves = [(bx, by, hx + dx, hy + dy) for dx, dy in STEPS
+                 if (hx + dx, hy + dy) != (bx, by) and _walkable(hx + dx, hy + dy, self._map)]
+        moves.append(state)  # rest / stand still
+        if abs(bx - hx) + abs(by - hy) == 1:
+            share = (1 - HERO_ATTACK_CHANCE) / len(moves)
+            return [(HERO_ATTACK_CHANCE, state, self._hero_hit)] + \
+                [(share, move, 0) for move in moves]
+        share = 1 / len(moves)
+        return [(share, move, 0) for move in moves]
+
+    def _tick(self):
+        self._nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise _OutOfTime
+
+    def _best_action(self, state, depth, energy):
+        best, best_value = WAIT, float("-inf")
+        for action, after, dealt in self._turns(state, energy):
+            value = self._chance(after, dealt, depth)
+            if value > best_value:
+                best, best_value = action, value
+        return best
+
+    def _max(self, state, depth) -> float:
+        self._tick()
+        if depth == 0:
+            bx, by, hx, hy = state
+            return -DISTANCE_WEIGHT * (abs(bx - hx) + abs(by - hy))
+        return max(self._chance(after, dealt, depth)
+                   for _, after, dealt in self._turns(state, self._speed))
+
+    def _chance(self, state, dealt, depth) -> float:
+        """Value of the Beholder's turn ending in `state` after dealing `dealt`."""
+        self._tick()
+        value = dealt
+        for probability, next_state, taken in self._responses(state):
+            value += probability * (self._max(next_state, depth - 1) - TAKEN_WEIGHT * taken)
+        return value
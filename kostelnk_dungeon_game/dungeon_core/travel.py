@@ -0,0 +1,64 @@
+"""
+Hero auto-travel: one path search over the dungeon, turned into a list of
+movement keys that the game loop plays as a batch of turns.
+"""
+from collections import deque
+
+# Movement keys by step direction
+STEP_KEYS = {(0, -1): 'w', (0, 1): 's', (-1, 0): 'a', (1, 0): 'd'}
+
+# Upper bound for one search (keeps unbounded chunked floors finite)
+MAX_SEARCH_TILES = 20000
+# Stairs change the floor, so a path only ends on them, never passes over
+STAIRS_TILES = (">", "<")
+
+
+def find_path(dungeon, start: tuple[int, int], is_goal, blocked=()):
+    """
+    Breadth-first search from `start` to the nearest tile for which
+    is_goal(x, y) is true. Tiles in `blocked` are never entered, stairs only
+    as the goal. Returns the tiles to walk (start excluded), or None if no
+    goal is reachable.
+    """
+    dungeon_map = dungeon.dungeon_map
+    queue = deque([start])
+    parent = {start: None}
+    while queue and len(parent) <= MAX_SEARCH_TILES:
+        cx, cy = queue.popleft()
+        if (cx, cy) != start and is_goal(cx, cy):
+            path = []
+            tile = (cx, cy)
+            while tile != start:
+                path.append(tile)
+                tile = parent[tile]
+            path.reverse()
+            return path
+        for dx, dy in STEP_KEYS:
+            nxt = (cx + dx, cy + dy)
+            if nxt not in parent and nxt not in blocked and dungeon.is_walkable(*nxt):
+                parent[nxt] = (cx, cy)
+                if dungeon_map[nxt[1]][nxt[0]] not in STAIRS_TILES or is_goal(*nxt):
+                    queue.append(nxt)
+    return None
+
+
+def path_keys(start: tuple[int, int], path) -> list[str]:
+    """Converts a path into the movement keys that walk it."""
+    keys = []
+    x, y = start
+    for nx, ny in path:
+        keys.append(STEP_KEYS[(nx - x, ny - y)])
+        x, y = nx, ny
+    return keys
+
+
+def stairs_path(dungeon, start: tuple[int, int], blocked=(), stairs: str = ">"):
+    """Path to the nearest stairs down (>) or up (<)."""
+    return find_path(dungeon, start,
+                     lambda x, y: dungeon.dungeon_map[y][x] == stairs, blocked)
+
+
+def explore_path(dungeon, start: tuple[int, int], blocked=()):
+    """Path to the nearest item still lying on the floor."""
+    items = dungeon.items
+    return find_path(dungeon, start, lambda x, y: (x, y) in items, blocked)
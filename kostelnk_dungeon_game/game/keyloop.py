@@ -0,0 +1,169 @@
+"""
+Single-key game loop.
+Keys are read without Enter. Everything typed while a turn or a frame was
+in progress is queued and played before the next frame, and frames are
+capped at `fps`, so held keys move the hero at the key repeat rate instead
+of waiting for a redraw after every step.
+"""
+
+import sys
+import time
+from collections import deque
+
+from kostelnk_dungeon_game.game.loop import GameSession, game_loop
+from kostelnk_dungeon_game.game.speculate import Speculator
+from kostelnk_dungeon_game.game_io.save_load import save_game
+from kostelnk_dungeon_game.game_io.keyboard import RawKeyboard, keyboard_available
+
+# Keys that are a whole command on their own
+SINGLE_KEYS = {"w", "a", "s", "d", "r", "g", "i", "q"}
+# Keys that stand for a longer command
+COMMAND_KEYS = {"u": "undo"}
+# Keys that open a line prompt, with the text the command starts with
+PROMPT_KEYS = {"e": "e ", "x": "x ", ":": ""}
+ENTER_KEYS = ("\r", "\n")
+
+
+class KeySession(GameSession):
+    """
+    A GameSession driven by single keypresses.
+    `e` and `x` ask for the item name, `:` opens a prompt for any command
+    (`save`, `load`, ...).
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, dungeon, hero, beholder, renderer, keyboard=None,
+                 fps: int = 30, save_path: str = "savefile.json"):
+        # pylint: disable=too-many-arguments
+        super().__init__(dungeon, hero, beholder, renderer, save_path)
+        self.keyboard = keyboard if keyboard is not None else RawKeyboard()
+        self.frame_interval = 1.0 / fps
+        self.queue = deque()
+        self.dirty = False
+        self.turns = 0
+        self.frames = 0
+
+    def show_inventory(self):
+        """Shows the inventory in the message log (no Enter needed)."""
+        self.message = " | ".join(self.inventory_lines())
+
+    def next_key(self) -> str:
+        """Returns the next queued key, waiting for one if necessary."""
+        while not self.queue:
+            self.queue.extend(self.keyboard.read_keys())
+        return self.queue.popleft()
+
+    def handle_save_quit(self):
+        """Handles saving and quitting; Y/N is a single key."""
+        print("Save before quit? (Y/N): ", end="", flush=True, file=self.out)
+        try:
+            confirm = self.next_key().lower()
+        except EOFError:
+            confirm = "n"
+        print(confirm, file=self.out)
+        if confirm == 'y':
+            save_game(self.hero, self.beholder, self.dungeon, self.save_path)
+            print("Game saved successfully.", file=self.out)
+        print("Goodbye!", file=self.out)
+        sys.exit()
+
+    def render(self):
+        """Draws one frame."""
+        self.renderer.render(self.dungeon, self.hero, self.beholder, self.message)
+        self.message = ""
+        self.dirty = False
+        self.frames += 1
+
+    def read_prompt(self, key: str) -> list[str]:
+        """
+        Completes a prompt command. Keys already queued after the prompt key
+        are the start of the typed text; if they end with Enter no prompt is shown.
+        """
+        typed = ""
+        while self.queue:
+            char = self.queue.popleft()
+            if char in ENTER_KEYS:
+                return (PROMPT_KEYS[key] + typed).lower().split()
+            typed += char
+        if self.dirty:
+            self.render()  # the prompt belongs under an up-to-date frame
+        line = self.keyboard.prompt(f"Action: {PROMPT_KEYS[key]}{typed}")
+        return (PROMPT_KEYS[key] + typed + line).lower().split()
+
+    def command_for(self, key: str):
+        """Turns a key into a parsed command (None = ignore the key)."""
+        key = key.lower()
+        if key in PROMPT_KEYS:
+            return self.read_prompt(key) or None
+        if key in SINGLE_KEYS:
+            return [key]
+        if key in COMMAND_KEYS:
+            return [COMMAND_KEYS[key]]
+        return None
+
+    def process_queue(self) -> bool:
+        """
+        Plays every queued key. Returns True when the game is over.
+        If the hero gets hurt, the remaining type-ahead is dropped so the
+        player sees the hit before moving on.
+        """
+        last_message = ""
+        while self.queue:
+            cmd_raw = self.command_for(self.queue.popleft())
+            if cmd_raw is None:
+                continue
+            hp_before = self.hero.hp
+            if self.play_turn(cmd_raw):
+                return True
+            self.turns += 1
+            self.dirty = True
+            last_message = self.message or last_message
+            if self.hero.hp < hp_before:
+                self.queue.clear()
+                self.keyboard.flush()
+                break
+        self.message = self.message or last_message
+        return False
+
+    def run(self):
+        """Runs the main loop until the game ends or input is closed."""
+        with self.keyboard:
+            self.render()
+            next_frame = 0.0
+            while True:
+                # Idle: block for a key. Frame pending: wait until it is due.
+                timeout = None
+                if self.dirty:
+                    timeout = max(0.0, next_frame - time.monotonic())
+                elif self.speculator is not None:
+                    self.speculator.start(self)
+                try:
+                    self.queue.extend(self.keyboard.read_keys(timeout))
+                except EOFError:
+                    return
+
+                if self.process_queue():
+                    return
+
+                if self.dirty and time.monotonic() >= next_frame:
+                    self.render()
+                    next_frame = time.monotonic() + self.frame_interval
+
+
+def keypress_loop(dungeon, hero, beholder, renderer, fps: int = 30, floor_source=None,
+                  planner=None):
+    """
+    Entry point for single-key input.
+    Falls back to the line based loop when stdin is not a terminal.
+    """
+    # pylint: disable=too-many-arguments
+    if not keyboard_available():
+        game_loop(dungeon, hero, beholder, renderer, floor_source, planner)
+        return
+    session = KeySession(dungeon, hero, beholder, renderer, fps=fps)
+    session.speculator = Speculator()
+    if floor_source is not None:
+        session.floor_source = floor_source
+    if planner is not None:
+        session.set_planner(planner)
+    session.run()
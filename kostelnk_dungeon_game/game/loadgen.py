@@ -0,0 +1,108 @@
+"""
+Load generator for the game server.
+Opens many concurrent sessions, plays random commands and reports
+p99 turn latency and how many sessions one CPU core can host.
+
+Usage:
+    python -m kostelnk_dungeon_game.game.loadgen --sessions 200 --turns 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from kostelnk_dungeon_game.game.server import PROMPT, SLOT_PROMPT, STATS_REQUEST, percentile
+
+COMMANDS = ["w", "a", "s", "d", "w", "a", "s", "d", "r", "i"]
+
+
+async def play_session(host, port, slot, turns, think_time, latencies, rng):
+    """Plays `turns` random commands on one connection."""
+    # pylint: disable=too-many-arguments
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await reader.readuntil(SLOT_PROMPT.encode())
+        writer.write(f"{slot}\r\n".encode())
+        await reader.readuntil(PROMPT.encode())
+
+        for _ in range(turns):
+            if think_time:
+                await asyncio.sleep(rng.uniform(0, 2 * think_time))
+            start = time.perf_counter()
+            writer.write(f"{rng.choice(COMMANDS)}\r\n".encode())
+            try:
+                await reader.readuntil(PROMPT.encode())
+            except asyncio.IncompleteReadError:
+                break  # hero died, server closed the session
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def fetch_stats(host, port):
+    """Asks the server for its own counters (without opening a game session)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readuntil(SLOT_PROMPT.encode())
+    writer.write(f"{STATS_REQUEST}\r\n".encode())
+    line = await reader.readline()
+    writer.close()
+    return json.loads(line)
+
+
+async def run_load(args):
+    """Runs all sessions concurrently and returns the report."""
+    latencies = []
+    rng = random.Random(args.seed)
+    before = await fetch_stats(args.host, args.port)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        play_session(args.host, args.port, f"load{i}", args.turns,
+                     args.think_time, latencies, random.Random(rng.random()))
+        for i in range(args.sessions)
+    ))
+    wall = time.perf_counter() - start
+
+    after = await fetch_stats(args.host, args.port)
+    turns = after["turns"] - before["turns"]
+    cpu = after["cpu_seconds"] - before["cpu_seconds"]
+    cpu_per_turn = cpu / turns if turns else 0.0
+
+    # A human player issues roughly `player_rate` commands per second
+    sessions_per_core = (1.0 / cpu_per_turn) / args.player_rate if cpu_per_turn else 0.0
+
+    return {
+        "sessions": args.sessions,
+        "turns": len(latencies),
+        "wall_seconds": round(wall, 3),
+        "turns_per_second": round(len(latencies) / wall, 1) if wall else 0.0,
+        "client_p50_ms": round(1000 * percentile(latencies, 0.50), 3),
+        "client_p99_ms": round(1000 * percentile(latencies, 0.99), 3),
+        "server_turn_p99_ms": after["turn_p99_ms"],
+        "server_cpu_ms_per_turn": round(1000 * cpu_per_turn, 4),
+        "sessions_per_core": int(sessions_per_core),
+    }
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Dungeon server load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="mean seconds between commands per session")
+    parser.add_argument("--player-rate", type=float, default=2.0,
+                        help="commands per second of a real player (for sizing)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,272 +1,637 @@
-"""
-Main game loop module.
-Handles input, rendering, and core game logic flow.
-"""
-
-import sys
-from kostelnk_dungeon_game.game_io.save_load import save_game, load_game
-from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
-from kostelnk_dungeon_game.dungeon_core.beholder import Beholder
-from kostelnk_dungeon_game.dungeon_core.finds import Gold
-
-# ANSI colors
-YELLOW = "\033[93m"
-CYAN = "\033[96m"
-RED = "\033[91m"
-GREEN = "\033[92m"
-RESET = "\033[0m"
-
-
-class GameSession:
-    """
-    Encapsulates the game state and main loop logic to reduce complexity.
-    """
-    def __init__(self, dungeon, hero, beholder, renderer):
-        self.dungeon = dungeon
-        self.hero = hero
-        self.beholder = beholder
-        self.renderer = renderer
-        self.message = "Welcome! Press WASD to move, R to Rest, G to Regen map."
-        self.floors_history = {}
-        self.moves_on_floor = 0
-        self.action_taken = False
-
-    def handle_save_quit(self):
-        """Handles saving and quitting the game."""
-        confirm = input("Save before quit? (Y/N): ").lower().strip()
-        if confirm == 'y':
-            save_game(self.hero, self.beholder, self.dungeon)
-            print("Game saved successfully.")
-        print("Goodbye!")
-        sys.exit()
-
-    def handle_regenerate(self):
-        """Handles map regeneration command 'G'."""
-        if not (self.hero.x == 1 and self.hero.y == 1):
-            self.message = (f"{RED}You can only regenerate from "
-                            f"the starting position!{RESET}")
-            return
-
-        if self.moves_on_floor > 0:
-            self.message = (f"{RED}The flux is unstable! "
-                            f"You cannot regenerate after exploring.{RESET}")
-            return
-
-        self.dungeon.create_dungeon()
-        self.beholder.spawn_at_safe_location(
-            self.dungeon.floor_tiles, self.hero.x, self.hero.y
-        )
-        self.message = (f"{GREEN}Flux energy rewrites the reality! "
-                        f"Map regenerated.{RESET}")
-
-    def handle_stairs(self):
-        """Handles logic when player steps on stairs (>)."""
-        # Save current floor state
-        self.floors_history[self.dungeon.level] = (self.dungeon, self.beholder)
-
-        # Auto-save progress
-        save_game(self.hero, self.beholder, self.dungeon)
-        print(f"{GREEN}Progress saved.{RESET}")
-
-        next_level = self.dungeon.level + 1
-
-        if next_level in self.floors_history:
-            # Load existing floor
-            self.dungeon, self.beholder = self.floors_history[next_level]
-            self.hero.x, self.hero.y = 1, 1
-            self.message = f"Returned to floor {next_level}."
-        else:
-            # Generate new floor
-            self.dungeon = Dungeon(self.dungeon.size, level=next_level)
-            self.dungeon.create_dungeon()
-
-            # Create new Beholder
-            self.beholder = Beholder(0, 0, level=next_level)
-            self.hero.x, self.hero.y = 1, 1
-            self.beholder.spawn_at_safe_location(
-                self.dungeon.floor_tiles, self.hero.x, self.hero.y
-            )
-            self.message = f"Descended to floor {next_level}."
-
-        self.moves_on_floor = 0
-
-    def handle_combat(self, damage):
-        """Handles combat interaction with the Beholder."""
-        # Apply damage with immunity check
-        real_damage = self.beholder.take_damage(
-            damage,
-            getattr(self.hero, 'weapon', None),
-            getattr(self.hero, 'shield', None)
-        )
-
-        if real_damage > 0:
-            self.message = f"You hit Beholder for {real_damage} dmg!"
-        else:
-            self.message = (f"{RED}Your attack bounced off! "
-                            f"(You need a weapon/shield!){RESET}")
-
-        if self.beholder.hp <= 0:
-            self.message += f" {RED} YOU KILLED THE BEHOLDER! {RESET}"
-
-        self.hero.stamina = max(0, self.hero.stamina - 2)
-        self.action_taken = True
-
-    def handle_item_pickup(self):
-        """Handles picking up items from the ground."""
-        item = self.dungeon.get_item_at(self.hero.x, self.hero.y)
-        if item:
-            if isinstance(item, Gold):
-                self.hero.gold += item.amount
-                self.message = f"{YELLOW}You found {item.amount} Gold!{RESET}"
-            else:
-                success = self.hero.add_item(item)
-                if success:
-                    self.message = f"{CYAN}Picked up {item.name}!{RESET}"
-                else:
-                    self.dungeon.items[(self.hero.x, self.hero.y)] = item
-                    self.message = f"{RED}Inventory full!{RESET}"
-
-    def handle_movement(self, dx, dy):
-        """Handles player movement, combat, and environment interaction."""
-        target_x = self.hero.x + dx
-        target_y = self.hero.y + dy
-
-        # Combat Logic
-        if (self.beholder.hp > 0 and
-                (target_x, target_y) == (self.beholder.x, self.beholder.y)):
-            damage = getattr(self.hero, 'attack_power', 5)
-            self.handle_combat(damage)
-            return
-
-        # Movement Logic
-        moved = self.hero.move(dx, dy, self.dungeon)
-        if moved:
-            self.action_taken = True
-            self.handle_item_pickup()
-
-            # Stairs Logic
-            if self.dungeon.dungeon_map[self.hero.y][self.hero.x] == ">":
-                self.handle_stairs()
-
-    def process_command(self, cmd, cmd_raw):
-        """
-        Processes the parsed user command.
-        Returns False if the game loop should continue, True otherwise.
-        """
-        if cmd == 'q':
-            self.handle_save_quit()
-        elif cmd == 'save':
-            save_game(self.hero, self.beholder, self.dungeon)
-            self.message = "Game saved manually."
-        elif cmd == 'load':
-            load_game(self.hero, self.beholder, self.dungeon)
-            self.floors_history = {}
-            self.moves_on_floor = 0
-            self.message = "Game loaded."
-        elif cmd == 'r':
-            self.hero.rest()
-            self.message = "You took a rest to recover stamina."
-            self.action_taken = True
-        elif cmd == 'g':
-            self.handle_regenerate()
-        elif cmd == 'i':
-            print("\n=== INVENTORY ===")
-            print(f"Load: {self.hero.current_load} / Stamina: {self.hero.stamina}")
-            print(f"Gold: {self.hero.gold}")
-            print(f"Items: {len(self.hero.inventory)}/3")
-            for item in self.hero.inventory:
-                status = "[E]" if item.equipped else "   "
-                print(f"{status} {item.name} (Wt: {item.weight})")
-            input("Press Enter...")
-        elif cmd == 'e':
-            if len(cmd_raw) < 2:
-                self.message = "Usage: e <item_name>"
-            else:
-                target_name = " ".join(cmd_raw[1:])
-                self.message = self.hero.use_or_equip(target_name)
-                self.action_taken = True
-        elif cmd == 'x':
-            if len(cmd_raw) < 2:
-                self.message = "Usage: x <item_name>"
-            else:
-                target_name = " ".join(cmd_raw[1:])
-                dropped_item = self.hero.drop_item(target_name)
-                if not dropped_item:
-                    self.message = "Item not found in inventory."
-                else:
-                    self.dungeon.items[(self.hero.x, self.hero.y)] = dropped_item
-                    self.message = f"You dropped {dropped_item.name}."
-        elif cmd in ['w', 'a', 's', 'd']:
-            current_cost = 1 + self.hero.current_load
-            if self.hero.stamina < current_cost:
-                self.message = (f"{RED}Too heavy/tired! Cost: {current_cost}, "
-                                f"Stamina: {self.hero.stamina}. (Press 'R'){RESET}")
-            else:
-                dx, dy = 0, 0
-                if cmd == 'w':
-                    dy = -1
-                elif cmd == 's':
-                    dy = 1
-                elif cmd == 'a':
-                    dx = -1
-                elif cmd == 'd':
-                    dx = 1
-                self.handle_movement(dx, dy)
-        else:
-            self.message = "Unknown command."
-
-    def check_exhaustion(self):
-        """Checks if hero is overburdened and drops items if necessary."""
-        if self.hero.stamina < self.hero.current_load:
-            dropped_msg = []
-            for item in self.hero.inventory[:]:
-                if item.equipped:
-                    item.equipped = False
-                    self.hero.inventory.remove(item)
-                    self.dungeon.items[(self.hero.x, self.hero.y)] = item
-                    dropped_msg.append(item.name)
-
-            if dropped_msg:
-                names = ", ".join(dropped_msg)
-                self.message += (f" {RED}Collapsed from weight! "
-                                 f"Dropped: {names}!{RESET}")
-
-    def enemy_turn(self):
-        """Executes the enemy AI turn."""
-        if self.action_taken and self.beholder.hp > 0:
-            self.moves_on_floor += 1
-            self.beholder.update(self.hero, self.dungeon.dungeon_map)
-
-            if self.hero.hp <= 0:
-                self.renderer.render(
-                    self.dungeon, self.hero, self.beholder, f"{RED}YOU DIED!{RESET}"
-                )
-                return True  # Game Over
-        return False
-
-    def run(self):
-        """Runs the main loop."""
-        while True:
-            self.renderer.render(
-                self.dungeon, self.hero, self.beholder, self.message
-            )
-            self.message = ""
-            self.action_taken = False
-
-            cmd_raw = input("Action: ").lower().split()
-            if not cmd_raw:
-                continue
-
-            self.process_command(cmd_raw[0], cmd_raw)
-            self.check_exhaustion()
-            if self.enemy_turn():
-                break
-
-
-def game_loop(dungeon, hero, beholder, renderer):
-    """
-    Entry point for the game loop.
-    Creates a GameSession and runs it.
-    """
-    session = GameSession(dungeon, hero, beholder, renderer)
-    session.run()
+"""
+Main game loop module.
+Handles input, rendering, and core game logic flow.
+"""
+
+import re
+import sys
+from collections import deque
+from kostelnk_dungeon_game.game_io.save_load import save_game, load_game
+from kostelnk_dungeon_game.dungeon_core.dungeon import UP_STAIRS, Dungeon
+from kostelnk_dungeon_game.dungeon_core.generation import FloorSource
+from kostelnk_dungeon_game.dungeon_core.hero import Hero
+from kostelnk_dungeon_game.dungeon_core.beholder import Beholder
+from kostelnk_dungeon_game.dungeon_core.catchup import catch_up
+from kostelnk_dungeon_game.dungeon_core.floordelta import FloorDelta, collapse_floor
+from kostelnk_dungeon_game.dungeon_core.finds import Gold
+from kostelnk_dungeon_game.dungeon_core.metrics import REGISTRY
+from kostelnk_dungeon_game.dungeon_core.events import (
+    EventBus, DamageEvent, DeathEvent, DropEvent, LevelChangeEvent, PickupEvent
+)
+from kostelnk_dungeon_game.dungeon_core.pathcache import PathCache
+from kostelnk_dungeon_game.dungeon_core.travel import explore_path, path_keys, stairs_path
+from kostelnk_dungeon_game.game.scheduler import TurnScheduler
+from kostelnk_dungeon_game.game.snapshot import (
+    restore_snapshot, supports_snapshots, take_snapshot
+)
+from kostelnk_dungeon_game.game.speculate import Speculator
+from kostelnk_dungeon_game.game.memory import (
+    FloorSnapshots, MemoryMeter, cache_sizes, delta_size, monster_size
+)
+
+# ANSI colors
+RED = "\033[91m"
+GREEN = "\033[92m"
+RESET = "\033[0m"
+
+# Repeat-count prefix, e.g. "10d" walks right up to ten times
+REPEAT_COMMAND = re.compile(r"^(\d+)([wasdr])$")
+MAX_REPEAT = 100
+# A living monster this close (in steps, ignoring walls) interrupts a batch
+VIEW_DISTANCE = 8
+# Commands that can be undone, newest first; these are never undone
+UNDO_DEPTH = 20
+NO_UNDO = ('undo', 'save', 'load', 'q', 'i')
+# What load_game raises for a save it cannot use (corrupt, partial, other mode)
+LOAD_ERRORS = (ValueError, KeyError, TypeError, AttributeError, OSError)
+
+TURNS = REGISTRY.counter("dungeon_turns_total", "Hero turns played (rate() gives turns per second).")
+
+
+def initialize_new_game(map_size, level, dungeon_cls=Dungeon, floor_source=None):
+    """
+    Helper function to generate a fresh Dungeon, Hero, and Beholder.
+    `dungeon_cls` may be ChunkedDungeon for the unbounded floor mode,
+    `floor_source` a FloorSource (floor bank, best-of-N generation).
+    """
+    # 1. Create Dungeon
+    dungeon = (floor_source or FloorSource()).create(dungeon_cls, map_size, level)
+
+    # 2. Create Hero (Safe start at 1,1)
+    start_x, start_y = dungeon.get_valid_start_position()
+    hero = Hero(x=start_x, y=start_y)
+
+    # 3. Create Beholder
+    # FIX: Instantiate Beholder FIRST, then move it
+    beholder = Beholder(x=0, y=0, level=level)
+    beholder.spawn_at_safe_location(dungeon.floor_tiles, hero.x, hero.y, dungeon)
+
+    return dungeon, hero, beholder
+
+
+class GameSession:
+    """
+    Encapsulates the game state and main loop logic to reduce complexity.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, dungeon, hero, beholder, renderer,
+                 save_path="savefile.json", out=None):
+        """
+        Args:
+            save_path (str): Save slot used by save/load and autosave
+                (None = no autosave, for headless sessions).
+            out: Text stream for session output (None = current stdout).
+        """
+        # pylint: disable=too-many-arguments
+        self.dungeon = dungeon
+        self.hero = hero
+        self.beholder = beholder
+        self.renderer = renderer
+        self.save_path = save_path
+        self.out = out
+        self.message = "Welcome! Press WASD to move, R to Rest, G to Regen map."
+        self.floors_history = {}
+        self.floor_left_at = {}  # level -> turn the hero left it (for catch-up)
+        self.floor_exits = {}    # level -> stairs tile the hero went down from
+        self.moves_on_floor = 0
+        self.turn = 0  # hero turns taken in this session
+        self.action_taken = False
+
+        # Game log: entities emit events, the renderer (if any) subscribes
+        self.events = EventBus()
+        self.hero.events = self.events
+        if hasattr(renderer, "attach"):
+            renderer.attach(self.events)
+
+        # Monster BFS results, shared by all floors of this session
+        self.path_cache = PathCache()
+        self.memory = MemoryMeter()
+        self.memory_trace = None  # FloorSnapshots while tracing is enabled
+        self.floor_source = FloorSource()  # where new floors come from
+        # Lookahead planner for monsters (None = fixed priority rules)
+        self.planner = None
+        # Precomputes monster paths while waiting for input (None = off)
+        self.speculator = None
+        # Snapshots taken before recent commands (None = undo disabled)
+        self.undo_history = deque(maxlen=UNDO_DEPTH)
+        self.scheduler = None
+        self.start_floor()
+
+    def monsters(self):
+        """Returns the monsters on the current floor."""
+        return [self.beholder]
+
+    def start_floor(self):
+        """Connects the current floor's monsters to the event bus and turn queue."""
+        for monster in self.monsters():
+            monster.events = self.events
+            monster.path_cache = self.path_cache
+            monster.floor = self.dungeon
+            monster.planner = self.planner
+        self.scheduler = TurnScheduler(self.monsters())
+        if self.memory_trace is not None:
+            self.memory_trace.take(f"floor {self.dungeon.level}")
+
+    def set_planner(self, planner):
+        """Lets the monsters plan ahead with `planner` (None = fixed priorities)."""
+        self.planner = planner
+        for monster in self.monsters():
+            monster.planner = planner
+
+    def trace_memory(self, enabled: bool = True):
+        """
+        Turns tracemalloc snapshots at every floor start on or off.
+        memory_report() then lists the allocation sites that grew.
+        """
+        if enabled and self.memory_trace is None:
+            self.memory_trace = FloorSnapshots()
+            self.memory_trace.take(f"floor {self.dungeon.level}")
+        elif not enabled and self.memory_trace is not None:
+            self.memory_trace.stop()
+            self.memory_trace = None
+
+    def memory_report(self) -> dict:
+        """
+        Approximate bytes held per floor, per subsystem and in total.
+        Floors whose version did not change are not measured again.
+        """
+        floors, collapsed = {}, {}
+        for level, entry in self.floors_history.items():
+            if isinstance(entry, FloorDelta):
+                collapsed[level] = entry
+            else:
+                floors[id(entry[0])] = (level, entry[0], [entry[1]])
+        floors[id(self.dungeon)] = (self.dungeon.level, self.dungeon, self.monsters())
+        self.memory.forget_except(dungeon for _, dungeon, _ in floors.values())
+
+        subsystems = {"map": 0, "items": 0, "floor_index": 0, "monsters": 0, "caches": 0}
+        per_floor = {}
+        for level, dungeon, monsters in floors.values():
+            sizes = dict(self.memory.floor(dungeon))
+            sizes["monsters"] = sum(monster_size(m) for m in monsters)
+            sizes["total"] = sizes.pop("total") + sizes["monsters"]
+            per_floor[level] = sizes
+            subsystems["map"] += sizes["map"]
+            subsystems["items"] += sizes["items"]
+            subsystems["floor_index"] += sizes["index"]
+            subsystems["monsters"] += sizes["monsters"]
+            subsystems["caches"] += sizes["save_cache"]
+        for level, delta in collapsed.items():
+            size = delta_size(delta)
+            per_floor[level] = {"collapsed": size, "total": size}
+            subsystems["map"] += size
+
+        caches = cache_sizes(self)
+        subsystems["caches"] += sum(caches.values())
+        report = {
+            "floors": per_floor,
+            "subsystems": subsystems,
+            "caches": caches,
+            "total": sum(subsystems.values()),
+        }
+        if self.memory_trace is not None:
+            report["growth"] = self.memory_trace.last_diff
+        return report
+
+    def read_save(self):
+        """
+        Loads the save slot into new objects and returns (dungeon, hero,
+        beholder), so a failed load leaves the current game untouched.
+        """
+        dungeon = type(self.dungeon)(size=self.dungeon.size, level=1)
+        hero = Hero(0, 0)
+        beholder = Beholder(0, 0)
+        load_game(hero, beholder, dungeon, self.save_path)
+        return dungeon, hero, beholder
+
+    def use_loaded(self, loaded):
+        """Switches the session to a game returned by read_save()."""
+        self.dungeon, self.hero, self.beholder = loaded
+        self.hero.events = self.events
+        self.reset_after_load()
+
+    def reset_after_load(self):
+        """Forgets the floors of the old game after loading a save."""
+        if self.undo_history is not None:
+            self.undo_history.clear()
+        self.floors_history = {}
+        self.floor_left_at = {}
+        self.floor_exits = {}
+        self.moves_on_floor = 0
+        self.start_floor()
+        self.message = "Game loaded."
+
+    def handle_save_quit(self):
+        """Handles saving and quitting the game."""
+        confirm = input("Save before quit? (Y/N): ").lower().strip()
+        if confirm == 'y':
+            save_game(self.hero, self.beholder, self.dungeon, self.save_path)
+            print("Game saved successfully.", file=self.out)
+        print("Goodbye!", file=self.out)
+        sys.exit()
+
+    def handle_regenerate(self):
+        """Handles map regeneration command 'G'."""
+        if not (self.hero.x == 1 and self.hero.y == 1):
+            self.message = (f"{RED}You can only regenerate from "
+                            f"the starting position!{RESET}")
+            return
+
+        if self.moves_on_floor > 0:
+            self.message = (f"{RED}The flux is unstable! "
+                            f"You cannot regenerate after exploring.{RESET}")
+            return
+
+        self.dungeon = self.new_floor(self.dungeon.level)
+        self.beholder.spawn_at_safe_location(
+            self.dungeon.floor_tiles, self.hero.x, self.hero.y, self.dungeon
+        )
+        self.start_floor()
+        self.message = (f"{GREEN}Flux energy rewrites the reality! "
+                        f"Map regenerated.{RESET}")
+
+    def save_progress(self):
+        """Autosaves when the hero takes the stairs."""
+        save_game(self.hero, self.beholder, self.dungeon, self.save_path)
+        print(f"{GREEN}Progress saved.{RESET}", file=self.out)
+
+    def new_floor(self, level):
+        """
+        Generates a floor of the same kind as the current one (classic or
+        chunked). Floors below the first get stairs up on the start tile.
+        """
+        dungeon = self.floor_source.create(type(self.dungeon), self.dungeon.size, level)
+        if level > 1:
+            dungeon.set_tile(*dungeon.get_valid_start_position(), UP_STAIRS)
+        return dungeon
+
+    def handle_stairs(self, step: int = 1):
+        """
+        Handles logic when player steps on stairs: down (>) with step 1,
+        back up (<) with step -1.
+        """
+        old_level = self.dungeon.level
+        # Save current floor state: seed + changes where possible
+        self.floors_history[old_level] = (
+            collapse_floor(self.dungeon, self.beholder) or (self.dungeon, self.beholder))
+        self.floor_left_at[old_level] = self.turn
+        if step > 0:
+            self.floor_exits[old_level] = (self.hero.x, self.hero.y)
+
+        # Auto-save progress (headless sessions have no save file)
+        if self.save_path is not None:
+            self.save_progress()
+
+        next_level = old_level + step
+        revisited = next_level in self.floors_history
+
+        if revisited:
+            # Load existing floor; its monsters catch up on the turns missed
+            entry = self.floors_history.pop(next_level)
+            if isinstance(entry, FloorDelta):
+                entry = entry.restore()
+            self.dungeon, self.beholder = entry
+            self.hero.x, self.hero.y = self.dungeon.get_valid_start_position()
+            if step < 0 and next_level in self.floor_exits:
+                self.hero.x, self.hero.y = self.floor_exits[next_level]
+            away = self.turn - self.floor_left_at.pop(next_level, self.turn)
+            catch_up(self.dungeon, [self.beholder], away, (self.hero.x, self.hero.y))
+        else:
+            # Generate new floor (going up, only after loading a save)
+            self.dungeon = self.new_floor(next_level)
+            self.hero.x, self.hero.y = self.dungeon.get_valid_start_position()
+            if step < 0 and self.dungeon.stairs_pos:
+                self.hero.x, self.hero.y = self.dungeon.stairs_pos
+
+            # Create new Beholder
+            self.beholder = Beholder(0, 0, level=next_level)
+            self.beholder.spawn_at_safe_location(
+                self.dungeon.floor_tiles, self.hero.x, self.hero.y, self.dungeon
+            )
+
+        self.events.emit(LevelChangeEvent(old_level, next_level, revisited))
+        self.start_floor()
+        self.moves_on_floor = 0
+
+    def handle_combat(self, damage):
+        """Handles combat interaction with the Beholder."""
+        # Apply damage with immunity check
+        real_damage = self.beholder.take_damage(
+            damage,
+            self.hero.weapon,
+            self.hero.shield
+        )
+
+        self.events.emit(DamageEvent("Hero", self.beholder.name, real_damage, "melee"))
+        if self.beholder.hp <= 0:
+            self.events.emit(DeathEvent(self.beholder.name))
+
+        self.hero.stamina = max(0, self.hero.stamina - 2)
+        self.action_taken = True
+
+    def handle_item_pickup(self):
+        """Handles picking up items from the ground."""
+        item = self.dungeon.take_item(self.hero.x, self.hero.y)
+        if item:
+            if isinstance(item, Gold):
+                self.hero.gold += item.amount
+                self.events.emit(PickupEvent(item.name, item.type, item.amount))
+            else:
+                success = self.hero.add_item(item)
+                if success:
+                    self.events.emit(PickupEvent(item.name, item.type, 0))
+                else:
+                    self.dungeon.place_item(self.hero.x, self.hero.y, item)
+                    self.message = f"{RED}Inventory full!{RESET}"
+
+    def handle_movement(self, dx, dy):
+        """Handles player movement, combat, and environment interaction."""
+        target_x = self.hero.x + dx
+        target_y = self.hero.y + dy
+
+        # Combat Logic
+        if (self.beholder.hp > 0 and
+                (target_x, target_y) == (self.beholder.x, self.beholder.y)):
+            self.handle_combat(self.hero.attack)
+            return
+
+        # Movement Logic
+        moved = self.hero.move(dx, dy, self.dungeon)
+        if moved:
+            self.action_taken = True
+            self.handle_item_pickup()
+
+            # Stairs Logic
+            tile = self.dungeon.dungeon_map[self.hero.y][self.hero.x]
+            if tile == ">":
+                self.handle_stairs()
+            elif tile == UP_STAIRS:
+                self.handle_stairs(-1)
+
+    def inventory_lines(self):
+        """Builds the inventory screen as a list of text lines."""
+        lines = [
+            "=== INVENTORY ===",
+            f"Load: {self.hero.current_load} / Stamina: {self.hero.stamina}",
+            f"Gold: {self.hero.gold}",
+            f"Items: {len(self.hero.inventory)}/3",
+        ]
+        for item in self.hero.inventory:
+            status = "[E]" if item.equipped else "   "
+            lines.append(f"{status} {item.name} (Wt: {item.weight})")
+        return lines
+
+    def show_inventory(self):
+        """Prints the inventory and waits for the player."""
+        print(file=self.out)
+        for line in self.inventory_lines():
+            print(line, file=self.out)
+        input("Press Enter...")
+
+    def process_command(self, cmd, cmd_raw):
+        """
+        Processes the parsed user command.
+        Returns False if the game loop should continue, True otherwise.
+        """
+        if cmd == 'q':
+            self.handle_save_quit()
+        elif cmd == 'save':
+            save_game(self.hero, self.beholder, self.dungeon, self.save_path)
+            self.message = "Game saved manually."
+        elif cmd == 'load':
+            try:
+                self.use_loaded(self.read_save())
+            except FileNotFoundError:
+                self.message = "No saved game found."
+            except LOAD_ERRORS as e:
+                self.message = f"{RED}Could not load the save: {e}{RESET}"
+        elif cmd == 'undo':
+            self.undo()
+        elif cmd == 'r':
+            self.hero.rest()
+            self.action_taken = True
+        elif cmd == 'g':
+            self.handle_regenerate()
+        elif cmd == 'i':
+            self.show_inventory()
+        elif cmd == 'e':
+            if len(cmd_raw) < 2:
+                self.message = "Usage: e <item_name>"
+            else:
+                target_name = " ".join(cmd_raw[1:])
+                self.message = self.hero.use_or_equip(target_name)
+                self.action_taken = True
+        elif cmd == 'x':
+            if len(cmd_raw) < 2:
+                self.message = "Usage: x <item_name>"
+            else:
+                target_name = " ".join(cmd_raw[1:])
+                dropped_item = self.hero.drop_item(target_name)
+                if not dropped_item:
+                    self.message = "Item not found in inventory."
+                else:
+                    self.dungeon.place_item(self.hero.x, self.hero.y, dropped_item)
+                    self.events.emit(DropEvent((dropped_item.name,), "command"))
+        elif cmd in ['w', 'a', 's', 'd']:
+            current_cost = 1 + self.hero.current_load
+            if self.hero.stamina < current_cost:
+                self.message = (f"{RED}Too heavy/tired! Cost: {current_cost}, "
+                                f"Stamina: {self.hero.stamina}. (Press 'R'){RESET}")
+            else:
+                dx, dy = 0, 0
+                if cmd == 'w':
+                    dy = -1
+                elif cmd == 's':
+                    dy = 1
+                elif cmd == 'a':
+                    dx = -1
+                elif cmd == 'd':
+                    dx = 1
+                self.handle_movement(dx, dy)
+        else:
+            self.message = "Unknown command."
+
+    def check_exhaustion(self):
+        """Checks if hero is overburdened and drops items if necessary."""
+        if self.hero.stamina < self.hero.current_load:
+            dropped_msg = []
+            for item in self.hero.inventory[:]:
+                if item.equipped:
+                    item.equipped = False
+                    self.hero.inventory.remove(item)
+                    self.dungeon.place_item(self.hero.x, self.hero.y, item)
+                    dropped_msg.append(item.name)
+
+            if dropped_msg:
+                self.events.emit(DropEvent(tuple(dropped_msg), "exhaustion"))
+
+    def enemy_turn(self):
+        """Lets every monster that is due before the hero's next turn act."""
+        if self.action_taken:
+            if self.speculator is not None:
+                self.speculator.commit(self)
+            self.moves_on_floor += 1
+            self.turn += 1
+            TURNS.inc()
+            self.scheduler.end_hero_turn(self.hero, self.dungeon.dungeon_map)
+
+            if self.hero.hp <= 0:
+                self.events.emit(DeathEvent("Hero"))
+                if self.renderer is not None:
+                    self.renderer.render(
+                        self.dungeon, self.hero, self.beholder, self.message
+                    )
+                return True  # Game Over
+        return False
+
+    def monster_in_view(self) -> bool:
+        """True if a living monster is close enough to interrupt a batch."""
+        return any(monster.is_alive()
+                   and monster.manhattan_distance(self.hero.x, self.hero.y) <= VIEW_DISTANCE
+                   for monster in self.monsters())
+
+    def batch_for(self, cmd_raw):
+        """
+        Expands travel, explore and repeat-count commands into single-key
+        commands. Returns None for ordinary commands.
+        """
+        cmd = cmd_raw[0]
+        start = (self.hero.x, self.hero.y)
+        blocked = {(m.x, m.y) for m in self.monsters() if m.is_alive()}
+        if cmd == 'travel':
+            if cmd_raw[1:] not in (['>'], [UP_STAIRS]):
+                self.message = "Usage: travel > (or travel <)"
+                return []
+            path = stairs_path(self.dungeon, start, blocked, cmd_raw[1])
+            if path is None:
+                self.message = "There is no way to the stairs."
+                return []
+            return path_keys(start, path)
+        if cmd == 'explore':
+            path = explore_path(self.dungeon, start, blocked)
+            if path is None:
+                self.message = "Nothing left to explore."
+                return []
+            return path_keys(start, path)
+        match = REPEAT_COMMAND.match(cmd)
+        if match:
+            return [match.group(2)] * min(int(match.group(1)), MAX_REPEAT)
+        return None
+
+    def batch_turns(self, keys):
+        """
+        Plays single-key commands as a batch of turns, one turn per
+        iteration; yields True when the game is over. Stops early when a
+        monster comes into view, the hero gets hurt or runs out of stamina,
+        or the floor changes.
+        """
+        level = self.dungeon.level
+        monster_seen = self.monster_in_view()
+        last_message = self.message
+        for key in keys:
+            hp_before, pos_before = self.hero.hp, (self.hero.x, self.hero.y)
+            if self.play_single_turn([key]):
+                yield True
+                return
+            last_message = self.message = self.message or last_message
+
+            if not self.action_taken or self.dungeon.level != level:
+                return
+            if key != 'r' and (self.hero.x, self.hero.y) == pos_before:
+                return  # attacked instead of moving
+            if self.hero.hp < hp_before:
+                self.message = f"{RED}You are hurt! Stopping.{RESET}"
+                return
+            if not monster_seen and self.monster_in_view():
+                self.message = f"{RED}A monster comes into view! Stopping.{RESET}"
+                return
+            if key == 'r':
+                if self.hero.stamina >= self.hero.max_stamina:
+                    return
+            elif self.hero.stamina < 1 + self.hero.current_load:
+                self.message = f"{RED}Out of stamina! Stopping.{RESET}"
+                return
+            yield False
+
+    def run_batch(self, keys):
+        """
+        Plays a batch of turns at once (rendered once, by the caller).
+        Returns True when the game is over.
+        """
+        return any(self.batch_turns(keys))
+
+    def undo(self):
+        """Goes back to the state before the last command."""
+        if not self.undo_history:
+            self.message = "Nothing to undo."
+            return
+        restore_snapshot(self, self.undo_history.pop())
+        self.message = f"{GREEN}Undone.{RESET}"
+
+    def play_single_turn(self, cmd_raw):
+        """
+        Runs one parsed player command followed by the enemy turn.
+        Returns True when the game is over.
+        """
+        self.message = ""
+        self.action_taken = False
+
+        self.process_command(cmd_raw[0], cmd_raw)
+        self.check_exhaustion()
+        return self.enemy_turn()
+
+    def play_turn(self, cmd_raw):
+        """
+        Runs one line of player input: a single command, or a batch of
+        turns for travel / explore / repeat counts.
+        Returns True when the game is over.
+        """
+        self.message = ""
+        snapshot = None
+        if (self.undo_history is not None and cmd_raw[0] not in NO_UNDO
+                and supports_snapshots(self)):
+            snapshot = take_snapshot(self)
+            before = (self.dungeon, self.dungeon.version, self.turn)
+
+        batch = self.batch_for(cmd_raw)
+        if batch is not None:
+            game_over = self.run_batch(batch)
+        else:
+            game_over = self.play_single_turn(cmd_raw)
+
+        # Commands that changed nothing (a wall bump, a typo) are not undo steps
+        if snapshot is not None and before != (self.dungeon, self.dungeon.version, self.turn):
+            self.undo_history.append(snapshot)
+        return game_over
+
+    def run(self):
+        """Runs the main loop."""
+        while True:
+            self.renderer.render(
+                self.dungeon, self.hero, self.beholder, self.message
+            )
+            self.message = ""
+
+            if self.speculator is not None:
+                self.speculator.start(self)
+            cmd_raw = input("Action: ").lower().split()
+            if not cmd_raw:
+                continue
+
+            if self.play_turn(cmd_raw):
+                break
+
+
+def game_loop(dungeon, hero, beholder, renderer, floor_source=None, planner=None):
+    """
+    Entry point for the game loop.
+    Creates a GameSession and runs it.
+    """
+    # pylint: disable=too-many-arguments
+    session = GameSession(dungeon, hero, beholder, renderer)
+    session.speculator = Speculator()
+    if floor_source is not None:
+        session.floor_source = floor_source
+    if planner is not None:
+        session.set_planner(planner)
+    session.run()
@@ -0,0 +1,190 @@
+"""
+Memory introspection for game sessions.
+Sizes are shallow sys.getsizeof sums over the containers that make up a
+floor (map rows, item objects, indexes, caches), so they are approximate
+but cheap: a floor is measured again only after its version changed.
+tracemalloc snapshots between floors are optional, because tracing slows
+every allocation down.
+"""
+
+import sys
+import tracemalloc
+from collections import deque
+
+# Shared objects (tile strings, small ints) are not counted
+_TUPLE2 = sys.getsizeof((1000, 1000))
+
+
+def _object_size(obj) -> int:
+    """Size of an object plus its attribute dict."""
+    size = sys.getsizeof(obj)
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+    return size
+
+
+def _rows_size(rows) -> int:
+    """Size of a list of lists (e.g. map rows or renderer cells)."""
+    return sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+
+
+def _tiles_size(container) -> int:
+    """Size of a container of (x, y) tuples, counting each tuple once."""
+    return sys.getsizeof(container) + len(container) * _TUPLE2
+
+
+def map_size(dungeon) -> int:
+    """Bytes held by the tiles of a floor."""
+    chunks = getattr(dungeon, "chunks", None)
+    if chunks is not None:
+        return sys.getsizeof(chunks) + sum(
+            _object_size(chunk) + _rows_size(chunk.tiles) for chunk in chunks.values())
+    return _rows_size(dungeon.dungeon_map)
+
+
+def items_size(dungeon) -> int:
+    """Bytes held by the items lying on a floor."""
+    chunks = getattr(dungeon, "chunks", None)
+    if chunks is not None:
+        containers = [chunk.items for chunk in chunks.values()]
+    else:
+        containers = [dungeon.items]
+    return sum(_tiles_size(items) + sum(_object_size(item) for item in items.values())
+               for items in containers)
+
+
+def index_size(dungeon) -> int:
+    """
+    Bytes held by derived floor data (tile lists, connectivity, distances).
+    These structures share their coordinate tuples, so tuples are counted
+    once, with the connectivity index.
+    """
+    size = sys.getsizeof(getattr(dungeon, "floor_tiles", []))
+    connectivity = getattr(dungeon, "connectivity", None)
+    if connectivity is not None:
+        size += _tiles_size(connectivity.parent) + sys.getsizeof(connectivity.members)
+        size += sum(sys.getsizeof(tiles) for tiles in connectivity.members.values())
+    analysis = getattr(dungeon, "analysis", None)
+    if analysis is not None:
+        size += sys.getsizeof(analysis.distance) + sys.getsizeof(analysis.order)
+        size += sys.getsizeof(analysis.first_index) + sys.getsizeof(analysis.dead_ends)
+        size += sys.getsizeof(analysis.chokepoints)
+    changes = getattr(dungeon, "changes", None)
+    if changes is not None:
+        size += sys.getsizeof(changes.cells) + len(changes.cells) * sys.getsizeof((1, 1, 1))
+    return size
+
+
+def save_cache_size(dungeon) -> int:
+    """Bytes held by the cached serialized floor (rows only, items are small)."""
+    cached = getattr(dungeon, "save_cache", None)
+    if not cached:
+        return 0
+    data = cached[1]
+    return _rows_size(data.get("map", [])) + sys.getsizeof(data.get("items", []))
+
+
+class FloorSnapshots:
+    """
+    tracemalloc snapshots taken whenever a floor starts, to find what grows
+    from one floor to the next.
+    """
+
+    def __init__(self, frames: int = 1, keep: int = 2):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(frames)
+        self.snapshots = deque(maxlen=keep)
+        self.last_diff = []  # diff of the last two snapshots, kept for reports
+
+    def take(self, label: str):
+        """Records a snapshot (allocations of tracemalloc itself are filtered out)."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        self.snapshots.append((label, snapshot))
+        self.last_diff = self.diff()
+
+    def diff(self, limit: int = 10) -> list[str]:
+        """Top allocation sites that grew between the last two snapshots."""
+        if len(self.snapshots) < 2:
+            return []
+        (old_label, old), (new_label, new) = self.snapshots[-2], self.snapshots[-1]
+        lines = [f"{old_label} -> {new_label}"]
+        for stat in new.compare_to(old, "lineno")[:limit]:
+            lines.append(str(stat))
+        return lines
+
+    def stop(self):
+        """Stops tracing if these snapshots started it."""
+        self.snapshots.clear()
+        if self.started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class MemoryMeter:
+    """
+    Measures floors and caches for GameSession.memory_report().
+    Floor sizes are cached by (floor id, version, loaded chunks).
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.floor_cache = {}
+
+    def floor(self, dungeon) -> dict:
+        """Bytes per subsystem of one floor."""
+        key = (getattr(dungeon, "floor_id", id(dungeon)), getattr(dungeon, "version", None),
+               len(getattr(dungeon, "chunks", ())))
+        cached = self.floor_cache.get(id(dungeon))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        sizes = {
+            "map": map_size(dungeon),
+            "items": items_size(dungeon),
+            "index": index_size(dungeon),
+            "save_cache": save_cache_size(dungeon),
+        }
+        sizes["total"] = sum(sizes.values())
+        self.floor_cache[id(dungeon)] = (key, sizes)
+        return sizes
+
+    def forget_except(self, dungeons):
+        """Drops cached measurements of floors that no longer exist."""
+        alive = {id(d) for d in dungeons}
+        for key in [k for k in self.floor_cache if k not in alive]:
+            del self.floor_cache[key]
+
+
+def delta_size(delta) -> int:
+    """Bytes held by a collapsed floor (seed plus changed cells)."""
+    return (sys.getsizeof(delta) + sys.getsizeof(delta.cells)
+            + len(delta.cells) * 2 * _TUPLE2
+            + sum(_object_size(item) for _, item in delta.cells.values() if item is not None))
+
+
+def monster_size(monster) -> int:
+    """Bytes held by one monster."""
+    return _object_size(monster)
+
+
+def cache_sizes(session) -> dict:
+    """Bytes held by session level caches and buffers."""
+    sizes = {}
+    path_cache = getattr(session, "path_cache", None)
+    if path_cache is not None:
+        entries = path_cache.entries
+        sample = next(iter(entries), None)
+        per_entry = sys.getsizeof(sample) + 2 * _TUPLE2 if sample else 0
+        sizes["path_cache"] = sys.getsizeof(entries) + len(entries) * per_entry
+    renderer = getattr(session, "renderer", None)
+    if renderer is not None and hasattr(renderer, "floor_cells"):
+        sizes["renderer"] = (_rows_size(renderer.floor_cells)
+                             + sum(sys.getsizeof(line) for line in renderer.floor_lines))
+    events = getattr(session, "events", None)
+    if events is not None:
+        sizes["events"] = sys.getsizeof(events.buffer) + sum(
+            sys.getsizeof(event) for event in events.buffer)
+    return sizes
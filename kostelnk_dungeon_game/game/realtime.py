@@ -0,0 +1,301 @@
+"""
+Real-time game loop module.
+Runs the simulation on a fixed tick rate with asyncio, so monsters act on
+their own timing instead of waiting for the player to press Enter.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+from kostelnk_dungeon_game.dungeon_core.events import DeathEvent
+from kostelnk_dungeon_game.game.loop import GameSession, GREEN, LOAD_ERRORS, RED, RESET, TURNS
+from kostelnk_dungeon_game.game_io.save_load import serialize_game, write_save_data
+
+
+class TickJob:
+    """
+    A task that runs every `period` ticks on the simulation clock.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, name: str, period: int, callback):
+        self.name = name
+        self.period = max(1, period)
+        self.callback = callback
+        self.next_tick = self.period
+        self.runs = 0
+        self.total_time = 0.0
+
+
+class RealtimeSession(GameSession):
+    """
+    Game session driven by a fixed-rate asyncio clock.
+
+    Player commands are read by a background thread and applied on the next
+    tick; travel, explore and repeat counts play one step per tick. Monster
+    AI, stamina regeneration and autosave are TickJobs, and the screen is
+    redrawn by a separate task only when the state changed.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, dungeon, hero, beholder, renderer, *,
+                 tick_rate: int = 20,
+                 monster_interval: float = 0.5,
+                 regen_interval: float = 2.0,
+                 autosave_interval: float = 60.0,
+                 fps: int = 15,
+                 save_path: str = "savefile.json"):
+        # pylint: disable=too-many-arguments
+        super().__init__(dungeon, hero, beholder, renderer, save_path)
+        self.tick_rate = tick_rate
+        self.fps = fps
+        self.tick_count = 0
+        self.late_ticks = 0
+        self.running = False
+        self.dirty = True
+        self.game_over = False
+        self.pending_quit = False
+        self.commands = None
+        self.batch = None  # batch_turns() of a running travel / repeat command
+
+        def ticks(seconds):
+            return round(seconds * tick_rate)
+
+        self.jobs = [
+            TickJob("monsters", ticks(monster_interval), self.monster_job),
+            TickJob("regen", ticks(regen_interval), self.regen_job),
+            TickJob("autosave", ticks(autosave_interval), self.autosave_job),
+        ]
+        self._save_task = None
+        self._load_task = None
+
+    # --- Scheduled jobs ---
+
+    def monster_job(self):
+        """Lets every living monster act for one turn."""
+        for monster in self.monsters():
+            if monster.is_alive():
+                monster.update(self.hero, self.dungeon.dungeon_map)
+        self.dirty = True
+        if self.hero.hp <= 0:
+            self.game_over = True
+            self.events.emit(DeathEvent("Hero"))
+
+    def regen_job(self):
+        """Slowly regenerates stamina while time passes."""
+        if self.hero.stamina < self.hero.max_stamina:
+            self.hero.stamina += 1
+            self.dirty = True
+
+    def autosave_job(self):
+        """Saves periodically without blocking the loop."""
+        if self._save_task is not None and not self._save_task.done():
+            return  # previous write still in progress
+        self.save_in_background()
+
+    def save_in_background(self):
+        """
+        Serializes the state now and writes it on a worker thread, after
+        any write still in progress.
+        """
+        data = serialize_game(self.hero, self.beholder, self.dungeon)
+        previous = self._save_task
+
+        async def write():
+            if previous is not None:
+                await previous
+            await asyncio.to_thread(write_save_data, data, self.save_path)
+
+        self._save_task = asyncio.ensure_future(write())
+
+    def save_progress(self):
+        """Autosaves on the stairs without blocking the tick."""
+        self.save_in_background()
+        self.message = f"{GREEN}Progress saved.{RESET}"
+
+    async def load_in_background(self):
+        """
+        Reads the save slot on a worker thread, after any write still in
+        progress, then switches to the loaded game.
+        """
+        if self._save_task is not None:
+            await self._save_task
+        try:
+            loaded = await asyncio.to_thread(self.read_save)
+        except FileNotFoundError:
+            self.message = "No saved game found."
+        except LOAD_ERRORS as e:
+            self.message = f"{RED}Could not load the save: {e}{RESET}"
+        else:
+            self.batch = None
+            self.use_loaded(loaded)
+        self.dirty = True
+
+    # --- Commands ---
+
+    def show_inventory(self):
+        """Shows the inventory in the message log instead of blocking."""
+        self.message = " | ".join(self.inventory_lines())
+
+    def process_command(self, cmd, cmd_raw):
+        """Saves and loads run on worker threads instead of blocking the tick."""
+        if cmd == 'save':
+            self.save_in_background()
+            self.message = "Game saved manually."
+        elif cmd == 'load':
+            if self._load_task is None or self._load_task.done():
+                self._load_task = asyncio.ensure_future(self.load_in_background())
+                self.message = "Loading..."
+        else:
+            super().process_command(cmd, cmd_raw)
+
+    def handle_save_quit(self):
+        """Asks for confirmation; the answer arrives as the next command."""
+        self.pending_quit = True
+        self.message = "Save before quit? (Y/N)"
+
+    def _finish_quit(self, answer):
+        """The save is written in the background; run_async waits for it."""
+        if answer == 'y':
+            self.save_in_background()
+            self.message = f"{GREEN}Game saved successfully.{RESET} Goodbye!"
+        else:
+            self.message = "Goodbye!"
+        self.running = False
+
+    def apply_command(self, line):
+        """
+        Applies one line of player input to the simulation.
+        None means the input stream was closed.
+        """
+        if line is None:
+            self.running = False
+            return
+        cmd_raw = line.lower().split()
+        if self.pending_quit:
+            self.pending_quit = False
+            self._finish_quit(cmd_raw[0] if cmd_raw else 'n')
+            return
+        if not cmd_raw:
+            return
+
+        self.batch = None  # new input interrupts travel
+        if self.play_turn(cmd_raw):
+            self.game_over = True
+        self.dirty = True
+
+    def run_batch(self, keys):
+        """Plays the first turn of a batch now and the others on the following ticks."""
+        self.batch = self.batch_turns(keys)
+        return self.next_batch_turn()
+
+    def next_batch_turn(self) -> bool:
+        """Plays the next turn of the running batch. Returns True when the game is over."""
+        game_over = next(self.batch, None)
+        if game_over is None:
+            self.batch = None
+        return bool(game_over)
+
+    def enemy_turn(self):
+        """Counts the hero's turn; monsters act on the clock (monster_job)."""
+        if self.action_taken:
+            self.moves_on_floor += 1
+            self.turn += 1
+            TURNS.inc()
+        return False
+
+    # --- Clock ---
+
+    def tick(self):
+        """Advances the simulation by one tick."""
+        self.tick_count += 1
+        while not self.commands.empty() and self.running and not self.game_over:
+            self.apply_command(self.commands.get_nowait())
+        if self.batch is not None and self.running and not self.game_over:
+            if self.next_batch_turn():
+                self.game_over = True
+            self.dirty = True
+
+        for job in self.jobs:
+            if self.game_over or not self.running:
+                break
+            if self.tick_count >= job.next_tick:
+                start = time.perf_counter()
+                job.callback()
+                job.total_time += time.perf_counter() - start
+                job.runs += 1
+                job.next_tick += job.period
+
+    async def _tick_loop(self):
+        """Runs ticks at a fixed rate, correcting for drift."""
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.tick_rate
+        next_time = loop.time()
+
+        while self.running and not self.game_over:
+            self.tick()
+            next_time += period
+            delay = next_time - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                if delay < -5 * period:
+                    # Far behind: resync instead of bursting through old ticks
+                    next_time = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def _render_loop(self):
+        """Redraws the screen at most `fps` times per second."""
+        period = 1.0 / self.fps
+        while self.running and not self.game_over:
+            if self.dirty:
+                self.dirty = False
+                self.renderer.render(
+                    self.dungeon, self.hero, self.beholder, self.message
+                )
+            await asyncio.sleep(period)
+
+    def _start_input_thread(self, loop):
+        """Reads stdin lines on a daemon thread and queues them for the loop."""
+        def reader():
+            for line in sys.stdin:
+                loop.call_soon_threadsafe(self.commands.put_nowait, line)
+            loop.call_soon_threadsafe(self.commands.put_nowait, None)
+
+        threading.Thread(target=reader, name="input", daemon=True).start()
+
+    async def run_async(self):
+        """Runs the real-time session until the player quits or dies."""
+        loop = asyncio.get_running_loop()
+        self.commands = asyncio.Queue()
+        self.running = True
+        self._start_input_thread(loop)
+
+        await asyncio.gather(self._tick_loop(), self._render_loop())
+
+        if self._load_task is not None:
+            await self._load_task
+        if self._save_task is not None:
+            await self._save_task
+        self.renderer.render(self.dungeon, self.hero, self.beholder, self.message)
+
+    def run(self):
+        """Blocking entry point."""
+        asyncio.run(self.run_async())
+
+
+def realtime_loop(dungeon, hero, beholder, renderer, floor_source=None, planner=None,
+                  **options):
+    """
+    Entry point for the real-time game loop.
+    Creates a RealtimeSession and runs it.
+    """
+    # pylint: disable=too-many-arguments
+    session = RealtimeSession(dungeon, hero, beholder, renderer, **options)
+    if floor_source is not None:
+        session.floor_source = floor_source
+    if planner is not None:
+        session.set_planner(planner)
+    session.run()
@@ -0,0 +1,94 @@
+"""
+Energy-based turn scheduler.
+Actors act in order of their next due time, kept in a heap, so every hero
+turn only touches the actors that are actually due.
+"""
+
+import heapq
+import itertools
+
+# Time units in one hero turn (an actor with speed 100 acts once per turn)
+TURN = 100
+
+
+def action_delay(cost: int, speed: int) -> int:
+    """Time until an actor can act again after spending `cost` energy."""
+    return max(1, cost * TURN // max(1, speed))
+
+
+class TurnScheduler:
+    """
+    Priority queue of (due time, actor).
+
+    Actor protocol: `speed` (energy gained per hero turn), `is_alive()`,
+    `act(hero, dungeon_map, energy) -> energy cost` (energy = what is left
+    of the hero turn at the time the actor acts), optional `asleep` flag.
+
+    - Sleeping actors are not in the queue until `wake()` is called.
+    - With a `wake_radius`, actors farther than that from the hero are
+      parked: since the hero moves at most one tile per turn, they are only
+      looked at again after (distance - wake_radius) turns. Parked actors do
+      not act at all, so a wandering Beholder stands still while parked;
+      the game does not park (wake_radius None).
+    """
+
+    def __init__(self, actors=(), wake_radius: int = None):
+        self.now = 0
+        self.wake_radius = wake_radius
+        self.queue = []
+        self.sleeping = []
+        self.actions = 0
+        self.parks = 0
+        self._seq = itertools.count()
+        for actor in actors:
+            self.add(actor)
+
+    def add(self, actor, delay: int = 0):
+        """Schedules an actor (sleeping actors wait for wake())."""
+        if getattr(actor, "asleep", False):
+            self.sleeping.append(actor)
+            return
+        heapq.heappush(self.queue, (self.now + delay, next(self._seq), actor))
+
+    def wake(self, actor):
+        """Moves a sleeping actor into the queue."""
+        if actor in self.sleeping:
+            self.sleeping.remove(actor)
+            actor.asleep = False
+            self.add(actor)
+
+    def __len__(self):
+        return len(self.queue)
+
+    def end_hero_turn(self, hero, dungeon_map, cost: int = TURN):
+        """
+        Advances time by the hero's action and lets every actor that is due
+        before the hero's next action act.
+        """
+        hero_next = self.now + action_delay(cost, getattr(hero, "speed", TURN))
+        queue = self.queue
+
+        while queue and queue[0][0] < hero_next:
+            due, _, actor = heapq.heappop(queue)
+            self.now = due
+            if not actor.is_alive():
+                continue  # dead actors simply leave the queue
+            if getattr(actor, "asleep", False):
+                self.sleeping.append(actor)
+                continue
+
+            if self.wake_radius is not None:
+                distance = abs(actor.x - hero.x) + abs(actor.y - hero.y)
+                if distance > self.wake_radius:
+                    self.parks += 1
+                    self.add(actor, (distance - self.wake_radius) * TURN)
+                    continue
+
+            energy = (hero_next - due) * actor.speed // TURN
+            spent = actor.act(hero, dungeon_map, energy)
+            self.actions += 1
+            self.add(actor, action_delay(spent, actor.speed))
+            if hero.hp <= 0:
+                break
+
+        self.now = hero_next
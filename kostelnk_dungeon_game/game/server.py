@@ -0,0 +1,265 @@
+"""
+Multi-session asyncio game server.
+Hosts many independent GameSessions in one process over a telnet-style
+line protocol on local TCP.
+
+Protocol:
+    - On connect the server asks for a save slot name (one line).
+    - Every following line is a game command (same as the terminal game).
+    - Each response is a full frame followed by the prompt "Action: ".
+    - The line "@stats" returns server statistics as one JSON line. Sent
+      instead of a slot name, it opens no session and closes the connection.
+
+Save files are read and written on worker threads, so a slow disk does not
+stall the other sessions.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import time
+from collections import deque
+
+from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
+from kostelnk_dungeon_game.dungeon_core.hero import Hero
+from kostelnk_dungeon_game.dungeon_core.beholder import Beholder
+from kostelnk_dungeon_game.dungeon_core.generation import FloorSource
+from kostelnk_dungeon_game.game.loop import (
+    GameSession, GREEN, LOAD_ERRORS, RESET, initialize_new_game
+)
+from kostelnk_dungeon_game.game_io.renderer import Renderer
+from kostelnk_dungeon_game.game_io.save_load import load_game, serialize_game, write_save_data
+
+PROMPT = "Action: "
+SLOT_PROMPT = "Save slot name: "
+STATS_REQUEST = "@stats"
+
+
+def slot_path(save_dir: str, slot: str) -> str:
+    """Maps a client supplied slot name to a safe file path."""
+    name = re.sub(r"[^a-z0-9_-]", "", slot.lower())[:32] or "default"
+    return os.path.join(save_dir, f"{name}.json")
+
+
+def percentile(values, fraction: float) -> float:
+    """Returns the given percentile (0..1) of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+class ServerSession(GameSession):
+    """
+    A GameSession that writes into its own buffer instead of the terminal.
+    Commands that would block on input() are answered immediately. Saves
+    are serialized during the turn and written after it, on a worker thread.
+    """
+
+    def __init__(self, dungeon, hero, beholder, save_path):
+        self.buffer = io.StringIO()
+        super().__init__(dungeon, hero, beholder,
+                         Renderer(out=self.buffer), save_path, self.buffer)
+        self.closed = False
+        self.pending_saves = []  # serialized states to write after the turn
+
+    def save_later(self):
+        """Serializes the current state for writing after the turn."""
+        self.pending_saves.append(serialize_game(self.hero, self.beholder, self.dungeon))
+
+    def handle_save_quit(self):
+        """'Q' saves into the session slot and ends the connection."""
+        self.save_later()
+        print("Game saved successfully. Goodbye!", file=self.out)
+        self.closed = True
+
+    def save_progress(self):
+        """Stairs autosave."""
+        self.save_later()
+        print(f"{GREEN}Progress saved.{RESET}", file=self.out)
+
+    def process_command(self, cmd, cmd_raw):
+        """Manual saves are written after the turn like the others."""
+        if cmd == 'save':
+            self.save_later()
+            self.message = "Game saved manually."
+        else:
+            super().process_command(cmd, cmd_raw)
+
+    def show_inventory(self):
+        """Shows the inventory in the message log."""
+        self.message = " | ".join(self.inventory_lines())
+
+    def frame(self) -> str:
+        """Renders the current state and returns everything written so far."""
+        if not self.closed:
+            self.renderer.render(self.dungeon, self.hero, self.beholder, self.message)
+            self.message = ""
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+    async def load(self):
+        """Loads the session slot on a worker thread."""
+        try:
+            loaded = await asyncio.to_thread(self.read_save)
+        except FileNotFoundError:
+            self.message = "Nothing is saved in this slot yet."
+        except LOAD_ERRORS as e:
+            self.message = f"The save in this slot could not be read: {e}"
+        else:
+            self.use_loaded(loaded)
+
+    async def write_saves(self):
+        """Writes the saves of the last turn on a worker thread, oldest first."""
+        while self.pending_saves:
+            await asyncio.to_thread(write_save_data, self.pending_saves.pop(0),
+                                    self.save_path)
+
+    async def handle_line(self, line: str) -> str:
+        """Runs one command and returns the text to send back."""
+        cmd_raw = line.lower().split()
+        if cmd_raw[:1] == ['load']:
+            await self.load()
+        elif cmd_raw and self.play_turn(cmd_raw):
+            self.closed = True
+        await self.write_saves()
+        return self.frame()
+
+
+class GameServer:
+    """
+    Accepts TCP clients and runs one ServerSession per connection.
+    Commands are processed synchronously on the event loop, so sessions
+    never interleave inside a turn.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, map_size=(40, 15), save_dir="saves", floor_source=None, planner=None):
+        self.map_size = map_size
+        self.save_dir = save_dir
+        # Shared by all sessions (e.g. one floor bank mapped for everybody)
+        self.floor_source = floor_source or FloorSource()
+        self.planner = planner  # monster planner shared by all sessions (or None)
+        self.sessions = set()
+        self.total_sessions = 0
+        self.turns = 0
+        self.turn_latencies = deque(maxlen=10000)
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    async def open_session(self, slot: str) -> ServerSession:
+        """
+        Loads the slot if it exists, otherwise starts a new game (also when
+        the slot cannot be read, with a message saying so).
+        """
+        path = slot_path(self.save_dir, slot)
+        dungeon = Dungeon(size=self.map_size, level=1)
+        hero = Hero(0, 0)
+        beholder = Beholder(0, 0)
+        message = None
+        try:
+            await asyncio.to_thread(load_game, hero, beholder, dungeon, path)
+        except LOAD_ERRORS as e:
+            if not isinstance(e, FileNotFoundError):
+                message = f"The save in this slot could not be read ({e}); new game started."
+            dungeon, hero, beholder = initialize_new_game(self.map_size, 1,
+                                                          floor_source=self.floor_source)
+        session = ServerSession(dungeon, hero, beholder, path)
+        if message:
+            session.message = message
+        session.floor_source = self.floor_source
+        if self.planner is not None:
+            session.set_planner(self.planner)
+        return session
+
+    def stats(self) -> dict:
+        """Returns throughput and latency figures for host sizing."""
+        wall = time.perf_counter() - self.started
+        cpu = time.process_time() - self.cpu_started
+        latencies = list(self.turn_latencies)
+        path_hits = sum(s.path_cache.hits for s in self.sessions)
+        path_lookups = path_hits + sum(s.path_cache.misses for s in self.sessions)
+        stats = {
+            "active_sessions": len(self.sessions),
+            "total_sessions": self.total_sessions,
+            "turns": self.turns,
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            "cpu_ms_per_turn": round(1000 * cpu / self.turns, 4) if self.turns else 0.0,
+            "turn_p50_ms": round(1000 * percentile(latencies, 0.50), 4),
+            "turn_p99_ms": round(1000 * percentile(latencies, 0.99), 4),
+            "path_cache_hit_rate": round(path_hits / path_lookups, 4) if path_lookups else 0.0,
+        }
+        if self.planner is not None:
+            stats["planner"] = self.planner.stats()
+        return stats
+
+    @staticmethod
+    async def _send(writer, text: str):
+        writer.write(text.replace("\n", "\r\n").encode("utf-8"))
+        await writer.drain()
+
+    async def handle_client(self, reader, writer):
+        """Serves one connection until the player quits, dies or disconnects."""
+        session = None
+        try:
+            await self._send(writer, SLOT_PROMPT)
+            slot = (await reader.readline()).decode("utf-8", "ignore").strip()
+            if not slot:
+                return
+            if slot == STATS_REQUEST:
+                await self._send(writer, json.dumps(self.stats()) + "\n")
+                return
+            os.makedirs(self.save_dir, exist_ok=True)
+            session = await self.open_session(slot)
+            self.sessions.add(session)
+            self.total_sessions += 1
+            await self._send(writer, session.frame() + PROMPT)
+
+            while not session.closed:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "ignore").strip()
+                if line == STATS_REQUEST:
+                    await self._send(writer, json.dumps(self.stats()) + "\n")
+                    continue
+
+                start = time.perf_counter()
+                text = await session.handle_line(line)
+                self.turn_latencies.append(time.perf_counter() - start)
+                self.turns += 1
+                await self._send(writer, text if session.closed else text + PROMPT)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if session is not None:
+                self.sessions.discard(session)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve(self, host="127.0.0.1", port=4000):
+        """Listens until cancelled."""
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def run_server(host="127.0.0.1", port=4000, map_size=(40, 15), save_dir="saves",
+               floor_source=None, planner=None):
+    """Blocking entry point for the server mode."""
+    # pylint: disable=too-many-arguments
+    game_server = GameServer(map_size=map_size, save_dir=save_dir, floor_source=floor_source,
+                             planner=planner)
+    print(f"Dungeon server listening on {host}:{port} (saves in {save_dir}/)")
+    try:
+        asyncio.run(game_server.serve(host, port))
+    except KeyboardInterrupt:
+        print(json.dumps(game_server.stats(), indent=4))
@@ -0,0 +1,85 @@
+"""
+Snapshots of a running game session with structural sharing.
+A snapshot shares the map rows and item objects with the live game; the
+dungeon copies a row only when a tile in it changes afterwards, so taking
+and restoring a snapshot costs O(rows + items + changes), not O(map).
+
+Used by the `undo` command and for trying hypothetical turns:
+
+    with trial(session):
+        session.play_turn(["d"])
+        ...  # inspect the outcome
+    # the session is back where it was
+"""
+from contextlib import contextmanager
+from itertools import chain
+
+
+class Snapshot:
+    """Session state at one point in time (see take_snapshot)."""
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("session_state", "dungeon", "dungeon_state", "hero_state",
+                 "beholder", "beholder_state", "item_flags", "scheduler",
+                 "scheduler_state")
+
+
+def supports_snapshots(session) -> bool:
+    """True if the session's floor can be captured (classic floors only)."""
+    return hasattr(session.dungeon, "share_state")
+
+
+def take_snapshot(session) -> Snapshot:
+    """Captures the session, its current floor, hero, monster and turn queue."""
+    snapshot = Snapshot()
+    hero, dungeon, scheduler = session.hero, session.dungeon, session.scheduler
+    snapshot.session_state = (dict(session.floors_history), dict(session.floor_left_at),
+                              dict(session.floor_exits), session.moves_on_floor,
+                              session.turn, session.message)
+    snapshot.dungeon = dungeon
+    snapshot.dungeon_state = dungeon.share_state()
+    snapshot.hero_state = dict(vars(hero))
+    snapshot.hero_state["inventory"] = list(hero.inventory)
+    snapshot.beholder = session.beholder
+    snapshot.beholder_state = dict(vars(session.beholder))
+    # Equipped flags are the only state items change while lying or carried
+    snapshot.item_flags = [(item, item.equipped)
+                           for item in chain(hero.inventory, dungeon.items.values())]
+    snapshot.scheduler = scheduler
+    snapshot.scheduler_state = (scheduler.now, list(scheduler.queue),
+                                list(scheduler.sleeping), scheduler.actions, scheduler.parks)
+    return snapshot
+
+
+def restore_snapshot(session, snapshot: Snapshot):
+    """Puts the session back into the captured state (can be repeated)."""
+    (floors_history, floor_left_at, floor_exits, session.moves_on_floor, session.turn,
+     session.message) = snapshot.session_state
+    session.floors_history = dict(floors_history)
+    session.floor_left_at = dict(floor_left_at)
+    session.floor_exits = dict(floor_exits)
+
+    session.dungeon = snapshot.dungeon
+    session.dungeon.restore_state(snapshot.dungeon_state)
+    vars(session.hero).update(snapshot.hero_state)
+    session.hero.inventory = list(snapshot.hero_state["inventory"])
+    session.beholder = snapshot.beholder
+    vars(session.beholder).update(snapshot.beholder_state)
+    for item, equipped in snapshot.item_flags:
+        item.equipped = equipped
+
+    scheduler = snapshot.scheduler
+    now, queue, sleeping, scheduler.actions, scheduler.parks = snapshot.scheduler_state
+    scheduler.now = now
+    scheduler.queue = list(queue)
+    scheduler.sleeping = list(sleeping)
+    session.scheduler = scheduler
+
+
+@contextmanager
+def trial(session):
+    """Runs the body on the live session and rolls everything back afterwards."""
+    snapshot = take_snapshot(session)
+    try:
+        yield snapshot
+    finally:
+        restore_snapshot(session, snapshot)
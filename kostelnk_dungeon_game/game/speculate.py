@@ -0,0 +1,105 @@
+"""
+Speculative precomputation while the player is deciding.
+Before the loop waits for input, a background thread computes the
+Beholder's BFS path to every tile the hero can stand on after the next
+command (four steps or staying put). Once the command has been played, the
+path for the hero's actual tile goes into the path cache, so the monster
+turn finds it there; the other results are dropped.
+Only the pure path search runs on the worker; the cache and the game state
+are touched on the main thread only.
+"""
+import queue
+import threading
+
+from kostelnk_dungeon_game.dungeon_core.pathcache import MISS
+
+# The Beholder searches paths when closer than this (see Beholder.act)
+CHASE_DISTANCE = 10
+STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+class _Job:
+    """Paths to compute from one Beholder tile on one map version."""
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("beholder", "floor_key", "start", "targets", "dungeon_map",
+                 "results", "cancel")
+
+    def __init__(self, beholder, floor_key, targets, dungeon_map):
+        self.beholder = beholder
+        self.floor_key = floor_key
+        self.start = (beholder.x, beholder.y)
+        self.targets = targets
+        self.dungeon_map = dungeon_map
+        self.results = {}  # hero tile -> path or None, filled by the worker
+        self.cancel = threading.Event()
+
+
+class Speculator:
+    """
+    One daemon worker thread, started on first use.
+    start() before waiting for input, commit() at the start of the monster turn.
+    """
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.job = None
+        self.hits = 0    # monster turns that found their path precomputed
+        self.misses = 0  # speculated turns whose result was not usable
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            for target in job.targets:
+                path = job.beholder.find_path(target, job.dungeon_map, job.start, job.cancel)
+                if job.cancel.is_set():
+                    break  # the search may have been cut short
+                job.results[target] = path
+
+    def start(self, session):
+        """Queues the paths for the hero's possible next tiles."""
+        beholder, hero, dungeon = session.beholder, session.hero, session.dungeon
+        floor_key = beholder.floor_key(dungeon.dungeon_map)
+        if floor_key is None or not beholder.is_alive() \
+                or beholder.manhattan_distance(hero.x, hero.y) > CHASE_DISTANCE + 1:
+            return
+        job = self.job
+        if job is not None and job.beholder is beholder and job.floor_key == floor_key \
+                and job.start == (beholder.x, beholder.y):
+            return  # the same state is already being worked on
+
+        cache = beholder.path_cache
+        tiles = [(hero.x, hero.y)] + [(hero.x + dx, hero.y + dy) for dx, dy in STEPS
+                                      if dungeon.is_walkable(hero.x + dx, hero.y + dy)]
+        targets = [tile for tile in tiles
+                   if floor_key + ((beholder.x, beholder.y), tile) not in cache]
+        self.cancel()
+        if not targets:
+            return
+        self.job = _Job(beholder, floor_key, targets, dungeon.dungeon_map)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._work, name="speculate", daemon=True)
+            self.thread.start()
+        self.jobs.put(self.job)
+
+    def cancel(self):
+        """Drops the pending job."""
+        if self.job is not None:
+            self.job.cancel.set()
+            self.job = None
+
+    def commit(self, session):
+        """Puts the precomputed path for the hero's actual tile into the path cache."""
+        job = self.job
+        if job is None:
+            return
+        self.cancel()
+        beholder, hero = session.beholder, session.hero
+        path = job.results.get((hero.x, hero.y), MISS)
+        if path is MISS or beholder is not job.beholder \
+                or (beholder.x, beholder.y) != job.start \
+                or beholder.floor_key(session.dungeon.dungeon_map) != job.floor_key:
+            self.misses += 1
+            return
+        beholder.remember_path(job.floor_key, (hero.x, hero.y), path)
+        self.hits += 1
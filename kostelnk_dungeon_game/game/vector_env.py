@@ -0,0 +1,225 @@
+"""
+Vectorized environment for automated hero policies.
+Holds N headless GameSessions and steps them all with one batch of actions.
+Observations are written in place into flat, preallocated buffers that
+numpy can wrap without copying (np.frombuffer(...).reshape(...)):
+
+    tiles     bytearray, shape (N, side, side), tile codes around the hero
+    stats     array('i'), shape (N, len(STAT_FIELDS))
+    monsters  array('h'), shape (N, max_monsters, len(MONSTER_FIELDS))
+
+An environment is reset automatically when the hero dies or reaches
+`final_level`; its `dones` flag is set and the observation already shows
+the new episode.
+
+Benchmark:
+    python -m kostelnk_dungeon_game.game.vector_env --envs 64 --steps 500
+"""
+
+import argparse
+import random
+import time
+from array import array
+from collections import deque
+
+from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
+from kostelnk_dungeon_game.dungeon_core.generation import FloorSource
+from kostelnk_dungeon_game.game.loop import GameSession, initialize_new_game
+
+# Actions (index -> command)
+ACTIONS = (["w"], ["s"], ["a"], ["d"], ["r"])
+ACTION_NAMES = ("up", "down", "left", "right", "rest")
+
+# Tile codes in the observation window
+FLOOR, WALL, STAIRS, ITEM, GOLD, MONSTER, UP_STAIRS = range(7)
+TILE_CODES = {".": FLOOR, "▓": WALL, ">": STAIRS, "<": UP_STAIRS}
+
+STAT_FIELDS = ("hp", "max_hp", "stamina", "max_stamina", "gold", "level",
+               "attack", "defense", "x", "y")
+MONSTER_FIELDS = ("dx", "dy", "hp", "alive")
+
+# Rewards
+REWARD_LEVEL = 10.0
+REWARD_GOLD = 0.1
+PENALTY_DEATH = -10.0
+
+
+class _EnvSlot:
+    """One session plus its tile codes, padded with walls by the view radius."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, session):
+        self.session = session
+        self.floor_key = None  # (floor_id, version) the codes were built for
+        self.codes = bytearray()
+        self.width = 0  # padded row width
+        self.episode_return = 0.0
+
+
+class VectorEnv:
+    """
+    N independent games stepped together.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, num_envs: int, map_size=(40, 15), radius: int = 4,
+                 final_level: int = 7, max_monsters: int = 1, floor_source=None,
+                 seed: int = None):
+        # pylint: disable=too-many-arguments
+        if seed is not None:
+            random.seed(seed)
+        self.num_envs = num_envs
+        self.map_size = map_size
+        self.radius = radius
+        self.side = 2 * radius + 1
+        self.final_level = final_level
+        self.max_monsters = max_monsters
+        self.floor_source = floor_source or FloorSource()
+
+        self.tiles = bytearray(num_envs * self.side * self.side)
+        self.stats = array("i", bytes(4 * num_envs * len(STAT_FIELDS)))
+        self.monsters = array("h", bytes(2 * num_envs * max_monsters * len(MONSTER_FIELDS)))
+        self.rewards = array("f", bytes(4 * num_envs))
+        self.dones = bytearray(num_envs)
+        self.obs = {"tiles": self.tiles, "stats": self.stats, "monsters": self.monsters}
+
+        self.steps = 0
+        self.episodes = 0
+        self.episode_returns = deque(maxlen=100)
+        self.slots = [self._new_slot() for _ in range(num_envs)]
+
+    def _new_slot(self) -> _EnvSlot:
+        dungeon, hero, beholder = initialize_new_game(
+            self.map_size, 1, Dungeon, self.floor_source)
+        session = GameSession(dungeon, hero, beholder, None, save_path=None)
+        session.floor_source = self.floor_source
+        session.undo_history = None  # no snapshot per step
+        return _EnvSlot(session)
+
+    def reset(self):
+        """Starts a new episode in every environment; returns the observations."""
+        self.slots = [self._new_slot() for _ in range(self.num_envs)]
+        for index in range(self.num_envs):
+            self._observe(index)
+        return self.obs
+
+    def step(self, actions):
+        """
+        Plays one action (index into ACTIONS) per environment.
+        Returns (observations, rewards, dones); all buffers are reused.
+        """
+        rewards, dones = self.rewards, self.dones
+        for index, (slot, action) in enumerate(zip(self.slots, actions)):
+            session = slot.session
+            level, gold = session.dungeon.level, session.hero.gold
+
+            dead = session.play_turn(ACTIONS[action])
+            reward = ((session.dungeon.level - level) * REWARD_LEVEL
+                      + (session.hero.gold - gold) * REWARD_GOLD)
+            if dead:
+                reward += PENALTY_DEATH
+            slot.episode_return += reward
+            rewards[index] = reward
+
+            done = dead or session.dungeon.level >= self.final_level
+            dones[index] = done
+            if done:
+                self.episodes += 1
+                self.episode_returns.append(slot.episode_return)
+                self.slots[index] = self._new_slot()
+            self._observe(index)
+
+        self.steps += len(self.slots)
+        return self.obs, rewards, dones
+
+    # --- Observations ---
+
+    def _refresh_codes(self, slot: _EnvSlot):
+        """Brings the padded tile codes of the slot's floor up to date."""
+        dungeon = slot.session.dungeon
+        key = (dungeon.floor_id, dungeon.version)
+        if key == slot.floor_key:
+            return
+        radius = self.radius
+        changed = None
+        if slot.floor_key is not None and slot.floor_key[0] == key[0]:
+            changed = dungeon.changes_since(slot.floor_key[1])
+
+        if changed is None:
+            rows = dungeon.dungeon_map
+            width = len(rows[0]) + 2 * radius
+            codes = bytearray([WALL]) * (width * (len(rows) + 2 * radius))
+            for y, row in enumerate(rows):
+                start = (y + radius) * width + radius
+                codes[start:start + len(row)] = bytes(TILE_CODES[tile] for tile in row[:])
+            slot.codes, slot.width = codes, width
+            changed = dungeon.items.keys()
+        codes, width = slot.codes, slot.width
+        for x, y in changed:
+            item = dungeon.items.get((x, y))
+            if item is not None:
+                code = GOLD if item.type == "gold" else ITEM
+            else:
+                code = TILE_CODES[dungeon.dungeon_map[y][x]]
+            codes[(y + radius) * width + x + radius] = code
+        slot.floor_key = key
+
+    def _observe(self, index: int):
+        """Writes the observation of one environment into the buffers."""
+        slot = self.slots[index]
+        session = slot.session
+        hero = session.hero
+        self._refresh_codes(slot)
+
+        # Tile window: one slice per row, the padding covers the borders
+        side, radius, tiles = self.side, self.radius, self.tiles
+        codes, width = slot.codes, slot.width
+        base = index * side * side
+        src = hero.y * width + hero.x
+        for out in range(base, base + side * side, side):
+            tiles[out:out + side] = codes[src:src + side]
+            src += width
+
+        fields = len(MONSTER_FIELDS)
+        out = index * self.max_monsters * fields
+        end = out + self.max_monsters * fields
+        for monster in session.monsters()[:self.max_monsters]:
+            dx, dy = monster.x - hero.x, monster.y - hero.y
+            alive = monster.is_alive()
+            self.monsters[out:out + fields] = array("h", (dx, dy, monster.hp, alive))
+            if alive and -radius <= dx <= radius and -radius <= dy <= radius:
+                tiles[base + (dy + radius) * side + dx + radius] = MONSTER
+            out += fields
+        if out < end:
+            self.monsters[out:end] = array("h", bytes(2 * (end - out)))
+
+        start = index * len(STAT_FIELDS)
+        self.stats[start:start + len(STAT_FIELDS)] = array("i", (
+            hero.hp, hero.max_hp, hero.stamina, hero.max_stamina, hero.gold,
+            session.dungeon.level, hero.attack, hero.defense, hero.x, hero.y))
+
+
+def benchmark(num_envs: int = 64, steps: int = 500, seed: int = 1) -> float:
+    """Steps a random policy and returns environment steps per second."""
+    env = VectorEnv(num_envs, seed=seed)
+    env.reset()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step([rng.randrange(len(ACTIONS)) for _ in range(num_envs)])
+    elapsed = time.perf_counter() - start
+    return num_envs * steps / elapsed
+
+
+def main():
+    """Prints environment steps per second for a random policy."""
+    parser = argparse.ArgumentParser(description="Vectorized environment benchmark")
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=500)
+    args = parser.parse_args()
+    rate = benchmark(args.envs, args.steps)
+    print(f"{args.envs} envs x {args.steps} steps: {rate:,.0f} env steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Floor bank: many pre-generated floors packed into one file.
+The file is opened with mmap, so any number of processes share one read-only
+copy in the OS page cache, and loaded floors read their tiles straight from
+it. A row is copied only when a tile in it changes.
+
+File layout (little endian):
+    header   "DFB1", format version (u32), floor count (u32)
+    entries  width, height, level (u16), seed (u32), tiles offset (u64),
+             items offset (u64), items length (u32), analysis offset (u64),
+             analysis length (u32), stairs x, y (i16, -1 = none)
+    data     tiles: one byte per cell, row by row; items: JSON;
+             analysis: counts (4 x u32), BFS order (x, y u16 pairs),
+             first index per distance (u32), dead ends, chokepoints (x, y u16)
+
+Build a bank:
+    python -m kostelnk_dungeon_game.game_io.floorbank floors.bank --size 40x15 --levels 1-5
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+from array import array
+from typing import NamedTuple
+
+from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon, FloorAnalysis
+from kostelnk_dungeon_game.dungeon_core.generation import generate_best_floor
+from kostelnk_dungeon_game.dungeon_core.layouts import layout_for_level
+from kostelnk_dungeon_game.game_io.save_load import serialize_item, deserialize_item
+
+MAGIC = b"DFB1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sII")
+ENTRY = struct.Struct("<HHHIQQIQIhh")
+COUNTS = struct.Struct("<IIII")
+
+# Tile byte codes
+TILES = (".", "▓", ">")
+TILE_CODES = {tile: code for code, tile in enumerate(TILES)}
+
+
+class BankEntry(NamedTuple):
+    """Index record of one floor in the bank."""
+    width: int
+    height: int
+    level: int
+    seed: int
+    tiles_offset: int
+    items_offset: int
+    items_length: int
+    analysis_offset: int
+    analysis_length: int
+    stairs_x: int
+    stairs_y: int
+
+
+class BankRow:
+    """
+    One map row read from the bank. Behaves like a list of tile strings;
+    the first write copies the row into a real list (copy-on-write).
+    """
+    __slots__ = ("view", "cells")
+
+    def __init__(self, view):
+        self.view = view
+        self.cells = None
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, x):
+        if self.cells is not None:
+            return self.cells[x]
+        if isinstance(x, slice):
+            return [TILES[code] for code in self.view[x]]
+        return TILES[self.view[x]]
+
+    def __setitem__(self, x, tile):
+        if self.cells is None:
+            self.cells = self[:]
+        self.cells[x] = tile
+
+    def __iter__(self):
+        return iter(self.cells if self.cells is not None else self[:])
+
+
+class BankMap:
+    """List of BankRows over the tile bytes of one floor."""
+
+    def __init__(self, view, width: int, height: int):
+        self.rows = [BankRow(view[y * width:(y + 1) * width]) for y in range(height)]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, y):
+        return self.rows[y]
+
+    def __setitem__(self, y, row):
+        self.rows[y] = row
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def copied_rows(self) -> int:
+        """Number of rows that were written to and are no longer shared."""
+        return sum(1 for row in self.rows
+                   if not isinstance(row, BankRow) or row.cells is not None)
+
+
+class FloorBank:
+    """
+    Read-only floor bank opened through mmap.
+    Use Dungeon.load_from_bank(bank) to get a playable floor.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+
+        magic, version, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a floor bank (version {FORMAT_VERSION}).")
+        self.entries = [BankEntry(*ENTRY.unpack_from(self.mm, HEADER.size + i * ENTRY.size))
+                        for i in range(count)]
+        self.by_key: dict[tuple[int, int, int], list[int]] = {}
+        for index, entry in enumerate(self.entries):
+            self.by_key.setdefault((entry.width, entry.height, entry.level), []).append(index)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def has_floor(self, size: tuple[int, int], level: int) -> bool:
+        """True if the bank holds floors of this size and level."""
+        return (size[0], size[1], level) in self.by_key
+
+    def pick(self, size: tuple[int, int], level: int, index: int = None,
+             rng=random) -> BankEntry:
+        """Returns the index-th (or a random) floor of the given size and level."""
+        choices = self.by_key.get((size[0], size[1], level))
+        if not choices:
+            raise KeyError(f"No {size[0]}x{size[1]} floors for level {level} in the bank.")
+        if index is None:
+            return self.entries[rng.choice(choices)]
+        return self.entries[choices[index % len(choices)]]
+
+    def tiles(self, entry: BankEntry) -> BankMap:
+        """Map rows of a floor, backed by the memory map (no copy)."""
+        size = entry.width * entry.height
+        view = self.view[entry.tiles_offset:entry.tiles_offset + size]
+        return BankMap(view, entry.width, entry.height)
+
+    def items(self, entry: BankEntry) -> dict:
+        """New item objects for a floor (items are mutable, so never shared)."""
+        raw = self.mm[entry.items_offset:entry.items_offset + entry.items_length]
+        items = {}
+        for x, y, item_data in json.loads(raw):
+            item = deserialize_item(item_data)
+            if item:
+                items[(x, y)] = item
+        return items
+
+    def analysis(self, entry: BankEntry) -> FloorAnalysis:
+        """The generation flood fill of a floor, stored so it is not run again."""
+        offset = entry.analysis_offset
+        n_order, n_first, n_dead, n_choke = COUNTS.unpack_from(self.mm, offset)
+        offset += COUNTS.size
+
+        def read(typecode, count):
+            nonlocal offset
+            values = array(typecode)
+            values.frombytes(self.mm[offset:offset + count * values.itemsize])
+            offset += count * values.itemsize
+            return values
+
+        def pairs(values):
+            return list(zip(values[0::2], values[1::2]))
+
+        order = pairs(read("H", 2 * n_order))
+        first_index = read("I", n_first).tolist()
+        analysis = FloorAnalysis(order[0])
+        analysis.order = order
+        analysis.first_index = first_index
+        analysis.dead_ends = pairs(read("H", 2 * n_dead))
+        analysis.chokepoints = pairs(read("H", 2 * n_choke))
+        bounds = first_index + [len(order)]
+        distance = analysis.distance
+        for dist in range(n_first):
+            for tile in order[bounds[dist]:bounds[dist + 1]]:
+                distance[tile] = dist
+        return analysis
+
+    def close(self):
+        """
+        Closes the file. Floors loaded from the bank must not be used
+        afterwards; while they still exist the map stays open.
+        """
+        try:
+            self.view.release()
+            self.mm.close()
+        except BufferError:
+            pass
+
+
+def _pack_analysis(analysis: FloorAnalysis) -> bytes:
+    def flat(tiles):
+        return array("H", [v for tile in tiles for v in tile]).tobytes()
+
+    return b"".join([
+        COUNTS.pack(len(analysis.order), len(analysis.first_index),
+                    len(analysis.dead_ends), len(analysis.chokepoints)),
+        flat(analysis.order),
+        array("I", analysis.first_index).tobytes(),
+        flat(analysis.dead_ends),
+        flat(analysis.chokepoints),
+    ])
+
+
+def write_bank(path: str, floors):
+    """Packs generated Dungeon objects into a bank file (atomically replaced)."""
+    floors = list(floors)
+    data_offset = HEADER.size + len(floors) * ENTRY.size
+    entries, blobs = [], []
+    for dungeon in floors:
+        width, height = len(dungeon.dungeon_map[0]), len(dungeon.dungeon_map)
+        tiles = bytes(TILE_CODES[tile] for row in dungeon.dungeon_map for tile in row)
+        items = json.dumps([[x, y, serialize_item(item)]
+                            for (x, y), item in dungeon.items.items()]).encode("utf-8")
+        analysis = _pack_analysis(dungeon.analysis)
+        stairs = dungeon.stairs_pos or (-1, -1)
+        entries.append(ENTRY.pack(width, height, dungeon.level, dungeon.seed,
+                                  data_offset, data_offset + len(tiles), len(items),
+                                  data_offset + len(tiles) + len(items), len(analysis),
+                                  stairs[0], stairs[1]))
+        blobs += [tiles, items, analysis]
+        data_offset += len(tiles) + len(items) + len(analysis)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(floors)))
+        f.writelines(entries)
+        f.writelines(blobs)
+    os.replace(tmp_path, path)
+
+
+def build_bank(path: str, map_size: tuple[int, int], levels, count: int = 100,
+               best_of: int = 1) -> int:
+    """
+    Generates `count` floors per level and writes them to a bank file.
+    Floors are built offline, so each level's layout runs without a time budget.
+    """
+    def generate():
+        for level in levels:
+            layout = layout_for_level(level)
+            for _ in range(count):
+                if best_of > 1:
+                    yield generate_best_floor(map_size, level, best_of, layout=layout)
+                else:
+                    dungeon = Dungeon(map_size, level=level, layout=layout)
+                    dungeon.create_dungeon()
+                    yield dungeon
+
+    write_bank(path, generate())
+    return count * len(levels)
+
+
+def main():
+    """Command line tool for building a bank."""
+    parser = argparse.ArgumentParser(description="Pre-generate a floor bank")
+    parser.add_argument("path")
+    parser.add_argument("--size", default="40x15", help="map size, WIDTHxHEIGHT")
+    parser.add_argument("--levels", default="1-5", help="level range, e.g. 1-5")
+    parser.add_argument("--count", type=int, default=100, help="floors per level")
+    parser.add_argument("--best-of", type=int, default=1)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    first, _, last = args.levels.partition("-")
+    levels = range(int(first), int(last or first) + 1)
+    total = build_bank(args.path, (width, height), levels, args.count, args.best_of)
+    print(f"Wrote {total} floors to {args.path} ({os.path.getsize(args.path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Single-key terminal input.
+Puts the terminal into cbreak mode (termios/tty) so keys arrive without
+Enter; on Windows msvcrt is used instead. Keys typed while the game is busy
+stay buffered and are all returned by the next read.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import select
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+# Arrow keys mapped to movement keys (ESC [ x on POSIX, prefix + x on Windows)
+ARROWS = {"A": "w", "B": "s", "C": "d", "D": "a"}
+WIN_ARROWS = {"H": "w", "P": "s", "M": "d", "K": "a"}
+WIN_PREFIXES = ("\x00", "\xe0")
+
+
+def keyboard_available(stream=None) -> bool:
+    """True if single keys can be read from the stream (a real terminal)."""
+    stream = stream or sys.stdin
+    try:
+        is_tty = stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+    return is_tty and (termios is not None or msvcrt is not None)
+
+
+class RawKeyboard:
+    """
+    Reads single keys from the terminal.
+    Use as a context manager; the terminal mode is restored on exit,
+    also when the game ends with an exception or sys.exit().
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.fd = self.stream.fileno() if termios is not None else None
+        self.saved = None  # terminal attributes to restore
+        self.pending = ""  # start of an escape sequence split between reads
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Switches the terminal to single-key mode."""
+        if termios is not None and self.saved is None:
+            self.saved = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+
+    def stop(self):
+        """Restores the original terminal mode."""
+        if self.saved is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+            self.saved = None
+
+    @contextmanager
+    def cooked(self):
+        """Normal line input (echo, Enter) for the duration of the block."""
+        active = self.saved is not None
+        self.stop()
+        try:
+            yield
+        finally:
+            if active:
+                self.start()
+
+    def prompt(self, text: str) -> str:
+        """Reads one line with echo, like input()."""
+        with self.cooked():
+            return input(text)
+
+    def flush(self):
+        """Drops keys that were typed but not read yet."""
+        self.pending = ""
+        if termios is not None:
+            termios.tcflush(self.fd, termios.TCIFLUSH)
+        elif msvcrt is not None:
+            while msvcrt.kbhit():
+                msvcrt.getwch()
+
+    def read_keys(self, timeout: float = None) -> list[str]:
+        """
+        Waits up to `timeout` seconds (None = forever) for a key and returns
+        every key buffered so far, oldest first. Raises EOFError on end of input.
+        """
+        if termios is not None:
+            chars = self._read_posix(timeout)
+        else:
+            chars = self._read_windows(timeout)
+        return self._decode(chars)
+
+    def _read_posix(self, timeout) -> str:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        data = b""
+        while ready:
+            chunk = os.read(self.fd, 1024)
+            if not chunk:
+                if not data:
+                    raise EOFError
+                break
+            data += chunk
+            ready, _, _ = select.select([self.fd], [], [], 0)
+        return data.decode("utf-8", "ignore")
+
+    @staticmethod
+    def _read_windows(timeout) -> str:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if deadline is not None and time.monotonic() >= deadline:
+                return ""
+            time.sleep(0.005)
+        chars = ""
+        while msvcrt.kbhit():
+            chars += msvcrt.getwch()
+        return chars
+
+    def _decode(self, chars: str) -> list[str]:
+        """Splits raw input into keys, mapping arrow keys to WASD."""
+        chars = self.pending + chars
+        self.pending = ""
+        keys = []
+        i = 0
+        while i < len(chars):
+            char = chars[i]
+            if char == "\x1b":
+                if chars[i + 1:i + 2] == "[" and i + 2 < len(chars):
+                    if chars[i + 2] in ARROWS:
+                        keys.append(ARROWS[chars[i + 2]])
+                    i += 3
+                elif chars[i + 1:i + 2] in ("", "[") and termios is not None:
+                    self.pending = chars[i:]  # rest of the sequence comes later
+                    break
+                else:
+                    i += 1  # lone Escape is ignored
+            elif char in WIN_PREFIXES and msvcrt is not None:
+                if chars[i + 1:i + 2] in WIN_ARROWS:
+                    keys.append(WIN_ARROWS[chars[i + 1]])
+                i += 2
+            else:
+                keys.append(char)
+                i += 1
+        return keys
@@ -0,0 +1,84 @@
+"""
+Exports the metrics registry in the Prometheus text format, either over
+HTTP (GET /metrics on a local port, served from a daemon thread) or as a
+file that is rewritten periodically (for the node exporter's textfile
+collector).
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from kostelnk_dungeon_game.dungeon_core.metrics import REGISTRY
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(registry=REGISTRY) -> str:
+    """All metrics of a registry in the Prometheus text exposition format."""
+    lines = []
+    for metric in registry.collect():
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "histogram":
+            for bound, count in metric.cumulative():
+                lines.append(f'{metric.name}_bucket{{le="{_number(bound)}"}} {count}')
+            lines.append(f"{metric.name}_sum {_number(metric.sum)}")
+            lines.append(f"{metric.name}_count {metric.count}")
+        else:
+            lines.append(f"{metric.name} {_number(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: str, registry=REGISTRY):
+    """Writes the metrics to a file (atomically replaced)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(registry))
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serves /metrics."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus(self.registry).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Scrapes are not logged to the game's terminal."""
+
+
+def start_http_exporter(port: int = 9100, host: str = "127.0.0.1", registry=REGISTRY):
+    """Serves GET /metrics from a daemon thread. Returns the server (call shutdown())."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_file_exporter(path: str, interval: float = 15.0, registry=REGISTRY):
+    """Rewrites the metrics file every `interval` seconds from a daemon thread."""
+    def run():
+        while True:
+            write_metrics_file(path, registry)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
@@ -1,70 +1,223 @@
-"""
-ASCII renderer for dungeon maps and HUD.
-"""
-
-import os
-
-class Renderer:
-    """
-    Handles drawing the game state to the console.
-    """
-
-    @staticmethod
-    def clear_screen():
-        """
-        Clears the terminal screen (Windows/Linux/Mac compatible).
-        """
-        os.system('cls' if os.name == 'nt' else 'clear')
-
-    def render(self, dungeon, hero, beholder=None, message=""):
-        """
-        Clears screen and prints map + status.
-        """
-        self.clear_screen()
-
-
-        # Create display buffer
-        display = [row[:] for row in dungeon.dungeon_map]
-
-        # Draw Items & Gold
-        for (ix, iy), item in dungeon.items.items():
-            symbol = "?"
-            color = "\033[96m"  # CYAN (basic items)
-
-            if item.type == "gold":
-                symbol = "$"
-                color = "\033[93m"  # YELLOW (just gold)
-            elif item.type == "weapon":
-                symbol = "/"
-            elif item.type == "shield":
-                symbol = "O"
-            elif item.type == "potion":
-                symbol = "!"
-
-            # Rendering with the correct color
-            display[iy][ix] = f"{color}{symbol}\033[0m"
-
-        # Draw Hero
-        display[hero.y][hero.x] = "\033[92m@\033[0m"  # Green
-
-        # Draw Beholder
-        if beholder and beholder.hp > 0:
-            display[beholder.y][beholder.x] = beholder.symbol
-
-        # Print Map
-        print(f" --- FLOOR {dungeon.level} ---")
-        for row in display:
-            print("".join(row))
-
-        # HUD
-        print("-" * 50)
-        # Getattr for safety, if the attributes did not exist
-        hero_stamina = getattr(hero, 'stamina', 50)
-        print(f"HP: {hero.hp} | Stm: {hero_stamina} | Gold: {hero.gold}")
-        print(f"Stats: ATK {hero.attack} | DEF {hero.defense}")
-        print("Leave game press: Q")
-        print("-" * 50)
-
-        # Message Log
-        if message:
-            print(f"> {message}")
+"""
+ASCII renderer for dungeon maps and HUD.
+"""
+
+import os
+import time
+from collections import deque
+
+from kostelnk_dungeon_game.dungeon_core.events import (
+    DamageEvent, DeathEvent, DropEvent, LevelChangeEvent, PickupEvent, RestoreEvent
+)
+from kostelnk_dungeon_game.dungeon_core.metrics import REGISTRY
+
+RENDER_SECONDS = REGISTRY.histogram("dungeon_render_seconds", "Time to draw one frame.")
+
+# ANSI colors
+YELLOW = "\033[93m"
+CYAN = "\033[96m"
+RED = "\033[91m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def format_event(event) -> str:
+    """Turns a game event into one line of the message log."""
+    # pylint: disable=too-many-return-statements
+    if isinstance(event, DamageEvent):
+        if event.target == "Hero":
+            if event.kind == "firebolt":
+                return (f"{BLUE}{event.source} casts Firebolt! "
+                        f"You take {event.amount} damage.{RESET}")
+            return f"{BLUE}{event.source} bites you for {event.amount} damage!{RESET}"
+        if event.amount > 0:
+            return f"You hit {event.target} for {event.amount} dmg!"
+        return f"{RED}Your attack bounced off! (You need a weapon/shield!){RESET}"
+    if isinstance(event, DeathEvent):
+        if event.name == "Hero":
+            return f"{RED}YOU DIED!{RESET}"
+        return f"{RED} YOU KILLED THE {event.name.upper()}! {RESET}"
+    if isinstance(event, PickupEvent):
+        if event.item_type == "gold":
+            return f"{YELLOW}You found {event.amount} Gold!{RESET}"
+        return f"{CYAN}Picked up {event.item_name}!{RESET}"
+    if isinstance(event, DropEvent):
+        names = ", ".join(event.item_names)
+        if event.cause == "exhaustion":
+            return f"{RED}Collapsed from weight! Dropped: {names}!{RESET}"
+        return f"You dropped {names}."
+    if isinstance(event, RestoreEvent):
+        if event.cause == "rest":
+            return f"You rest for a while. Stamina +{event.amount}."
+        if event.stat == "hp":
+            return f"You drink a health potion and restore {event.amount} HP!"
+        return f"You drink a stamina potion and feel refreshed! (+{event.amount} Stamina)"
+    if isinstance(event, LevelChangeEvent):
+        if event.revisited:
+            verb = "Returned to"
+        else:
+            verb = "Climbed to" if event.new_level < event.old_level else "Descended to"
+        return f"{verb} floor {event.new_level}."
+    return str(event)
+
+
+def item_symbol(item) -> str:
+    """Colored map symbol of an item lying on the floor."""
+    symbol = "?"
+    color = "\033[96m"  # CYAN (basic items)
+
+    if item.type == "gold":
+        symbol = "$"
+        color = "\033[93m"  # YELLOW (just gold)
+    elif item.type == "weapon":
+        symbol = "/"
+    elif item.type == "shield":
+        symbol = "O"
+    elif item.type == "potion":
+        symbol = "!"
+
+    # Rendering with the correct color
+    return f"{color}{symbol}\033[0m"
+
+
+class Renderer:
+    """
+    Handles drawing the game state to the console.
+    """
+
+    def __init__(self, ansi_clear: bool = False, out=None):
+        """
+        Args:
+            ansi_clear (bool): Clear the screen with an ANSI escape sequence
+                instead of spawning 'cls'/'clear' (used by the real-time loop).
+            out: Text stream to draw into (None = current stdout).
+                A custom stream always uses the ANSI clear sequence.
+        """
+        self.ansi_clear = ansi_clear or out is not None
+        self.out = out
+        # Events since the last frame; formatted only when drawn
+        self.pending_events = deque(maxlen=8)
+        # Floor rows (tiles + items, no actors) of the last frame,
+        # valid for (floor_id, version) in floor_key
+        self.floor_key = None
+        self.floor_cells = []
+        self.floor_lines = []
+        # SpectatorFeed (game_io/spectator.py) every frame is published to
+        self.spectators = None
+
+    def attach(self, events):
+        """Subscribes to a session's EventBus."""
+        events.subscribe(self.pending_events.append)
+
+    def clear_screen(self):
+        """
+        Clears the terminal screen (Windows/Linux/Mac compatible).
+        """
+        if self.ansi_clear:
+            print("\033[H\033[2J", end="", file=self.out)
+            return
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    def render(self, dungeon, hero, beholder=None, message=""):
+        """
+        Clears screen and prints map + status.
+        """
+        start = time.perf_counter()
+        self.clear_screen()
+
+
+        # Create display buffer (unbounded floors render a window around the hero)
+        viewport = getattr(dungeon, "viewport", None)
+        lines = None
+        if viewport:
+            x0, y0, display, items = viewport(hero.x, hero.y)
+        elif hasattr(dungeon, "changes_since"):
+            # Tracked floor: reuse the rows that did not change
+            x0, y0 = 0, 0
+            display, lines = self._floor_rows(dungeon)
+            items = {}
+        else:
+            x0, y0 = 0, 0
+            display = [row[:] for row in dungeon.dungeon_map]
+            items = dungeon.items
+
+        # Draw Items & Gold
+        for (ix, iy), item in items.items():
+            if 0 <= iy - y0 < len(display) and 0 <= ix - x0 < len(display[0]):
+                display[iy - y0][ix - x0] = item_symbol(item)
+
+        # Hero and Beholder (drawn last, on top)
+        actors = {(hero.x - x0, hero.y - y0): "\033[92m@\033[0m"}  # Green
+        if beholder and beholder.hp > 0:
+            actors[(beholder.x - x0, beholder.y - y0)] = beholder.symbol
+        actor_rows = {y for _, y in actors}
+
+        # Print Map
+        title = f" --- FLOOR {dungeon.level} ---"
+        print(title, file=self.out)
+        map_rows = []
+        for y, row in enumerate(display):
+            if y not in actor_rows and lines is not None:
+                print(lines[y], file=self.out)
+                map_rows.append(row)
+                continue
+            row = row[:]
+            for (ax, ay), cell in actors.items():
+                if ay == y and 0 <= ax < len(row):
+                    row[ax] = cell
+            print("".join(row), file=self.out)
+            map_rows.append(row)
+
+        # HUD
+        # Getattr for safety, if the attributes did not exist
+        hero_stamina = getattr(hero, 'stamina', 50)
+        text = [
+            "-" * 50,
+            f"HP: {hero.hp} | Stm: {hero_stamina} | Gold: {hero.gold}",
+            f"Stats: ATK {hero.attack} | DEF {hero.defense}",
+            "Leave game press: Q",
+            "-" * 50,
+        ]
+
+        # Message Log
+        if message:
+            text.append(f"> {message}")
+        while self.pending_events:
+            text.append(f"> {format_event(self.pending_events.popleft())}")
+        for line in text:
+            print(line, file=self.out)
+
+        if self.spectators is not None:
+            # Same frame as cells: map cells, one cell per character elsewhere
+            self.spectators.publish([list(title)] + map_rows + [list(line) for line in text])
+        RENDER_SECONDS.observe(time.perf_counter() - start)
+
+    def _floor_rows(self, dungeon):
+        """
+        Returns (cells, lines) of the floor without actors.
+        Only the cells changed since the previous frame are redrawn.
+        """
+        key = (dungeon.floor_id, dungeon.version)
+        if key == self.floor_key:
+            return self.floor_cells, self.floor_lines
+
+        changed = None
+        if self.floor_key is not None and self.floor_key[0] == key[0]:
+            changed = dungeon.changes_since(self.floor_key[1])
+
+        if changed is None:
+            cells = [row[:] for row in dungeon.dungeon_map]
+            for (ix, iy), item in dungeon.items.items():
+                cells[iy][ix] = item_symbol(item)
+            self.floor_cells = cells
+            self.floor_lines = ["".join(row) for row in cells]
+        else:
+            cells = self.floor_cells
+            for x, y in changed:
+                item = dungeon.items.get((x, y))
+                cells[y][x] = item_symbol(item) if item else dungeon.dungeon_map[y][x]
+            for y in {y for _, y in changed}:
+                self.floor_lines[y] = "".join(cells[y])
+
+        self.floor_key = key
+        return self.floor_cells, self.floor_lines
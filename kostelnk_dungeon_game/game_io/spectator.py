@@ -0,0 +1,247 @@
+"""
+Spectator mode: any number of viewers watch a live run.
+
+The renderer publishes every frame once. SpectatorFeed turns it into a
+keyframe or the cells that changed since the previous frame and hands the
+encoded message to a hub process, which keeps the current screen and fans
+the messages out to the connected viewers. The game process does the same
+work per frame however many viewers there are.
+
+Protocol (local TCP, one JSON object per line):
+    {"type": "key", "frame": n, "rows": [[cell, ...], ...]}
+    {"type": "delta", "frame": n, "height": h,
+     "rows": [[y, [cell, ...]], ...], "cells": [[y, x, cell], ...]}
+A viewer first gets the current screen as a keyframe, then deltas. A viewer
+that falls behind skips frames and is sent a fresh keyframe.
+
+Watch a run started with --spectate PORT:
+    python -m kostelnk_dungeon_game.game_io.spectator --port PORT
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import queue
+import sys
+
+KEYFRAME = "key"
+DELTA = "delta"
+DEFAULT_PORT = 4100
+# Encoded frames waiting for the hub; when full, frames are dropped and the
+# next one is sent as a keyframe
+QUEUE_SIZE = 64
+# Unsent bytes a viewer may have before it skips frames
+MAX_BACKLOG = 256 * 1024
+
+
+def encode_message(message: dict) -> bytes:
+    """One protocol line."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def apply_message(rows: list, message: dict) -> set:
+    """Applies a keyframe or delta to a screen (list of cell rows). Returns the changed rows."""
+    if message["type"] == KEYFRAME:
+        rows[:] = message["rows"]
+        return set(range(len(rows)))
+    del rows[message["height"]:]
+    changed = set()
+    for y, cells in message["rows"]:
+        if y < len(rows):
+            rows[y] = cells
+        else:
+            rows.append(cells)
+        changed.add(y)
+    for y, x, cell in message["cells"]:
+        rows[y][x] = cell
+        changed.add(y)
+    return changed
+
+
+class FrameEncoder:
+    """Turns successive frames into a keyframe followed by cell-level deltas."""
+
+    def __init__(self):
+        self.rows = []
+        self.frame = 0
+        self.need_keyframe = True
+
+    def encode(self, grid) -> bytes:
+        """Encodes a frame (list of cell rows) against the previous one."""
+        self.frame += 1
+        if self.need_keyframe:
+            self.rows = [list(row) for row in grid]
+            self.need_keyframe = False
+            return encode_message({"type": KEYFRAME, "frame": self.frame, "rows": self.rows})
+
+        previous = self.rows
+        rows, cells = [], []
+        for y, row in enumerate(grid):
+            if y < len(previous):
+                old = previous[y]
+                if old == row:
+                    continue
+                previous[y] = list(row)
+                if len(old) == len(row):
+                    cells.extend((y, x, cell) for x, (before, cell)
+                                 in enumerate(zip(old, row)) if before != cell)
+                    continue
+            else:
+                previous.append(list(row))
+            rows.append((y, previous[y]))
+        del previous[len(grid):]
+        return encode_message({"type": DELTA, "frame": self.frame, "height": len(grid),
+                               "rows": rows, "cells": cells})
+
+
+class SpectatorHub:
+    """Runs in its own process: keeps the current screen and serves the viewers."""
+
+    def __init__(self, frames):
+        self.frames = frames  # encoded messages from SpectatorFeed (None = stop)
+        self.rows = []
+        self.frame = 0
+        self.viewers = {}     # StreamWriter -> True while it skips frames
+        self.handlers = set()
+
+    def keyframe(self) -> bytes:
+        """The current screen as a keyframe."""
+        return encode_message({"type": KEYFRAME, "frame": self.frame, "rows": self.rows})
+
+    async def handle_viewer(self, reader, writer):
+        """Sends the latest screen, then every following frame until the viewer leaves."""
+        self.handlers.add(asyncio.current_task())
+        if self.rows:
+            writer.write(self.keyframe())
+        self.viewers[writer] = False
+        try:
+            while await reader.read(1024):
+                pass  # viewers only watch
+        except ConnectionError:
+            pass
+        finally:
+            self.viewers.pop(writer, None)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def broadcast(self, data: bytes):
+        """Applies one message to the screen and forwards it to every viewer."""
+        message = json.loads(data)
+        apply_message(self.rows, message)
+        self.frame = message["frame"]
+        keyframe = None
+        for writer, skipping in list(self.viewers.items()):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                self.viewers[writer] = True
+            elif skipping:
+                keyframe = keyframe or self.keyframe()
+                writer.write(keyframe)
+                self.viewers[writer] = False
+            else:
+                writer.write(data)
+
+    def next_batch(self) -> list:
+        """Waits for the next message and takes whatever else is already queued."""
+        batch = [self.frames.get()]
+        while batch[-1] is not None:
+            try:
+                batch.append(self.frames.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    async def serve(self, host: str, port: int):
+        """Accepts viewers and forwards frames until the feed sends None."""
+        server = await asyncio.start_server(self.handle_viewer, host, port)
+        loop = asyncio.get_running_loop()
+        async with server:
+            running = True
+            while running:
+                for data in await loop.run_in_executor(None, self.next_batch):
+                    if data is None:
+                        running = False
+                        break
+                    self.broadcast(data)
+            for writer in self.viewers:
+                writer.close()
+            if self.handlers:
+                await asyncio.wait(self.handlers, timeout=1)
+
+
+def run_hub(frames, host: str, port: int):
+    """Entry point of the hub process."""
+    try:
+        asyncio.run(SpectatorHub(frames).serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+class SpectatorFeed:
+    """
+    Game side of spectator mode. Attach it to a Renderer
+    (renderer.spectators = feed); every rendered frame is encoded once and
+    queued for the hub process without waiting for it.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        self.encoder = FrameEncoder()
+        self.frames = multiprocessing.Queue(QUEUE_SIZE)
+        self.dropped = 0
+        self.process = multiprocessing.Process(target=run_hub, args=(self.frames, host, port),
+                                               name="spectator-hub", daemon=True)
+        self.process.start()
+
+    def publish(self, grid):
+        """Queues one frame (list of cell rows) for the viewers."""
+        data = self.encoder.encode(grid)
+        try:
+            self.frames.put_nowait(data)
+        except queue.Full:
+            # The hub is behind: resynchronize it with the next frame
+            self.dropped += 1
+            self.encoder.need_keyframe = True
+
+    def close(self):
+        """Stops the hub process."""
+        try:
+            self.frames.put(None, timeout=1)
+        except queue.Full:
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+async def watch(host: str = "127.0.0.1", port: int = DEFAULT_PORT, out=None):
+    """Viewer: draws the published frames, redrawing only the rows that changed."""
+    out = out or sys.stdout
+    reader, writer = await asyncio.open_connection(host, port)
+    rows = []
+    try:
+        while line := await reader.readline():
+            message = json.loads(line)
+            changed = apply_message(rows, message)
+            if message["type"] == KEYFRAME:
+                out.write("\033[H\033[2J")
+            for y in sorted(changed):
+                out.write(f"\033[{y + 1};1H{''.join(rows[y])}\033[K")
+            out.write(f"\033[{len(rows) + 1};1H\033[J")
+            out.flush()
+    finally:
+        writer.close()
+
+
+def main():
+    """Command line viewer."""
+    parser = argparse.ArgumentParser(description="Watch a live Dungeon & Dragon run")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(watch(args.host, args.port))
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,109 +1,149 @@
-"""
-Main entry point for the Dungeon game.
-"""
-import sys
-import os
-
-# --- Module Search Path ---
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
-
-# --- Windows Colors ---
-if os.name == 'nt':
-    os.system('color')
-
-
-from kostelnk_dungeon_game.game.menu import MainMenu
-from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
-from kostelnk_dungeon_game.dungeon_core.hero import Hero
-from kostelnk_dungeon_game.dungeon_core.beholder import Beholder
-from kostelnk_dungeon_game.game.loop import game_loop
-from kostelnk_dungeon_game.game_io.renderer import Renderer
-from kostelnk_dungeon_game.game_io.save_load import load_game
-
-# Colors for the logo
-RED = "\033[91m"
-RESET = "\033[0m"
-
-def initialize_new_game(map_size, level):
-    """
-    Helper function to generate a fresh Dungeon, Hero, and Beholder.
-    """
-    # 1. Create Dungeon
-    dungeon = Dungeon(size=map_size, level=level)
-    dungeon.create_dungeon()
-
-    # 2. Create Hero (Safe start at 1,1)
-    start_x, start_y = dungeon.get_valid_start_position()
-    hero = Hero(x=start_x, y=start_y)
-
-    # 3. Create Beholder
-    # FIX: Instantiate Beholder FIRST, then move it
-    beholder = Beholder(x=0, y=0, level=level)
-    beholder.spawn_at_safe_location(dungeon.floor_tiles, hero.x, hero.y)
-
-    return dungeon, hero, beholder
-
-
-def main():
-    """
-    Main execution function. Initializes the game and starts the loop.
-    """
-    # 1. Show Menu
-    menu = MainMenu()
-    action = menu.run()
-
-    # 2. Initialize Game Objects
-    hero = None
-    dungeon = None
-    beholder = None
-    renderer = Renderer()
-
-    # Default settings
-    map_size = (40, 15)
-    current_level = 1
-
-    if action == 'new':
-        print("\nGenerating new dungeon...")
-        dungeon, hero, beholder = initialize_new_game(map_size, current_level)
-
-        print("Game ready! Entering the darkness...")
-        input("Press Enter to start...")
-
-    elif action == 'load':
-        print("\nLoading saved game...")
-        if os.path.exists("savefile.json"):
-            # Init empty objects
-            dungeon = Dungeon(size=map_size, level=1)
-            hero = Hero(0, 0)
-            beholder = Beholder(0, 0)
-
-            try:
-                load_game(hero, beholder, dungeon, path="savefile.json")
-                print("Game loaded successfully!")
-                input("Press Enter to continue...")
-
-            except Exception as e:
-                print(f"Error loading save file: {e}")
-                input("Press Enter to start a NEW GAME instead...")
-                return main()
-        else:
-            print("No save file found! Starting new game.")
-            input("Press Enter...")
-
-            dungeon, hero, beholder = initialize_new_game(map_size, current_level)
-
-    # 3. Start Game Loop
-    if hero and dungeon and beholder:
-        game_loop(dungeon, hero, beholder, renderer)
-        return None
-
-    print("Error: Could not initialize game state.")
-    return None
-
-
-if __name__ == "__main__":
-    main()
-
+"""
+Main entry point for the Dungeon game.
+"""
+import argparse
+import sys
+import os
+
+# --- Module Search Path ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# --- Windows Colors ---
+if os.name == 'nt':
+    os.system('color')
+
+
+from kostelnk_dungeon_game.game.menu import MainMenu
+from kostelnk_dungeon_game.dungeon_core.dungeon import Dungeon
+from kostelnk_dungeon_game.dungeon_core.chunked import ChunkedDungeon
+from kostelnk_dungeon_game.dungeon_core.hero import Hero
+from kostelnk_dungeon_game.dungeon_core.beholder import Beholder
+from kostelnk_dungeon_game.dungeon_core.generation import FloorSource
+from kostelnk_dungeon_game.dungeon_core.planner import BeholderPlanner
+from kostelnk_dungeon_game.game.loop import game_loop, initialize_new_game
+from kostelnk_dungeon_game.game.keyloop import keypress_loop
+from kostelnk_dungeon_game.game.realtime import realtime_loop
+from kostelnk_dungeon_game.game.server import run_server
+from kostelnk_dungeon_game.game_io.renderer import Renderer
+from kostelnk_dungeon_game.game_io.save_load import load_game
+from kostelnk_dungeon_game.game_io.floorbank import FloorBank
+from kostelnk_dungeon_game.game_io.metrics_export import start_file_exporter, start_http_exporter
+from kostelnk_dungeon_game.game_io.spectator import SpectatorFeed
+
+# Colors for the logo
+RED = "\033[91m"
+RESET = "\033[0m"
+
+
+def main():
+    """
+    Main execution function. Initializes the game and starts the loop.
+    Pass --realtime to run the asyncio fixed-tick loop instead,
+    or --server to host many sessions over TCP.
+    --keys reads single keypresses instead of whole lines.
+    """
+    parser = argparse.ArgumentParser(description="Dungeon & Dragon")
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--server", action="store_true")
+    parser.add_argument("--keys", action="store_true",
+                        help="single-key input without Enter")
+    parser.add_argument("--chunked", action="store_true",
+                        help="unbounded, lazily generated floors")
+    parser.add_argument("--best-of", type=int, default=1, metavar="N",
+                        help="generate N floors in parallel and keep the best")
+    parser.add_argument("--bank", metavar="PATH",
+                        help="take floors from a pre-generated floor bank")
+    parser.add_argument("--planner", type=float, nargs="?", const=2.0, metavar="MS",
+                        help="Beholder plans ahead within MS milliseconds per action")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="rewrite Prometheus metrics to PATH every 15 seconds")
+    parser.add_argument("--spectate", type=int, metavar="PORT",
+                        help="let viewers watch the run on 127.0.0.1:PORT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    args, _ = parser.parse_known_args()
+    realtime = args.realtime
+    dungeon_cls = ChunkedDungeon if args.chunked else Dungeon
+    bank = FloorBank(args.bank) if args.bank else None
+    floor_source = FloorSource(best_of=args.best_of, bank=bank)
+    planner = BeholderPlanner(budget=args.planner / 1000) if args.planner else None
+    if args.metrics_port:
+        start_http_exporter(args.metrics_port)
+    if args.metrics_file:
+        start_file_exporter(args.metrics_file)
+
+    if args.server:
+        run_server(args.host, args.port, floor_source=floor_source, planner=planner)
+        return None
+
+    # 1. Show Menu
+    menu = MainMenu()
+    action = menu.run()
+
+    # 2. Initialize Game Objects
+    hero = None
+    dungeon = None
+    beholder = None
+    renderer = Renderer(ansi_clear=realtime or args.keys)
+    if args.spectate:
+        renderer.spectators = SpectatorFeed(port=args.spectate)
+
+    # Default settings
+    map_size = (40, 15)
+    current_level = 1
+
+    if action == 'new':
+        print("\nGenerating new dungeon...")
+        dungeon, hero, beholder = initialize_new_game(map_size, current_level,
+                                                      dungeon_cls, floor_source)
+
+        print("Game ready! Entering the darkness...")
+        input("Press Enter to start...")
+
+    elif action == 'load':
+        print("\nLoading saved game...")
+        if os.path.exists("savefile.json"):
+            # Init empty objects
+            dungeon = dungeon_cls(size=map_size, level=1)
+            hero = Hero(0, 0)
+            beholder = Beholder(0, 0)
+
+            try:
+                load_game(hero, beholder, dungeon, path="savefile.json")
+                print("Game loaded successfully!")
+                input("Press Enter to continue...")
+
+            except Exception as e:
+                print(f"Error loading save file: {e}")
+                input("Press Enter to start a NEW GAME instead...")
+                return main()
+        else:
+            print("No save file found! Starting new game.")
+            input("Press Enter...")
+
+            dungeon, hero, beholder = initialize_new_game(map_size, current_level,
+                                                          dungeon_cls, floor_source)
+
+    # 3. Start Game Loop
+    if hero and dungeon and beholder:
+        if realtime:
+            realtime_loop(dungeon, hero, beholder, renderer, floor_source, planner)
+        elif args.keys:
+            keypress_loop(dungeon, hero, beholder, renderer, floor_source=floor_source,
+                          planner=planner)
+        else:
+            game_loop(dungeon, hero, beholder, renderer, floor_source, planner)
+        return None
+
+    print("Error: Could not initialize game state.")
+    return None
+
+
+if __name__ == "__main__":
+    main()
+